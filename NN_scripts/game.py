@@ -1,15 +1,18 @@
 import os
 import numpy as np
 import sys
+import uuid
 from os import makedirs
 from typing import Dict, Tuple, Iterable, Optional
 
+from dicewars.config import nn_dimensions
 from dicewars.server.area import Area
 from dicewars.server.board import Board
 from dicewars.server.player import Player
 
-MAX_AREA_COUNT = 34
-MAX_PLAYER_COUNT = 4
+MAX_AREA_COUNT, MAX_PLAYER_COUNT = nn_dimensions()
+# adjacency upper triangle, owners, dice and largest regions
+INPUT_SIZE = MAX_AREA_COUNT * (MAX_AREA_COUNT - 1) // 2 + 2 * MAX_AREA_COUNT + MAX_PLAYER_COUNT
 
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), '../../data')
@@ -79,4 +82,96 @@ def save_game_configurations(winner_index, configurations):
     data = np.asarray(configurations)
     conf_hash = str(hash(data.tostring()))
     conf_file = os.path.join(winner_dir, conf_hash)
-    np.save(f"{conf_file}.npy", data)
\ No newline at end of file
+    np.save(f"{conf_file}.npy", data)
+
+
+class GameRecorder:
+    """Streaming recorder of game configurations
+
+    Produces the same rows as game_configuration(), but writes them straight
+    into memory-mapped .npy chunk files as the game goes, so the states of
+    a game are never kept in memory. The adjacency part of a row is encoded
+    only once per game.
+
+    Chunks are written into a pending directory next to log_dir, so that
+    log_dir only ever holds the winners' directories, and moved under the
+    winner's directory once the game is decided; games without a winner
+    are discarded.
+    """
+    def __init__(self, board: Board, log_dir: str = LOG_DIR, chunk_size: int = 256):
+        self.log_dir = log_dir
+        self.chunk_size = chunk_size
+        self.pending_dir = os.path.normpath(log_dir) + '.pending'
+        makedirs(self.pending_dir, exist_ok=True)
+        self.game_id = uuid.uuid4().hex
+
+        nb_adjacencies = MAX_AREA_COUNT * (MAX_AREA_COUNT - 1) // 2
+        self.owners_offset = nb_adjacencies
+        self.dice_offset = self.owners_offset + MAX_AREA_COUNT
+        self.regions_offset = self.dice_offset + MAX_AREA_COUNT
+        self.row_size = self.regions_offset + MAX_PLAYER_COUNT
+
+        # position of the pair (i, j), i < j, in the upper triangle
+        self.adjacency = np.zeros(nb_adjacencies, dtype=np.int64)
+        rows, cols = np.triu_indices(MAX_AREA_COUNT, k=1)
+        pair_index = {(i + 1, j + 1): k for k, (i, j) in enumerate(zip(rows, cols))}
+        for name, area in board.areas.items():
+            for neighbour in area.get_adjacent_areas_names():
+                if name < neighbour <= MAX_AREA_COUNT:
+                    self.adjacency[pair_index[name, neighbour]] = 1
+
+        self.areas = [area for name, area in sorted(board.areas.items()) if name <= MAX_AREA_COUNT]
+        self.chunks = []
+        self.chunk = None
+        self.nb_rows = 0
+
+    def record(self, board: Board, players: Dict[int, Player]):
+        """Append the current configuration of the game
+        """
+        if self.chunk is None or self.nb_rows == self.chunk_size:
+            self.new_chunk()
+
+        row = self.chunk[self.nb_rows]
+        row[:self.owners_offset] = self.adjacency
+        row[self.owners_offset:] = 0
+        for area in self.areas:
+            row[self.owners_offset + area.name - 1] = area.owner_name
+            row[self.dice_offset + area.name - 1] = area.dice
+        for player_id in range(MAX_PLAYER_COUNT):
+            player = players.get(player_id + 1)
+            if player is not None:
+                row[self.regions_offset + player_id] = player.get_largest_region()
+        self.nb_rows += 1
+
+    def new_chunk(self):
+        if self.chunk is not None:
+            self.chunk.flush()
+        path = os.path.join(self.pending_dir, '{}-{}.npy'.format(self.game_id, len(self.chunks)))
+        self.chunks.append(path)
+        self.chunk = np.lib.format.open_memmap(path, mode='w+', dtype=np.int64, shape=(self.chunk_size, self.row_size))
+        self.nb_rows = 0
+
+    def finish(self, winner_index: Optional[int]):
+        """Store the recorded configurations under the winner, discard them if there is none
+        """
+        if self.chunk is not None:
+            last_rows = np.array(self.chunk[:self.nb_rows])
+            del self.chunk
+            self.chunk = None
+            if self.nb_rows < self.chunk_size:
+                np.save(self.chunks[-1], last_rows)
+
+        if winner_index is None:
+            for path in self.chunks:
+                os.remove(path)
+        else:
+            winner_dir = os.path.join(self.log_dir, f'{winner_index}')
+            makedirs(winner_dir, exist_ok=True)
+            for path in self.chunks:
+                os.replace(path, os.path.join(winner_dir, os.path.basename(path)))
+        self.chunks = []
+
+        try:
+            os.rmdir(self.pending_dir)
+        except OSError:
+            pass  # chunks of other games being recorded
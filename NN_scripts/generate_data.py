@@ -80,7 +80,7 @@ def main():
                 board_definition,
                 fixed=UNIVERSAL_SEED,
                 client_seed=UNIVERSAL_SEED,
-                debug=True, logdir='../logs',
+                debug=True, logdir='../logs', record=True,
             )
             print(f'Game played {players}.', file=sys.stderr)
 
@@ -44,13 +44,14 @@ class DCNN(nn.Module):
 
 
 if __name__ == "__main__":
-        model = DCNN(633, 4)
+        from NN_scripts.game import INPUT_SIZE, MAX_PLAYER_COUNT
+        model = DCNN(INPUT_SIZE, MAX_PLAYER_COUNT)
         device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         model = nn.DataParallel(model, device_ids = [i for i in range(torch.cuda.device_count())])
         model.to(device)
         model.train()
         pytorch_total_params = sum(p.numel() for p in model.parameters() if p.requires_grad)
         print(pytorch_total_params)
-        x = torch.rand((1,1,633))
+        x = torch.rand((1,1,INPUT_SIZE))
         out = model(x)
         print(model.state_dict)
\ No newline at end of file
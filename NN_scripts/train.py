@@ -1,4 +1,5 @@
 import argparse
+from NN_scripts.game import INPUT_SIZE, MAX_PLAYER_COUNT
 from NN_scripts.model import DCNN
 
 from torch.utils.data import DataLoader
@@ -27,8 +28,8 @@ trainer = DCNNTrainer(start_epoch=0,
                       learning_rate=0.000001,
                       model_name=args.model,
                       load=args.load_weights,
-                      in_channels=633,
-                      out_classes=4,
+                      in_channels=INPUT_SIZE,
+                      out_classes=MAX_PLAYER_COUNT,
                       batch_size=batch_size,
                       train_size=len(train))
 
@@ -99,9 +99,5 @@ class AI:
         """
         self.largest_region = []
 
-        players_regions = self.board.get_players_regions(self.player_name)
-        max_region_size = max(len(region) for region in players_regions)
-        max_sized_regions = [region for region in players_regions if len(region) == max_region_size]
-
-        self.largest_region = max_sized_regions[0]
-        return max_region_size
+        self.largest_region = self.board.get_largest_region(self.player_name)
+        return len(self.largest_region)
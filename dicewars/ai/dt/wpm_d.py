@@ -185,10 +185,7 @@ class AI:
         int
             score of the player
         """
-        players_regions = self.board.get_players_regions(self.player_name, skip_area=skip_area)
-        max_region_size = max(len(region) for region in players_regions)
-
-        return max_region_size
+        return self.board.get_largest_region_size(self.player_name, skip_area=skip_area)
 
     def get_largest_region(self):
         """Get size of the largest region, including the areas within
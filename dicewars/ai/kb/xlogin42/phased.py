@@ -66,10 +66,6 @@ class FinalAI:
             return EndTurnCommand()
 
     def from_largest_region(self, board, attacks):
-        players_regions = board.get_players_regions(self.player_name)
-        max_region_size = max(len(region) for region in players_regions)
-        max_sized_regions = [region for region in players_regions if len(region) == max_region_size]
-
-        the_largest_region = max_sized_regions[0]
+        the_largest_region = board.get_largest_region(self.player_name)
         self.logger.debug('The largest region: {}'.format(the_largest_region))
         return [attack for attack in attacks if attack[0].get_name() in the_largest_region]
@@ -119,7 +119,7 @@ class MaxN:
         transfers = list()
         for area in board.get_player_areas(current_player):
             if area.get_dice() > 1:
-                neighbours = [board.get_area(name) for name in area.get_adjacent_areas_names()]
+                neighbours = area.get_adjacent_areas()
                 area_transfers = [(area, neighbour) for neighbour in neighbours if neighbour.get_owner_name() == current_player and neighbour.get_dice() < 8]
                 transfers.extend(area_transfers)
         return [transfer for transfer in transfers if self.transfer_heuristic(board, transfer, transfers_done)]
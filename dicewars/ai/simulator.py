@@ -105,8 +105,7 @@ class Simulator:
         return gain
         
     def relevant_borders_filter(self, board: Board, area: Area) -> bool:
-        neighbour_names = area.get_adjacent_areas_names()
-        neighbours = [board.get_area(name) for name in neighbour_names]
+        neighbours = area.get_adjacent_areas()
         return any(area.get_owner_name() == self.player_name for area in neighbours)
 
     def calculate_end_turn_gain(self, board: Board, player: Name, reserves: List[int]) -> int:
@@ -123,8 +122,7 @@ class Simulator:
         return reserves[order]
 
     def get_end_turn_dice_gain(self, board: Board, player: Name) -> int:
-        regions = board.get_players_regions(player)
-        return max(len(region) for region in regions)
+        return board.get_largest_region_size(player)
 
     def save_area_state(self, area: Area) -> Tuple[Name, int]:
         return (area.get_owner_name(), area.get_dice())
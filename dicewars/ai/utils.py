@@ -39,8 +39,7 @@ def probability_of_holding_area(board, area_name, area_dice, player_name):
     """
     area = board.get_area(area_name)
     probability = 1.0
-    for adj in area.get_adjacent_areas_names():
-        adjacent_area = board.get_area(adj)
+    for adjacent_area in area.get_adjacent_areas():
         if adjacent_area.get_owner_name() != player_name:
             enemy_dice = adjacent_area.get_dice()
             if enemy_dice == 1:
@@ -165,10 +164,7 @@ def possible_attacks(board: Board, player_name: int) -> Iterator[Tuple[Area, Are
         if not area.can_attack():
             continue
 
-        neighbours = area.get_adjacent_areas_names()
-
-        for adj in neighbours:
-            adjacent_area = board.get_area(adj)
+        for adjacent_area in area.get_adjacent_areas():
             if adjacent_area.get_owner_name() != player_name:
                 yield (area, adjacent_area)
 
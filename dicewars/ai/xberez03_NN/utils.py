@@ -1,12 +1,14 @@
 import numpy as np
 from typing import Dict, Optional
 
+from dicewars.config import nn_dimensions
 from dicewars.server.area import Area
 from dicewars.server.board import Board
 from dicewars.server.player import Player
 
-MAX_AREA_COUNT = 34
-MAX_PLAYER_COUNT = 4
+MAX_AREA_COUNT, MAX_PLAYER_COUNT = nn_dimensions()
+# adjacency upper triangle, owners, dice and largest regions
+INPUT_SIZE = MAX_AREA_COUNT * (MAX_AREA_COUNT - 1) // 2 + 2 * MAX_AREA_COUNT + MAX_PLAYER_COUNT
 
 def game_configuration(
         board: Board,
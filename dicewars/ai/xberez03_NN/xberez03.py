@@ -202,10 +202,7 @@ class AI:
 
 
     def largest_region(self, player_name: int, board: Board) -> List[int]:
-        players_regions = board.get_players_regions(player_name)
-        max_region_size = max(len(r) for r in players_regions)
-
-        return [r for r in players_regions if len(r) == max_region_size][0]
+        return board.get_largest_region(player_name)
 
     def valid(self, model, data):
         data = torch.unsqueeze(torch.from_numpy(data), 0)
@@ -217,7 +214,8 @@ class AI:
         return torch.squeeze(torch.squeeze(vector, 0), 0)
 
     def load_model(self):
-            model = DCNN(633, 4)
+            from dicewars.ai.xberez03_NN.utils import INPUT_SIZE, MAX_PLAYER_COUNT
+            model = DCNN(INPUT_SIZE, MAX_PLAYER_COUNT)
             checkpoint = torch.load(os.path.join(os.path.dirname(__file__), 'model.pt'))
             state_dict = checkpoint['state_dict']
             unParalled_state_dict = {}
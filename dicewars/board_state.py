@@ -0,0 +1,229 @@
+"""Compact array representation of a game board
+
+The static topology of a board is kept in CSR form: neighbours of the area
+named `a` are `indices[indptr[a]:indptr[a+1]]`. The dynamic part, owner and
+dice of every area, lives in two small arrays. Arrays are indexed directly
+by area names, which start at 1, so index 0 is an unused placeholder owned
+by nobody (player 0).
+
+Copies share the topology, so they only cost the two dynamic arrays.
+The server Game keeps the state of its board in a BoardState updated by
+every move, its snapshots are copies of it.
+"""
+import numpy as np
+
+
+OWNER_DTYPE = np.uint8
+DICE_DTYPE = np.uint8
+INDEX_DTYPE = np.int32
+
+
+class BoardState:
+    """Owner and dice of every area on a board with fixed topology
+    """
+    __slots__ = ('indptr', 'indices', 'owner', 'dice', 'edge_sources')
+
+    def __init__(self, indptr, indices, owner, dice):
+        """
+        Parameters
+        ----------
+        indptr : np.ndarray of int32
+            Offsets of neighbour lists in indices, nb_areas + 2 long
+        indices : np.ndarray of int32
+            Concatenated neighbour lists
+        owner : np.ndarray of uint8
+            Owner of each area, nb_areas + 1 long
+        dice : np.ndarray of uint8
+            Dice in each area, nb_areas + 1 long
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.owner = owner
+        self.dice = dice
+
+        # source area of each entry in indices, for edge-wise computations
+        self.edge_sources = np.repeat(np.arange(len(indptr) - 1, dtype=INDEX_DTYPE), np.diff(indptr))
+
+    @classmethod
+    def from_adjacency(cls, neighbours):
+        """Create a state with no owners and no dice
+
+        Parameters
+        ----------
+        neighbours : dict of int: list of int
+            Names of adjacent areas of each area, names being 1 to N
+
+        Returns
+        -------
+        BoardState
+        """
+        nb_areas = len(neighbours)
+        indptr = np.zeros(nb_areas + 2, dtype=INDEX_DTYPE)
+        for name, adjacent in neighbours.items():
+            indptr[int(name) + 1] = len(adjacent)
+        np.cumsum(indptr, out=indptr)
+
+        indices = np.empty(indptr[-1], dtype=INDEX_DTYPE)
+        for name, adjacent in neighbours.items():
+            name = int(name)
+            indices[indptr[name]:indptr[name + 1]] = sorted(int(n) for n in adjacent)
+
+        owner = np.zeros(nb_areas + 1, dtype=OWNER_DTYPE)
+        dice = np.zeros(nb_areas + 1, dtype=DICE_DTYPE)
+        return cls(indptr, indices, owner, dice)
+
+    @classmethod
+    def from_board(cls, board):
+        """Create a state of a server or client board
+
+        Parameters
+        ----------
+        board : dicewars.server.board.Board or dicewars.client.game.board.Board
+
+        Returns
+        -------
+        BoardState
+        """
+        areas = list(board.areas.values())
+        state = cls.from_adjacency({area.get_name(): area.get_adjacent_areas_names() for area in areas})
+        for area in areas:
+            state.owner[area.get_name()] = area.get_owner_name() or 0
+            state.dice[area.get_name()] = area.get_dice()
+        return state
+
+    def copy(self):
+        """Copy the dynamic part of the state, sharing the topology
+
+        Returns
+        -------
+        BoardState
+        """
+        state = BoardState.__new__(BoardState)
+        state.indptr = self.indptr
+        state.indices = self.indices
+        state.edge_sources = self.edge_sources
+        state.owner = self.owner.copy()
+        state.dice = self.dice.copy()
+        return state
+
+    def key(self):
+        """Get a hashable summary of owners and dice
+
+        States of the same board are equal iff their keys are.
+
+        Returns
+        -------
+        bytes
+        """
+        return self.owner.tobytes() + self.dice.tobytes()
+
+    def get_number_of_areas(self):
+        return len(self.owner) - 1
+
+    def neighbours(self, name):
+        """Get names of areas adjacent to the given one
+
+        Returns
+        -------
+        np.ndarray of int32
+        """
+        return self.indices[self.indptr[name]:self.indptr[name + 1]]
+
+    def player_areas(self, player):
+        """Get names of areas owned by a player
+
+        Returns
+        -------
+        np.ndarray of int
+        """
+        return np.flatnonzero(self.owner == player)
+
+    def border_mask(self):
+        """Tell for every area whether it neighbours an area of another owner
+
+        Returns
+        -------
+        np.ndarray of bool
+        """
+        foreign = self.owner[self.edge_sources] != self.owner[self.indices]
+        return np.bincount(self.edge_sources[foreign], minlength=len(self.owner)) > 0
+
+    def player_border(self, player):
+        """Get names of player's areas neighbouring areas of other players
+
+        Returns
+        -------
+        np.ndarray of int
+        """
+        return np.flatnonzero(self.border_mask() & (self.owner == player))
+
+    def dice_per_player(self, nb_players):
+        """Get total number of dice of every player
+
+        Returns
+        -------
+        np.ndarray of int
+            Indexed by player names, index 0 standing for areas owned by nobody
+        """
+        return np.bincount(self.owner, weights=self.dice, minlength=nb_players + 1).astype(int)
+
+    def areas_per_player(self, nb_players):
+        """Get number of areas of every player
+
+        Returns
+        -------
+        np.ndarray of int
+            Indexed by player names, index 0 standing for areas owned by nobody
+        """
+        counts = np.bincount(self.owner, minlength=nb_players + 1)
+        counts[0] -= 1  # the placeholder
+        return counts
+
+    def region_labels(self):
+        """Label areas by regions (connected areas of the same owner)
+
+        Returns
+        -------
+        np.ndarray of int32
+            For every area, the smallest name of an area in its region
+        """
+        labels = np.arange(len(self.owner), dtype=INDEX_DTYPE)
+        same_owner = self.owner[self.edge_sources] == self.owner[self.indices]
+        sources = self.edge_sources[same_owner]
+        targets = self.indices[same_owner]
+
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, sources, labels[targets])
+            # pointer jumping makes the propagation logarithmic in region diameter
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                return labels
+
+    def player_regions(self, player):
+        """Get regions of a player
+
+        Returns
+        -------
+        list of np.ndarray of int
+            Names of areas in every region of the player
+        """
+        labels = self.region_labels()
+        names = self.player_areas(player)
+        return [names[labels[names] == label] for label in np.unique(labels[names])]
+
+    def largest_regions(self, nb_players):
+        """Get size of the largest region of every player
+
+        Returns
+        -------
+        np.ndarray of int
+            Indexed by player names, index 0 being unused
+        """
+        labels = self.region_labels()
+        sizes = np.bincount(labels[1:], minlength=len(self.owner))
+        roots = np.flatnonzero(sizes)
+        largest = np.zeros(nb_players + 1, dtype=int)
+        np.maximum.at(largest, self.owner[roots], sizes[roots])
+        largest[0] = 0
+        return largest
@@ -1,5 +1,3 @@
-import copy
-import json
 from json.decoder import JSONDecodeError
 import logging
 import signal
@@ -60,8 +58,8 @@ class AIDriver:
 
         self.ai_disabled = False
         try:
-            board_copy = copy.deepcopy(self.board)
-            players_order_copy = copy.deepcopy(self.game.players_order)
+            board_copy = self.board.clone()
+            players_order_copy = list(self.game.players_order)
             with FixedTimer(time_limit_constructor):
                 self.ai = ai_constructor(
                     self.player_name,
@@ -100,34 +98,44 @@ class AIDriver:
             self.current_player_name = game.current_player.get_name()
 
             if self.current_player_name == self.player_name and not self.waitingForResponse:
-                if self.ai_disabled:
-                    self.logger.warning("The AI has already misbehaved, just end-turning.")
-                    self.send_message('end_turn')
-                    continue
-
-                try:
-                    board_copy = copy.deepcopy(self.board)
-                    with self.timer as time_left:
-                        command = self.ai.ai_turn(
-                            board_copy,
-                            self.moves_this_turn,
-                            self.transfers_this_turn,
-                            self.turns_finished,
-                            time_left
-                        )
-                    self.process_command(command)
-                except TimeoutError:
-                    self.logger.warning("Forced 'end_turn' because of timeout")
-                    self.send_message('end_turn')
-                    self.time_left_last_time = -1.0
-                except Exception:
-                    self.logger.error("The AI crashed during attempt to make a move:\n", exc_info=True)
-                    self.send_message('end_turn')
-                    self.ai_disabled = True
+                self.play_turn()
 
-                if not self.waitingForResponse:
-                    self.logger.warning("Forced 'end_turn' because the implementation did nothing")
-                    self.send_message('end_turn')
+    def play_turn(self):
+        """Let the AI decide on a single move and send it to the server
+        """
+        if self.game.state_stale:
+            self.logger.warning("Game state is out of sync, requesting a full one.")
+            self.send_message('state_request')
+            return
+
+        if self.ai_disabled:
+            self.logger.warning("The AI has already misbehaved, just end-turning.")
+            self.send_message('end_turn')
+            return
+
+        try:
+            board_copy = self.board.clone()
+            with self.timer as time_left:
+                command = self.ai.ai_turn(
+                    board_copy,
+                    self.moves_this_turn,
+                    self.transfers_this_turn,
+                    self.turns_finished,
+                    time_left
+                )
+            self.process_command(command)
+        except TimeoutError:
+            self.logger.warning("Forced 'end_turn' because of timeout")
+            self.send_message('end_turn')
+            self.time_left_last_time = -1.0
+        except Exception:
+            self.logger.error("The AI crashed during attempt to make a move:\n", exc_info=True)
+            self.send_message('end_turn')
+            self.ai_disabled = True
+
+        if not self.waitingForResponse:
+            self.logger.warning("Forced 'end_turn' because the implementation did nothing")
+            self.send_message('end_turn')
 
     def handle_server_message(self, msg):
         """Process message from the server
@@ -151,6 +159,10 @@ class AIDriver:
             self.game.process_end_turn_msg(msg)
             self.waitingForResponse = False
 
+        elif msg['type'] == 'game_state':
+            self.game.process_game_state_msg(msg)
+            self.waitingForResponse = False
+
         elif msg['type'] == 'game_end':
             self.logger.info("Player {} has won".format(msg['winner']))
             self.game.socket.close()
@@ -210,16 +222,23 @@ class AIDriver:
             self.moves_this_turn = 0
             self.transfers_this_turn = 0
             self.turns_finished += 1
+        elif type == 'state_request':
+            msg = {'type': 'state_request'}
+            self.logger.debug("Sending state_request message.")
         else:
             raise RuntimeError("Attempt to send unexpected message type {}".format(type))
 
         self.waitingForResponse = True
+        self.deliver(msg)
 
-        try:
-            self.game.socket.send(str.encode(json.dumps(msg)))
-        except BrokenPipeError:
-            self.logger.error("Connection to server broken.")
-            exit(1)
+    def deliver(self, msg):
+        """Hand a message over to the server
+
+        Parameters
+        ----------
+        msg : dict
+        """
+        self.game.transmit(msg)
 
     def battle_is_valid(self, battle):
         try:
@@ -4,6 +4,9 @@ from typing import List
 
 class Area:
     """Game board area
+
+    Changes of the owner and dice, including direct assignments
+    to owner_name and dice, are reported to the Board the Area is on.
     """
     def __init__(self, name, owner, dice, neighbours, hexes):
         """
@@ -17,20 +20,67 @@ class Area:
             Hex coordinates of for all Area's hexes
         """
         self.name = int(name)
-        self.owner_name = int(owner)
-        self.dice = int(dice)
+        self._owner_name = int(owner)
+        self._dice = int(dice)
         self.neighbours = [int(n) for n in neighbours]
-        self.hexes = [[int(i) for i in h] for h in hexes]
+        self.hexes = tuple((int(h[0]), int(h[1])) for h in hexes)
+        self.board = None
+        self.adjacent_areas = []
+
+    @property
+    def owner_name(self) -> int:
+        return self._owner_name
+
+    @owner_name.setter
+    def owner_name(self, owner_name: int) -> None:
+        previous_owner = self._owner_name
+        self._owner_name = owner_name
+        if self.board is not None:
+            self.board.update_owner(self, previous_owner)
+
+    @property
+    def dice(self) -> int:
+        return self._dice
+
+    @dice.setter
+    def dice(self, dice: int) -> None:
+        previous_dice = self._dice
+        self._dice = dice
+        if self.board is not None:
+            self.board.update_dice(self, previous_dice)
+
+    def copy(self) -> 'Area':
+        """Return a copy of the Area
+
+        Hex coordinates are immutable and shared with the copy,
+        which is not on any Board.
+        """
+        area = Area.__new__(Area)
+        area.name = self.name
+        area._owner_name = self._owner_name
+        area._dice = self._dice
+        area.neighbours = list(self.neighbours)
+        area.hexes = self.hexes
+        area.board = None
+        area.adjacent_areas = []
+        return area
 
     def get_adjacent_areas_names(self) -> List[int]:
         """Return names of adjacent areas
         """
         return self.neighbours
 
+    def get_adjacent_areas(self) -> List['Area']:
+        """Return adjacent Areas
+
+        Available once the Area is on a Board.
+        """
+        return self.adjacent_areas
+
     def get_dice(self) -> int:
         """Return number of dice in the Area
         """
-        return self.dice
+        return self._dice
 
     def get_name(self) -> int:
         """Return Area's name
@@ -40,12 +90,12 @@ class Area:
     def get_owner_name(self) -> int:
         """Return Area's owner's name
         """
-        return self.owner_name
+        return self._owner_name
 
     def can_attack(self) -> bool:
         """Return True if area has enough dice to attack
         """
-        return self.dice >= 2
+        return self._dice >= 2
 
     def set_dice(self, dice: int) -> None:
         """Set area's dice
@@ -1,9 +1,32 @@
 from .area import Area
-from typing import List, Optional
+from .regions import RegionEngine
+from typing import Dict, List, Optional, Set
 
 
 class Board:
     """Game board
+
+    Areas, border Areas and dice of every player are kept up to date
+    as Areas change their owners and dice, so that queries about players
+    do not scan the whole board.
+
+    Attributes
+    ----------
+    areas : dict of int: Area
+        Areas in the order of the board, by their names
+    player_areas : dict of int: set of int
+        Names of Areas of every player owning any
+    player_borders : dict of int: set of int
+        Names of Areas of every player which border other players' Areas
+    ordered_areas, ordered_borders : dict of int: list of int
+        Names from player_areas and player_borders in the order of the board,
+        sorted when first asked for and kept until the player gains or loses an Area
+    player_dice : dict of int: int
+        Number of all dice of every player owning any Area
+    foreign_neighbours : dict of int: int
+        Number of neighbours of every Area owned by another player
+    region_engine : RegionEngine
+        Regions of players, recomputed only for players whose Areas changed
     """
     def __init__(self, areas, board):
         """
@@ -14,81 +37,251 @@ class Board:
         board : dict
             Dictionary describing the game's board
         """
-        self.areas = {}
+        self.areas: Dict[int, Area] = {}
         for area in areas:
-            self.areas[area] = Area(area, areas[area]['owner'], areas[area]['dice'],
-                                    board[area]['neighbours'], board[area]['hexes'])
+            self.areas[int(area)] = Area(area, areas[area]['owner'], areas[area]['dice'],
+                                         board[area]['neighbours'], board[area]['hexes'])
+        self.link_areas()
+        self.position = {name: i for i, name in enumerate(self.areas)}
+
+        self.player_areas: Dict[int, Set[int]] = {}
+        self.player_borders: Dict[int, Set[int]] = {}
+        self.player_dice: Dict[int, int] = {}
+        self.foreign_neighbours: Dict[int, int] = {}
+        self.ordered_areas: Dict[int, List[int]] = {}
+        self.ordered_borders: Dict[int, List[int]] = {}
+        for area in self.areas.values():
+            owner = area.get_owner_name()
+            self.player_areas.setdefault(owner, set()).add(area.get_name())
+            self.player_borders.setdefault(owner, set())
+            self.player_dice[owner] = self.player_dice.get(owner, 0) + area.get_dice()
+        for area in self.areas.values():
+            self.foreign_neighbours[area.get_name()] = sum(
+                neighbour.get_owner_name() != area.get_owner_name() for neighbour in area.get_adjacent_areas()
+            )
+            self.update_border(area)
+
+        self.region_engine = RegionEngine(self.position, [
+            [self.position[name] for name in area.get_adjacent_areas_names()]
+            for area in self.areas.values()
+        ])
+
+    def link_areas(self) -> None:
+        """Put Areas on the Board and resolve their neighbours to Areas
+        """
+        for area in self.areas.values():
+            area.board = self
+            area.adjacent_areas = [self.areas[name] for name in area.get_adjacent_areas_names()]
 
-    def get_area(self, idx: int):
+    def clone(self) -> 'Board':
+        """Return a copy of the Board
+
+        Owners, dice and neighbours of Areas are copied, so that changes
+        to the copy do not affect the Board, but hexes are shared.
+        This is much cheaper than copy.deepcopy(), which is implemented by it.
+        """
+        board = Board.__new__(Board)
+        board.areas = {name: area.copy() for name, area in self.areas.items()}
+        board.link_areas()
+        board.position = self.position
+        board.player_areas = {player: set(names) for player, names in self.player_areas.items()}
+        board.player_borders = {player: set(names) for player, names in self.player_borders.items()}
+        board.player_dice = dict(self.player_dice)
+        board.foreign_neighbours = dict(self.foreign_neighbours)
+        board.ordered_areas = dict(self.ordered_areas)
+        board.ordered_borders = dict(self.ordered_borders)
+        board.region_engine = self.region_engine.copy()
+        return board
+
+    def __deepcopy__(self, memo):
+        board = self.clone()
+        memo[id(self)] = board
+        return board
+
+    def get_area(self, idx: int) -> Area:
         """Get Area given its name
+
+        The name may also be given as a string, as in messages of the server.
+
+        Raises
+        ------
+        KeyError
+            If there is no Area of the name
+        """
+        area = self.areas.get(idx)
+        if area is None:
+            try:
+                area = self.areas.get(int(idx))
+            except (TypeError, ValueError):
+                pass
+            if area is None:
+                raise KeyError(idx)
+        return area
+
+    def get_adjacent_areas(self, idx: int) -> List[Area]:
+        """Get Areas adjacent to an Area given its name
+        """
+        return self.get_area(idx).get_adjacent_areas()
+
+    def update_owner(self, area: Area, previous_owner: int) -> None:
+        """Account for a change of the owner of an Area
+
+        Called by the Area, takes time proportional to its number of neighbours.
+        """
+        name = area.get_name()
+        owner = area.get_owner_name()
+        if owner == previous_owner:
+            return
+
+        for player_name in (previous_owner, owner):
+            self.region_engine.invalidate(player_name)
+            self.ordered_areas.pop(player_name, None)
+            self.ordered_borders.pop(player_name, None)
+        self.remove_player_area(previous_owner, name, area.get_dice())
+        self.player_areas.setdefault(owner, set()).add(name)
+        self.player_borders.setdefault(owner, set())
+        self.player_dice[owner] = self.player_dice.get(owner, 0) + area.get_dice()
+
+        foreign_neighbours = 0
+        for neighbour in area.get_adjacent_areas():
+            neighbour_owner = neighbour.get_owner_name()
+            foreign_neighbours += neighbour_owner != owner
+            change = (neighbour_owner != owner) - (neighbour_owner != previous_owner)
+            if change:
+                self.foreign_neighbours[neighbour.get_name()] += change
+                self.update_border(neighbour)
+        self.foreign_neighbours[name] = foreign_neighbours
+        self.update_border(area)
+
+    def update_dice(self, area: Area, previous_dice: int) -> None:
+        """Account for a change of dice of an Area
+
+        Called by the Area.
+        """
+        self.player_dice[area.get_owner_name()] += area.get_dice() - previous_dice
+
+    def remove_player_area(self, player_name: int, area_name: int, dice: int) -> None:
+        areas = self.player_areas[player_name]
+        areas.discard(area_name)
+        self.player_borders[player_name].discard(area_name)
+        self.player_dice[player_name] -= dice
+        if not areas:
+            del self.player_areas[player_name]
+            del self.player_borders[player_name]
+            del self.player_dice[player_name]
+
+    def update_border(self, area: Area) -> None:
+        if self.foreign_neighbours[area.get_name()]:
+            self.player_borders[area.get_owner_name()].add(area.get_name())
+        else:
+            self.player_borders[area.get_owner_name()].discard(area.get_name())
+
+    def get_areas_in_order(self, player_name: int, names: Dict[int, Set[int]],
+                           ordered: Dict[int, List[int]]) -> List[Area]:
+        """Get Areas of a player in the order of the board
+
+        Names of the Areas are sorted only if they are not in ordered yet,
+        otherwise this takes time proportional to the number of Areas.
+        The ordered lists are shared with clones and must not be modified.
         """
-        return self.areas[str(idx)]
+        ordered_names = ordered.get(player_name)
+        if ordered_names is None:
+            ordered_names = sorted(names.get(player_name, ()), key=self.position.__getitem__)
+            ordered[player_name] = ordered_names
+        areas = self.areas
+        return [areas[name] for name in ordered_names]
 
     def get_player_areas(self, player_name: int) -> List[Area]:
         """Get all Areas belonging to a player
         """
-        return [area for area in self.areas.values() if area.get_owner_name() == player_name]
+        return self.get_areas_in_order(player_name, self.player_areas, self.ordered_areas)
 
     def get_player_border(self, player_name: int) -> List[Area]:
         """Get all Areas belonging to a player which border other players' Areas
         """
-        return [area for area in self.get_player_areas(player_name) if self.is_at_border(area)]
+        return self.get_areas_in_order(player_name, self.player_borders, self.ordered_borders)
 
     def get_player_dice(self, player_name: int) -> int:
         """Get the number of all dice of a given player
         """
-        return sum([area.get_dice() for area in self.get_player_areas(player_name)])
+        return self.player_dice.get(player_name, 0)
 
     def get_players_regions(self, player_name: int, skip_area: Optional[int] = None) -> List[List[int]]:
         """Get all unbroken regions belonging to a player.
 
         Returns them as a list of regions, where every region a list of names of area in the region.
         If skip_area is given, it is treated as not belonging to the player.
+        Regions come in the order of their first areas on the board, areas of a region in the order of the board.
         """
-        area_names_to_test = [area.get_name() for area in self.get_player_areas(player_name) if area.get_name() != skip_area]
-
-        if not area_names_to_test:
+        regions = self.get_regions(player_name, skip_area)
+        if not regions:
             return [[]]
+        return [list(region) for region in regions]
+
+    def get_regions(self, player_name: int, skip_area: Optional[int] = None) -> List[List[int]]:
+        """Get regions of a player as get_players_regions(), but no regions if the player has no areas
+
+        The lists are shared with the region engine and must not be modified.
+        """
+        area_names = self.player_areas.get(player_name, ())
+        if skip_area is not None and int(skip_area) in area_names:
+            return self.region_engine.get_regions_without(player_name, area_names, int(skip_area))
+        return self.region_engine.get_regions(player_name, area_names)
+
+    def get_largest_region(self, player_name: int, skip_area: Optional[int] = None) -> List[int]:
+        """Get names of areas of the first of the largest regions of a player
 
-        regions = []
-        while area_names_to_test:
-            area_names_in_current_region = self.get_areas_region(area_names_to_test[0], area_names_to_test)
-            assert(len(area_names_in_current_region) > 0)
-            regions.append(area_names_in_current_region)
+        If skip_area is given, it is treated as not belonging to the player.
+        """
+        regions = self.get_regions(player_name, skip_area)
+        if not regions:
+            return []
+        return list(max(regions, key=len))
+
+    def get_largest_region_size(self, player_name: int, skip_area: Optional[int] = None) -> int:
+        """Get the number of areas in the largest region of a player
 
-            for area in area_names_in_current_region:
-                area_names_to_test.remove(area)
+        If skip_area is given, it is treated as not belonging to the player,
+        which only splits the region of the area again.
+        """
+        return max((len(region) for region in self.get_regions(player_name, skip_area)), default=0)
+
+    def get_largest_region_size_if_gained(self, player_name: int, area_name: int) -> int:
+        """Get the number of areas in the largest region of a player if it gained an area
 
-        return regions
+        Only sizes of the regions around the area are summed.
+        """
+        area_names = self.player_areas.get(player_name, ())
+        largest_region_size = self.get_largest_region_size(player_name)
+        if int(area_name) in area_names:
+            return largest_region_size
+        gained_region_size = self.region_engine.get_gained_region_size(player_name, area_names, int(area_name))
+        return max(largest_region_size, gained_region_size)
 
     def get_areas_region(self, area_name: int, available_areas: List[int]) -> List[int]:
         """Get all areas from available_areas which are in the same region as the given one.
 
         Returns them as a list of regions, where every region a list of names of area in the region.
         """
-        to_test = {area_name}
-        current_region = []
+        available_areas = set(available_areas)
+        to_test = [area_name]
+        current_region = [area_name]
+        in_region = {area_name}
 
         while to_test:
             current_area = to_test.pop()
-
-            if current_area in current_region:
-                continue
-
-            current_region.append(current_area)
-
             for neighbour_name in self.get_area(current_area).get_adjacent_areas_names():
-                if neighbour_name in current_region:
-                    continue
-                if neighbour_name in current_region:
-                    continue
-
-                if neighbour_name in available_areas:
-                    to_test.add(neighbour_name)
+                if neighbour_name in available_areas and neighbour_name not in in_region:
+                    in_region.add(neighbour_name)
+                    current_region.append(neighbour_name)
+                    to_test.append(neighbour_name)
 
         return current_region
 
     def is_at_border(self, area: Area) -> bool:
+        if area.board is self:
+            return self.foreign_neighbours[area.get_name()] > 0
+
         owner = area.get_owner_name()
         neighbourhood_names = area.get_adjacent_areas_names()
 
@@ -100,4 +293,4 @@ class Board:
         return False
 
     def nb_players_alive(self) -> int:
-        return len(set(area.get_owner_name() for area in self.areas.values()))
+        return len(self.player_areas)
@@ -25,4 +25,4 @@ class StaticGame:
 
 
 def player_score(board, player_name):
-    return max([len(r) for r in board.get_players_regions(player_name)])
+    return board.get_largest_region_size(player_name)
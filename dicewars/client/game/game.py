@@ -1,11 +1,11 @@
 import json
 import logging
 import socket
-from queue import Queue
 from time import sleep
 
 from .board import Board
 from .player import Player
+from dicewars import protocol
 from dicewars.client.socket_listener import SocketListener
 
 
@@ -20,11 +20,15 @@ class Game:
             Server address
         port : int
             Server port
+        hello_msg : dict
+            Description of the client, its 'protocol' ('json' by default
+            or 'binary') is used for all the following messages
         """
         self.logger = logging.getLogger('CLIENT')
 
         self.buffer = 65535
         self.battle_in_progress = False
+        self.protocol = hello_msg.get('protocol', 'json')
 
         self.server_address = addr
         self.server_port = port
@@ -48,19 +52,12 @@ class Game:
             self.logger.error("Connection to server broken.")
             exit(1)
 
-        self.start_socket_daemon()
-        while self.input_queue.empty():
-            pass
+        self.start_socket_listener()
         msg = self.input_queue.get()
 
         self.logger.debug("Received message: {0}\n".format(msg))  # TODO
         if msg['type'] == 'game_start':
-            self.player_name = msg['player']
-            self.add_players(int(msg['no_players']), msg['score'])
-            self.board = Board(msg['areas'], msg['board'])
-            self.current_player = self.players[msg['current_player']]
-            self.current_player_name = msg['current_player']
-            self.players_order = msg['order']
+            self.process_game_start_msg(msg)
         else:
             self.logger.error("Did not receive game state from server.")
             exit(1)
@@ -116,8 +113,20 @@ class Game:
             msg = {'type': 'end_turn'}
             self.logger.debug("Sending end_turn message.")
 
+        self.transmit(msg)
+
+    def transmit(self, msg):
+        """Encode message according to the protocol in use and send it to the server
+
+        Parameters
+        ----------
+        msg : dict
+        """
         try:
-            self.socket.send(str.encode(json.dumps(msg)))
+            if self.protocol == 'binary':
+                self.socket.sendall(protocol.encode_message(msg))
+            else:
+                self.socket.send(str.encode(json.dumps(msg)))
         except BrokenPipeError:
             self.logger.error("Connection to server broken.")
             exit(1)
@@ -128,35 +137,79 @@ class Game:
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.socket.connect((self.server_address, self.server_port))
 
-    def start_socket_daemon(self):
-        """Start message collecting daemon
+    def start_socket_listener(self):
+        """Set up collecting of messages
+
+        Messages are taken from input_queue, which reads them from the socket
+        on demand, so that the client runs on a single thread.
+        """
+        self.input_queue = SocketListener(self.socket, self.buffer, self.protocol)
+
+    def process_game_start_msg(self, msg):
+        assert msg['type'] == 'game_start'
+
+        self.player_name = msg['player']
+        self.add_players(int(msg['no_players']), msg['score'])
+        self.board = Board(msg['areas'], msg['board'])
+        self.current_player = self.players[msg['current_player']]
+        self.current_player_name = msg['current_player']
+        self.players_order = msg['order']
+        self.state_version = msg['version']
+        self.state_stale = False
+
+    def process_game_state_msg(self, msg):
+        assert msg['type'] == 'game_state'
+
+        for name, area_data in msg['areas'].items():
+            area = self.board.get_area(name)
+            area.set_owner(area_data['owner'])
+            area.set_dice(area_data['dice'])
+
+        self.update_scores(msg['score'])
+        for i, player in self.players.items():
+            player.set_reserve(msg['reserves'][str(i)])
+
+        self.current_player_name = msg['current_player']
+        self.current_player = self.players[msg['current_player']]
+        self.state_version = msg['version']
+        self.state_stale = False
+
+    def check_state_version(self, msg):
+        """Check that no update of the game state has been missed
+
+        If one was, the state is marked stale and a full one should be requested.
         """
-        self.input_queue = Queue()
-        self.socket_listener = SocketListener(self.socket, self.buffer, self.input_queue)
-        self.socket_listener.daemon = True
-        self.socket_listener.start()
-        self.logger.debug("Started socket daemon.")
+        if msg['version'] != self.state_version + 1:
+            self.logger.warning("Got state version {} after version {}".format(msg['version'], self.state_version))
+            self.state_stale = True
+        self.state_version = msg['version']
+
+    def update_scores(self, scores):
+        """Set scores of players listed in a server message
+        """
+        for name, score in scores.items():
+            self.players[int(name)].set_score(score)
 
     def process_battle_msg(self, msg):
         assert msg['type'] == 'battle'
+        self.check_state_version(msg)
 
         atk_data = msg['result']['atk']
         def_data = msg['result']['def']
         attacker = self.board.get_area(str(atk_data['name']))
         attacker.set_dice(atk_data['dice'])
-        atk_name = attacker.get_owner_name()
 
         defender = self.board.get_area(def_data['name'])
         defender.set_dice(def_data['dice'])
-        def_name = defender.get_owner_name()
 
         if def_data['owner'] == atk_data['owner']:
             defender.set_owner(atk_data['owner'])
-            self.players[atk_name].set_score(msg['score'][str(atk_name)])
-            self.players[def_name].set_score(msg['score'][str(def_name)])
+
+        self.update_scores(msg['score'])
 
     def process_transfer_msg(self, msg):
         assert msg['type'] == 'transfer'
+        self.check_state_version(msg)
 
         src_data = msg['result']['src']
         source = self.board.get_area(str(src_data['name']))
@@ -168,6 +221,7 @@ class Game:
 
     def process_end_turn_msg(self, msg):
         assert msg['type'] == 'end_turn'
+        self.check_state_version(msg)
 
         current_player = self.players[self.current_player_name]
 
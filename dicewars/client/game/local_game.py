@@ -0,0 +1,25 @@
+import logging
+
+from .game import Game
+
+
+class LocalGame(Game):
+    """Represantation of the game state fed directly by an in-process server
+
+    Unlike Game, it does not connect to a server. All messages,
+    including the initial game_start one, are handed over by the caller.
+    """
+    def __init__(self, game_start_msg):
+        """
+        Parameters
+        ----------
+        game_start_msg : dict
+            Decoded game_start message of the server
+        """
+        self.logger = logging.getLogger('CLIENT')
+
+        self.battle_in_progress = False
+        self.socket = None
+        self.players = {}
+
+        self.process_game_start_msg(game_start_msg)
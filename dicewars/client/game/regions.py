@@ -0,0 +1,144 @@
+from typing import Dict, Iterable, List
+
+
+class RegionEngine:
+    """Regions of players on a Board
+
+    A region is a maximal set of connected Areas of a player. Regions of
+    a player are found by a disjoint-set forest over Areas numbered by their
+    position on the board and kept until the player gains or loses an Area.
+    Scratch buffers of the forest are allocated once and shared by clones
+    of the Board, as nothing is left in them between computations.
+    """
+    def __init__(self, positions: Dict[int, int], neighbours: List[List[int]]):
+        """
+        Parameters
+        ----------
+        positions : dict of int: int
+            Position of every Area on the board, by name, in the order of positions
+        neighbours : list of list of int
+            Positions of neighbours of every Area
+        """
+        self.positions = positions
+        self.names = list(positions)
+        self.neighbours = neighbours
+        self.parent = list(range(len(self.names)))
+        self.size = [1] * len(self.names)
+        self.owned = [False] * len(self.names)
+        self.regions: Dict[int, List[List[int]]] = {}
+        self.region_of: Dict[int, Dict[int, int]] = {}
+
+    def copy(self) -> 'RegionEngine':
+        """Return an engine for a clone of the Board, sharing scratch buffers
+        """
+        engine = RegionEngine.__new__(RegionEngine)
+        engine.positions = self.positions
+        engine.names = self.names
+        engine.neighbours = self.neighbours
+        engine.parent = self.parent
+        engine.size = self.size
+        engine.owned = self.owned
+        engine.regions = dict(self.regions)
+        engine.region_of = dict(self.region_of)
+        return engine
+
+    def invalidate(self, player_name: int) -> None:
+        """Forget regions of a player whose Areas have changed
+        """
+        self.regions.pop(player_name, None)
+        self.region_of.pop(player_name, None)
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def components(self, positions: List[int]) -> List[List[int]]:
+        """Split Areas into connected components
+
+        Parameters
+        ----------
+        positions : list of int
+            Positions of Areas
+
+        Returns
+        -------
+        list of list of int
+            Positions of Areas of every component in increasing order,
+            components ordered by their first Area
+        """
+        parent, size, owned = self.parent, self.size, self.owned
+        for i in positions:
+            parent[i] = i
+            size[i] = 1
+            owned[i] = True
+
+        for i in positions:
+            for j in self.neighbours[i]:
+                if not owned[j] or j < i:
+                    continue
+                root_i, root_j = self.find(i), self.find(j)
+                if root_i == root_j:
+                    continue
+                if size[root_i] < size[root_j]:
+                    root_i, root_j = root_j, root_i
+                parent[root_j] = root_i
+                size[root_i] += size[root_j]
+
+        components: Dict[int, List[int]] = {}
+        for i in sorted(positions):
+            components.setdefault(self.find(i), []).append(i)
+            owned[i] = False
+        return list(components.values())
+
+    def get_regions(self, player_name: int, area_names: Iterable[int]) -> List[List[int]]:
+        """Get regions of a player
+
+        Parameters
+        ----------
+        player_name : int
+        area_names : iterable of int
+            Names of all Areas of the player, used if the regions are not known
+
+        Returns
+        -------
+        list of list of int
+            Names of Areas of every region, not to be modified
+        """
+        regions = self.regions.get(player_name)
+        if regions is None:
+            positions = [self.positions[name] for name in area_names]
+            regions = [[self.names[i] for i in component] for component in self.components(positions)]
+            self.regions[player_name] = regions
+            self.region_of[player_name] = {name: r for r, region in enumerate(regions) for name in region}
+        return regions
+
+    def get_regions_without(self, player_name: int, area_names: Iterable[int], area_name: int) -> List[List[int]]:
+        """Get regions of a player as if it lost an Area it owns
+
+        Only the region of the Area is split again.
+
+        Returns
+        -------
+        list of list of int
+            Names of Areas of every region, ordered as by get_regions()
+        """
+        regions = self.get_regions(player_name, area_names)
+        lost_region = self.region_of[player_name][area_name]
+        pieces = self.components([self.positions[name] for name in regions[lost_region] if name != area_name])
+
+        result = regions[:lost_region] + regions[lost_region + 1:]
+        result.extend([self.names[i] for i in piece] for piece in pieces)
+        result.sort(key=lambda region: self.positions[region[0]])
+        return result
+
+    def get_gained_region_size(self, player_name: int, area_names: Iterable[int], area_name: int) -> int:
+        """Get size of the region an Area not owned by a player would be in if the player gained it
+        """
+        regions = self.get_regions(player_name, area_names)
+        region_of = self.region_of[player_name]
+        joined = {region_of.get(self.names[j]) for j in self.neighbours[self.positions[area_name]]}
+        joined.discard(None)
+        return 1 + sum(len(regions[r]) for r in joined)
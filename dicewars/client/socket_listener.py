@@ -1,54 +1,220 @@
-import sys
+from collections import deque
 import logging
+from queue import Empty
+import selectors
+from time import monotonic, perf_counter
 
 from json import loads
-from threading import Thread
 from json import JSONDecodeError
 
+from dicewars.protocol import FrameDecoder
 
-class SocketListener(Thread):
-    """Daemon for collecting messages from the server
+
+class JsonDecoder:
+    """Incremental decoder of a stream of null-terminated JSON messages
+
+    Data is kept as bytes, so a character split between two pieces is
+    only decoded once complete. The search for a terminator continues
+    where the previous one stopped and every message is parsed exactly once.
     """
-    def __init__(self, sock, buffer, queue):
+    def __init__(self):
+        self.logger = logging.getLogger('SOCKET')
+        self.buffer = bytearray()
+        self.offset = 0
+        self.scanned = 0
+
+    def feed(self, data):
+        """Append received data to the stream
+        """
+        if self.offset and self.offset == len(self.buffer):
+            self.buffer.clear()
+            self.offset = 0
+            self.scanned = 0
+        self.buffer += data
+
+    def next_message(self):
+        """Decode the next complete message
+
+        Messages that are not valid JSON are logged and skipped.
+
+        Returns
+        -------
+        dict or None
+            None if no complete message is available yet
+        """
+        while True:
+            end = self.buffer.find(b'\0', self.scanned)
+            if end < 0:
+                self.scanned = len(self.buffer)
+                return None
+
+            start = self.offset
+            self.offset = self.scanned = end + 1
+            if end == start:
+                continue
+
+            try:
+                msg = loads(self.buffer[start:end].decode('utf-8'))
+            except (JSONDecodeError, UnicodeDecodeError) as e:
+                self.logger.warning("Invalid message from server: {}\nmsg: {}".format(e, self.buffer[start:end]))
+                continue
+
+            if self.offset > len(self.buffer) // 2:
+                del self.buffer[:self.offset]
+                self.scanned -= self.offset
+                self.offset = 0
+            return msg
+
+    def messages(self):
+        """Decode all complete messages
+        """
+        while True:
+            msg = self.next_message()
+            if msg is None:
+                return
+            yield msg
+
+
+class SocketListener:
+    """Collector of messages from the server
+
+    Messages are read, framed and decoded on the thread asking for them,
+    which waits for the server in select() rather than polling.
+    It offers the get() and empty() methods of a queue.Queue, so that
+    consumers take messages from it as from a queue filled by a thread.
+
+    Attributes
+    ----------
+    bytes_received : int
+    messages_received : int
+    nb_reads : int
+        Number of reads from the socket
+    decoding_time : float
+        Seconds spent decoding messages
+    """
+    def __init__(self, sock, buffer, protocol='json'):
         """
         Parameters
         ----------
         sock : socket
         buffer : int
-        queue : Queue
-            Queue of incoming messages
+            Largest number of bytes read at once
+        protocol : str
+            'json' for null-terminated JSON messages, 'binary' for frames
         """
-        Thread.__init__(self)
         self.logger = logging.getLogger('SOCKET')
 
         self.socket = sock
-        self.queue = queue
         self.buffer = buffer
+        self.protocol = protocol
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(sock, selectors.EVENT_READ)
+        self.messages = deque()
+        self.closed = False
+
+        self.decoder = FrameDecoder() if protocol == 'binary' else JsonDecoder()
+
+        self.bytes_received = 0
+        self.messages_received = 0
+        self.nb_reads = 0
+        self.decoding_time = 0.0
 
-    def run(self):
-        """Collect messages from the server
+    def empty(self):
+        """Check for a message without waiting for one
+
+        Returns
+        -------
+        bool
+            True if no message has been received
         """
-        buffer = ''
-        while True:
-            try:
-                data = self.socket.recv(self.buffer).decode()
-                messages = data.split('\0')
-                for msg in messages:
-                    if not msg:
-                        continue
-                    buffer += msg
-                    try:
-                        data = loads(buffer)
-                        if data['type'] == 'end_game':
-                            self.socket.close()
-                        self.queue.put(data)
-                        buffer = ''
-                    except JSONDecodeError as e:
-                        self.logger.warning("buffer: {0}\nmsg: {1}\nJSONDecodeError: {2}".format(buffer, msg, e))
-                        self.logger.warning("JSONDecodeError: {0}\nmsg: {1}".format(e, msg))
-                    except JSONError as e:
-                        self.logger.warning("buffer: {0}\nmsg: {1}".format(buffer, msg, e))
-                        self.logger.warning("JSONError: {0}\nmsg: {1}\nJSONError: {2}".format(e, msg))
-
-            except (ConnectionResetError, OSError):
+        if not self.messages:
+            self.poll(0)
+        return not self.messages
+
+    def get(self, block=True, timeout=None):
+        """Get the next message from the server
+
+        Parameters
+        ----------
+        block : bool
+            Whether to wait for a message
+        timeout : float
+            Longest time to wait, None for no limit
+
+        Returns
+        -------
+        dict
+
+        Raises
+        ------
+        queue.Empty
+            If no message came in time
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        while not self.messages:
+            if self.closed:
+                self.logger.error("Connection to server closed.")
                 exit(1)
+
+            if not block:
+                wait = 0
+            elif deadline is None:
+                wait = None
+            else:
+                wait = max(0.0, deadline - monotonic())
+
+            self.poll(wait)
+            if not self.messages and wait is not None and (not block or monotonic() >= deadline):
+                raise Empty
+
+        return self.messages.popleft()
+
+    def poll(self, timeout):
+        """Wait for data from the server and decode all complete messages
+
+        Parameters
+        ----------
+        timeout : float
+            Longest time to wait, None for no limit, 0 to only check
+        """
+        if self.closed or self.socket.fileno() < 0:
+            self.closed = True
+            return
+
+        if not self.selector.select(timeout):
+            return
+
+        try:
+            data = self.socket.recv(self.buffer)
+        except (ConnectionResetError, OSError):
+            data = b''
+        if not data:
+            self.closed = True
+            self.selector.close()
+            self.logger.debug("Connection closed, {}".format(self.get_stats()))
+            return
+
+        start = perf_counter()
+        nb_messages = len(self.messages)
+        self.decoder.feed(data)
+        self.messages.extend(self.decoder.messages())
+
+        self.decoding_time += perf_counter() - start
+        self.bytes_received += len(data)
+        self.messages_received += len(self.messages) - nb_messages
+        self.nb_reads += 1
+
+    def get_stats(self):
+        """Get throughput counters
+
+        Returns
+        -------
+        dict
+        """
+        return {
+            'bytes_received': self.bytes_received,
+            'messages_received': self.messages_received,
+            'nb_reads': self.nb_reads,
+            'decoding_time': self.decoding_time,
+        }
@@ -1,6 +1,8 @@
+import colorsys
 import hexutil
 from json.decoder import JSONDecodeError
 import logging
+import math
 from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton
 from PyQt5.QtGui import QPainter, QColor, QPolygon, QPen, QFont
 from PyQt5.QtCore import QPoint, Qt, QRectF, QTimer
@@ -13,19 +15,31 @@ MAX_TRANSFERS_PER_TURN = None
 nb_transfers_this_turn = 0
 
 
+PLAYER_COLORS = {
+    1: (0, 255, 0),
+    2: (0, 0, 255),
+    3: (255, 0, 0),
+    4: (255, 255, 0),
+    5: (0, 255, 255),
+    6: (255, 0, 255),
+    7: (224, 224, 224),
+    8: (153, 153, 255)
+}
+
+# largest size of hexes, smaller ones are used when the board would not fit the window
+HEX_SIZE = 10
+
+
 def player_color(player_name):
     """Return color of a player given his name
+
+    Players beyond the eighth get hues spaced by the golden ratio,
+    so that any number of players have distinct colors.
     """
-    return {
-        1: (0, 255, 0),
-        2: (0, 0, 255),
-        3: (255, 0, 0),
-        4: (255, 255, 0),
-        5: (0, 255, 255),
-        6: (255, 0, 255),
-        7: (224, 224, 224),
-        8: (153, 153, 255)
-    }[player_name]
+    if player_name in PLAYER_COLORS:
+        return PLAYER_COLORS[player_name]
+    hue = (player_name * 0.618033988749895) % 1.0
+    return tuple(int(255 * c) for c in colorsys.hsv_to_rgb(hue, 0.6, 0.95))
 
 
 class MainWindow(QWidget):
@@ -47,6 +61,10 @@ class MainWindow(QWidget):
         for i, area in self.board.areas.items():
             for h in area.get_hexes():
                 self.areas_mapping[h] = i
+        # distance of the farthest hex corner from the center of the board with hexes of HEX_SIZE
+        boxes = [hexutil.HexGrid(HEX_SIZE).bounding_box(h) for h in self.areas_mapping]
+        self.extent_x = max(max(-box.x, box.x + box.width) for box in boxes)
+        self.extent_y = max(max(-box.y, box.y + box.height) for box in boxes)
 
         self.font = QFont('Helvetica', 16)
         self.pen = QPen()
@@ -63,6 +81,13 @@ class MainWindow(QWidget):
     def set_area_text_fn(self, area_text_fn):
         self.area_text_fn = area_text_fn
 
+    def hexgrid(self):
+        """Return grid of hexes as big as possible for the board to fit the window
+        """
+        size = self.size()
+        scale = min(1.0, size.width() / (2 * self.extent_x), size.height() / (2 * self.extent_y))
+        return hexutil.HexGrid(max(int(HEX_SIZE * scale), 2))
+
     def draw_areas(self):
         """Draw areas in the game board
         """
@@ -72,7 +97,8 @@ class MainWindow(QWidget):
         x = size.width()
         y = size.height()
 
-        hexgrid = hexutil.HexGrid(10)
+        hexgrid = self.hexgrid()
+        self.font.setPointSize(max(16 * hexgrid.width // HEX_SIZE, 4))
 
         self.qp.setPen(Qt.NoPen)
         self.qp.translate(x // 2, y // 2)
@@ -162,7 +188,7 @@ class MainWindow(QWidget):
         size = self.size()
         x = size.width()//2
         y = size.height()//2
-        hexgrid = hexutil.HexGrid(10)
+        hexgrid = self.hexgrid()
         return hexgrid.hex_at_coordinate(position.x() - x, position.y() - y)
 
 
@@ -252,9 +278,10 @@ class Score(QWidget):
         self.qp.setFont(self.font)
         self.qp.drawText(label_rect, Qt.AlignCenter, 'Scores')
 
-        size = rect.width() // 4
+        columns = max(4, math.ceil(math.sqrt(len(self.game.players))))
+        size = rect.width() // columns
         for i, p in self.game.players.items():
-            player_score_rect = QRectF(rect.x() + (i-1) % 4*size + 5, 30 + rect.y() + ((i-1)//4) * size,
+            player_score_rect = QRectF(rect.x() + (i-1) % columns*size + 5, 30 + rect.y() + ((i-1)//columns) * size,
                                        size - 10, size - 10)
             reserve_rect = QRectF(player_score_rect.x() + 40, player_score_rect.y() + 40, 20, 20)
 
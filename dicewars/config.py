@@ -0,0 +1,87 @@
+"""Dimensions of boards, games and encodings given by dicewars.config
+
+Scripts read the configuration themselves and pass its sections around,
+modules sized at import time, like encodings of game states for neural
+networks, take it from load_config().
+"""
+import configparser
+from functools import lru_cache
+import os
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dicewars.config')
+
+DEFAULT_BOARD_WIDTH = 32
+DEFAULT_BOARD_HEIGHT = 28
+DEFAULT_MAX_PLAYERS = 8
+
+
+@lru_cache(maxsize=None)
+def load_config(path=CONFIG_PATH):
+    """Read the configuration, once per path
+
+    Returns
+    -------
+    configparser.ConfigParser
+    """
+    config = configparser.ConfigParser()
+    config.read(path)
+    for section in ['BOARD', 'GAME', 'NN']:
+        if not config.has_section(section):
+            config.add_section(section)
+    return config
+
+
+def board_bounds(board_config=None):
+    """Get boundary values for Hex coordinates of boards
+
+    The board is BoardWidth hexes wide and BoardHeight hexes high,
+    centered around the Hex (0, 0).
+
+    Parameters
+    ----------
+    board_config : configparser.SectionProxy
+        The BOARD section, that of load_config() if None
+
+    Returns
+    -------
+    (int, int, int, int)
+        min_x, max_x, min_y, max_y
+    """
+    if board_config is None:
+        board_config = load_config()['BOARD']
+    width = board_config.getint('BoardWidth', fallback=DEFAULT_BOARD_WIDTH)
+    height = board_config.getint('BoardHeight', fallback=DEFAULT_BOARD_HEIGHT)
+    min_x = -2 * (width // 2)
+    min_y = -(height // 2)
+    return min_x, min_x + 2 * (width - 1), min_y, min_y + height - 1
+
+
+def max_players(game_config=None):
+    """Get the largest number of players a game can have
+    """
+    if game_config is None:
+        game_config = load_config()['GAME']
+    return game_config.getint('MaxPlayers', fallback=DEFAULT_MAX_PLAYERS)
+
+
+def nn_dimensions(config=None):
+    """Get numbers of areas and players encodings of game states are sized for
+
+    They default to the number of areas of generated boards and MaxPlayers.
+
+    Parameters
+    ----------
+    config : configparser.ConfigParser
+        The whole configuration, load_config() if None
+
+    Returns
+    -------
+    (int, int)
+        Maximum number of areas and of players
+    """
+    if config is None:
+        config = load_config()
+    nb_areas = config['NN'].getint('MaxAreaCount', fallback=config['BOARD'].getint('BoardSize', fallback=35) - 1)
+    nb_players = config['NN'].getint('MaxPlayerCount', fallback=max_players(config['GAME']))
+    return nb_areas, nb_players
@@ -0,0 +1,266 @@
+"""Compact binary protocol between the server and clients
+
+Every message travels in a frame consisting of a 4-byte big-endian length
+of the rest of the frame, a 1-byte frame type and a payload. Moves of the
+clients and state updates of the server (which are always delta ones,
+see Game.get_update()) have fixed-layout records, anything else is carried
+as a JSON payload.
+
+Decoded messages have exactly the shape their JSON counterparts have after
+passing through json.loads(), so the rest of the code does not need
+to care which protocol is in use.
+"""
+import json
+import struct
+
+
+LENGTH = struct.Struct('>I')
+FRAME_TYPE = struct.Struct('>B')
+HEADER_SIZE = LENGTH.size + FRAME_TYPE.size
+
+JSON_FRAME = 0
+BATTLE_COMMAND = 1
+TRANSFER_COMMAND = 2
+END_TURN_COMMAND = 3
+STATE_REQUEST = 4
+BATTLE_RESULT = 16
+TRANSFER_RESULT = 17
+END_TURN_RESULT = 18
+
+COMMAND = struct.Struct('>HH')  # source area, target area
+VERSION = struct.Struct('>I')
+BATTLE_SIDE = struct.Struct('>HBBH')  # area, dice, owner, power
+TRANSFER_SIDE = struct.Struct('>HB')  # area, dice
+CURRENT_PLAYER = struct.Struct('>B')
+NB_AREAS = struct.Struct('>H')
+AREA_UPDATE = struct.Struct('>HBB')  # area, owner, dice
+NB_PLAYERS = struct.Struct('>B')
+PLAYER_VALUE = struct.Struct('>BH')  # player, score or reserve
+
+
+def frame(frame_type, payload=b''):
+    return LENGTH.pack(FRAME_TYPE.size + len(payload)) + FRAME_TYPE.pack(frame_type) + payload
+
+
+def encode_message(msg):
+    """Encode a message into a frame
+
+    Parameters
+    ----------
+    msg : dict
+        Message as it would be sent in JSON
+
+    Returns
+    -------
+    bytes
+    """
+    msg_type = msg['type']
+    if msg_type == 'battle':
+        if 'atk' in msg:
+            return frame(BATTLE_COMMAND, COMMAND.pack(msg['atk'], msg['def']))
+        else:
+            return frame(BATTLE_RESULT, encode_battle_result(msg))
+    elif msg_type == 'transfer':
+        if 'src' in msg:
+            return frame(TRANSFER_COMMAND, COMMAND.pack(msg['src'], msg['dst']))
+        else:
+            return frame(TRANSFER_RESULT, encode_transfer_result(msg))
+    elif msg_type == 'end_turn':
+        if 'current_player' not in msg:
+            return frame(END_TURN_COMMAND)
+        else:
+            return frame(END_TURN_RESULT, encode_end_turn_result(msg))
+    elif msg_type == 'state_request':
+        return frame(STATE_REQUEST)
+    else:
+        return frame(JSON_FRAME, json.dumps(msg).encode())
+
+
+def encode_player_values(values):
+    return NB_PLAYERS.pack(len(values)) + b''.join(
+        PLAYER_VALUE.pack(int(player), value) for player, value in values.items()
+    )
+
+
+def encode_battle_result(msg):
+    result = msg['result']
+    return b''.join([
+        VERSION.pack(msg['version']),
+        BATTLE_SIDE.pack(result['atk']['name'], result['atk']['dice'], result['atk']['owner'], result['atk']['pwr']),
+        BATTLE_SIDE.pack(result['def']['name'], result['def']['dice'], result['def']['owner'], result['def']['pwr']),
+        encode_player_values(msg['score']),
+    ])
+
+
+def encode_transfer_result(msg):
+    result = msg['result']
+    return b''.join([
+        VERSION.pack(msg['version']),
+        TRANSFER_SIDE.pack(result['src']['name'], result['src']['dice']),
+        TRANSFER_SIDE.pack(result['dst']['name'], result['dst']['dice']),
+        encode_player_values(msg['score']),
+    ])
+
+
+def encode_end_turn_result(msg):
+    areas = msg['areas']
+    return b''.join([
+        VERSION.pack(msg['version']),
+        CURRENT_PLAYER.pack(msg['current_player']),
+        NB_AREAS.pack(len(areas)),
+        b''.join(AREA_UPDATE.pack(int(name), area['owner'], area['dice']) for name, area in areas.items()),
+        encode_player_values(msg['reserves']),
+        encode_player_values(msg['score']),
+    ])
+
+
+def decode_player_values(buffer, offset):
+    nb_players, = NB_PLAYERS.unpack_from(buffer, offset)
+    offset += NB_PLAYERS.size
+    values = {}
+    for _ in range(nb_players):
+        player, value = PLAYER_VALUE.unpack_from(buffer, offset)
+        offset += PLAYER_VALUE.size
+        values[str(player)] = value
+    return values, offset
+
+
+def decode_battle_side(buffer, offset):
+    name, dice, owner, pwr = BATTLE_SIDE.unpack_from(buffer, offset)
+    return {'name': name, 'dice': dice, 'owner': owner, 'pwr': pwr}
+
+
+def decode_transfer_side(buffer, offset):
+    name, dice = TRANSFER_SIDE.unpack_from(buffer, offset)
+    return {'name': name, 'dice': dice}
+
+
+def decode_frame(frame_type, buffer, offset, end):
+    """Decode payload of a single frame
+
+    Parameters
+    ----------
+    frame_type : int
+    buffer : bytes-like
+    offset : int
+        Start of the payload in buffer
+    end : int
+        End of the payload in buffer
+
+    Returns
+    -------
+    dict
+    """
+    if frame_type == JSON_FRAME:
+        return json.loads(bytes(buffer[offset:end]).decode())
+
+    elif frame_type == BATTLE_COMMAND:
+        atk, dfn = COMMAND.unpack_from(buffer, offset)
+        return {'type': 'battle', 'atk': atk, 'def': dfn}
+
+    elif frame_type == TRANSFER_COMMAND:
+        src, dst = COMMAND.unpack_from(buffer, offset)
+        return {'type': 'transfer', 'src': src, 'dst': dst}
+
+    elif frame_type == END_TURN_COMMAND:
+        return {'type': 'end_turn'}
+
+    elif frame_type == STATE_REQUEST:
+        return {'type': 'state_request'}
+
+    elif frame_type == BATTLE_RESULT:
+        version, = VERSION.unpack_from(buffer, offset)
+        offset += VERSION.size
+        atk = decode_battle_side(buffer, offset)
+        dfn = decode_battle_side(buffer, offset + BATTLE_SIDE.size)
+        score, _ = decode_player_values(buffer, offset + 2 * BATTLE_SIDE.size)
+        return {'type': 'battle', 'version': version, 'score': score, 'result': {'atk': atk, 'def': dfn}}
+
+    elif frame_type == TRANSFER_RESULT:
+        version, = VERSION.unpack_from(buffer, offset)
+        offset += VERSION.size
+        src = decode_transfer_side(buffer, offset)
+        dst = decode_transfer_side(buffer, offset + TRANSFER_SIDE.size)
+        score, _ = decode_player_values(buffer, offset + 2 * TRANSFER_SIDE.size)
+        return {'type': 'transfer', 'version': version, 'score': score, 'result': {'src': src, 'dst': dst}}
+
+    elif frame_type == END_TURN_RESULT:
+        version, = VERSION.unpack_from(buffer, offset)
+        offset += VERSION.size
+        current_player, = CURRENT_PLAYER.unpack_from(buffer, offset)
+        offset += CURRENT_PLAYER.size
+        nb_areas, = NB_AREAS.unpack_from(buffer, offset)
+        offset += NB_AREAS.size
+        areas = {}
+        for _ in range(nb_areas):
+            name, owner, dice = AREA_UPDATE.unpack_from(buffer, offset)
+            offset += AREA_UPDATE.size
+            areas[str(name)] = {'owner': owner, 'dice': dice}
+        reserves, offset = decode_player_values(buffer, offset)
+        score, _ = decode_player_values(buffer, offset)
+        return {
+            'type': 'end_turn',
+            'version': version,
+            'current_player': current_player,
+            'areas': areas,
+            'reserves': reserves,
+            'score': score,
+        }
+
+    else:
+        raise ValueError("Unknown frame type {}".format(frame_type))
+
+
+class FrameDecoder:
+    """Incremental decoder of a stream of frames
+
+    Data may be fed in arbitrary pieces, a message is produced
+    as soon as its frame is complete.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def feed(self, data):
+        """Append received data to the stream
+        """
+        if self.offset and self.offset == len(self.buffer):
+            self.buffer.clear()
+            self.offset = 0
+        self.buffer += data
+
+    def next_message(self):
+        """Decode the next complete message
+
+        Returns
+        -------
+        dict or None
+            None if no complete frame is available yet
+        """
+        available = len(self.buffer) - self.offset
+        if available < LENGTH.size:
+            return None
+
+        length, = LENGTH.unpack_from(self.buffer, self.offset)
+        if available < LENGTH.size + length:
+            return None
+
+        frame_type, = FRAME_TYPE.unpack_from(self.buffer, self.offset + LENGTH.size)
+        start = self.offset + HEADER_SIZE
+        end = self.offset + LENGTH.size + length
+        self.offset = end
+
+        msg = decode_frame(frame_type, self.buffer, start, end)
+        if self.offset > len(self.buffer) // 2:
+            del self.buffer[:self.offset]
+            self.offset = 0
+        return msg
+
+    def messages(self):
+        """Decode all complete messages
+        """
+        while True:
+            msg = self.next_message()
+            if msg is None:
+                return
+            yield msg
@@ -41,7 +41,7 @@ class Area:
             Instance of the Board class
         """
         for name in self.adjacent_areas_names:
-            self.adjacent_areas.append(board.areas[name])
+            self.adjacent_areas.append(board.get_area_by_name(name))
 
     def get_adjacent_areas(self):
         """Get list of adjacent areas
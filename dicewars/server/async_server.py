@@ -0,0 +1,439 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import configparser
+import json
+from json.decoder import JSONDecodeError
+import logging
+import multiprocessing
+import time
+
+from dicewars.config import max_players
+
+from .board_setup import prepare_board
+from .game import Game
+from .instrumentation import GameInstrumentation
+
+
+def prepare_board_task(board_config, nb_players, board_seed, ownership_seed, strength_seed):
+    """Prepare a board in a worker process
+
+    Suitable as a task of a process pool.
+
+    Parameters
+    ----------
+    board_config : dict
+        Options of the BOARD section of the configuration
+
+    Returns
+    -------
+    (Board, dict of int: int)
+        The board and the ownership of its areas
+    """
+    config = configparser.ConfigParser()
+    config.read_dict({'BOARD': board_config})
+    return prepare_board(config['BOARD'], nb_players, board_seed, ownership_seed, strength_seed)
+
+
+class StreamConnection:
+    """Client connection of an asyncio server, looking like a socket to Player
+
+    Writes are buffered by the transport and never block, the game coroutine
+    waits for the buffers to drain after each handled message.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+
+    def send(self, data):
+        self.writer.write(data)
+        return len(data)
+
+    def setblocking(self, flag):
+        pass
+
+    def close(self):
+        self.writer.close()
+
+    def __repr__(self):
+        return '<StreamConnection {}>'.format(self.address)
+
+
+class AsyncGame(Game):
+    """Game played by clients connected to a MultiGameServer
+
+    The rules are those of Game, only the turn loop is a coroutine,
+    so that many games can be played within one event loop.
+    """
+    def __init__(self, board, area_ownership, players, game_config, connections, nicknames_order, seed=None,
+                 instrumentation=None):
+        """
+        Parameters
+        ----------
+        connections : list of (StreamConnection, dict)
+            Connections of clients along with their hello messages
+        instrumentation : GameInstrumentation
+            Optional collector of timings and traffic of the game
+        """
+        self.connections = connections
+        super().__init__(board, area_ownership, players, game_config, None, None, nicknames_order, seed,
+                         instrumentation=instrumentation)
+
+    async def run_async(self):
+        """Main loop of the game
+
+        Returns
+        -------
+        GameSummary
+        """
+        try:
+            for i in range(1, self.number_of_players + 1):
+                self.send_message(self.players[i], 'game_state')
+            await self.drain()
+
+            while True:
+                player = self.current_player.get_name()
+                start = time.perf_counter()
+                msg = await self.read_message(player)
+                received = time.perf_counter()
+                self.process_message(player, msg)
+                if self.instrumentation is not None:
+                    self.instrumentation.add_turn(
+                        self.players[player].get_nickname(), msg['type'], received - start, time.perf_counter() - received)
+                await self.drain()
+                if self.check_win_condition():
+                    break
+
+        except (BrokenPipeError, ConnectionResetError, asyncio.IncompleteReadError) as e:
+            self.logger.error("Connection to client failed: {0}".format(e))
+        except JSONDecodeError as e:
+            self.logger.error("Failed to parse the client message: {0}".format(e))
+        finally:
+            await self.close_connections_async()
+
+        if self.replay is not None:
+            self.replay.finish(self.get_winner())
+        return self.summary
+
+    async def read_message(self, player):
+        """Read message from client
+
+        Parameters
+        ----------
+        player : int
+            Name of the client
+
+        Returns
+        -------
+        dict
+            Decoded message from the client
+        """
+        reader = self.client_sockets[player].reader
+        decoder = self.players[player].frame_decoder
+        if decoder is None:
+            raw_message = await reader.read(self.buffer)
+            if not raw_message:
+                raise ConnectionResetError("Client {} closed the connection".format(player))
+            msg = json.loads(raw_message.decode())
+        else:
+            msg = decoder.next_message()
+            while msg is None:
+                data = await reader.read(self.buffer)
+                if not data:
+                    raise ConnectionResetError("Client {} closed the connection".format(player))
+                decoder.feed(data)
+                msg = decoder.next_message()
+
+        self.logger.debug("Got message from client {}: {}".format(player, msg))
+        return msg
+
+    async def drain(self):
+        """Wait until clients have taken the messages sent to them
+        """
+        await asyncio.gather(*(connection.writer.drain() for connection in self.client_sockets.values()))
+
+    async def close_connections_async(self):
+        for connection in self.client_sockets.values():
+            try:
+                await connection.writer.drain()
+            except ConnectionError:
+                self.logger.warning("Could not deliver last messages to {}".format(connection))
+            connection.close()
+
+    def create_socket(self):
+        pass
+
+    def connect_clients(self):
+        """Assign already connected clients to players
+        """
+        self.client_sockets = {}
+        for i, (connection, hello_msg) in enumerate(self.connections, start=1):
+            self.add_client(connection, connection.address, i)
+            self.players[i].set_nickname(hello_msg['nickname'])
+            self.players[i].set_state_updates(hello_msg.get('state_updates', 'full'))
+            self.players[i].set_protocol(hello_msg.get('protocol', 'json'))
+
+        self.logger.debug("Successfully assigned clients to all players")
+
+
+class MultiGameServer:
+    """Server hosting any number of concurrent games on a single port
+
+    A game is announced by a controller with a 'create_game' message
+    containing 'game_id', 'nb_players' and optionally seeds 'board',
+    'ownership', 'strength', 'fixed' and the nicknames 'order' of players.
+    Clients join it by sending their 'client_desc' hello with the 'game_id'.
+    Once the game is both announced and complete, it is played and the
+    controller is sent a 'game_summary' message, after which its connection
+    is closed. Clients joining a game which is full are turned away and
+    games not started within join_timeout are dropped, closing the
+    connection of their controller and clients.
+
+    Boards not found in the library are prepared by a pool of worker
+    processes, while all the games are played within a single event loop,
+    that is on a single core. To play on more cores, run a server per core.
+
+    With instrument, every game collects a GameInstrumentation and its
+    to_dict() is sent along with the summary as 'instrumentation'.
+    """
+    def __init__(self, address, port, board_config, game_config, library=None, workers=None,
+                 join_timeout=60.0, hello_timeout=10.0, instrument=False):
+        """
+        Parameters
+        ----------
+        library : BoardLibrary
+            Library to take prepared boards from
+        workers : int
+            Number of processes preparing boards, the number of CPUs by default
+        join_timeout : float
+            Seconds a game may wait for its announcement and all of its clients
+        hello_timeout : float
+            Seconds a new connection may take to send its first message
+        instrument : bool
+            Whether to report timings and traffic of games
+        """
+        self.address = address
+        self.port = port
+        self.board_config = board_config
+        self.game_config = game_config
+        self.library = library
+        self.workers = workers
+        self.join_timeout = join_timeout
+        self.hello_timeout = hello_timeout
+        self.instrument = instrument
+        self.buffer = 65535
+        self.max_hello_size = 65535
+        self.logger = logging.getLogger('SERVER')
+
+        self.announced = {}
+        self.joined = {}
+        self.running = set()
+        self.timeouts = {}
+        self.executor = None
+        self.server = None
+
+    async def start(self):
+        """Start accepting connections
+
+        Returns
+        -------
+        asyncio.Server
+        """
+        # forked workers would inherit sockets of clients and keep them open after the server closes them
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self.server = await asyncio.start_server(self.handle_connection, self.address, self.port)
+        self.logger.info("Serving games at {}:{}".format(self.address, self.port))
+        return self.server
+
+    async def close(self):
+        """Stop accepting connections and shut the worker processes down
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def read_hello(self, reader):
+        """Read the first message of a connection
+
+        The message is complete either once a null terminator arrives,
+        or once the data received so far is a JSON document.
+
+        Returns
+        -------
+        dict
+
+        Raises
+        ------
+        ValueError
+            If the message is not a JSON object or is followed by other data
+        ConnectionError
+            If the connection is closed before the message is complete
+        """
+        data = b''
+        while True:
+            chunk = await reader.read(self.buffer)
+            if not chunk:
+                raise ConnectionResetError("Connection closed before the first message was complete")
+            data += chunk
+
+            end = data.find(b'\0')
+            if end >= 0:
+                if data[end + 1:]:
+                    raise ValueError("First message is followed by other data")
+                msg = json.loads(data[:end].decode())
+                break
+            try:
+                msg = json.loads(data.decode())
+                break
+            except (JSONDecodeError, UnicodeDecodeError):
+                if len(data) >= self.max_hello_size:
+                    raise
+
+        if not isinstance(msg, dict):
+            raise ValueError("First message is not a JSON object")
+        return msg
+
+    def check_hello(self, msg):
+        """Check that the first message of a connection announces or joins a game
+
+        Returns
+        -------
+        str
+            Reason to reject the message, None if it is fine
+        """
+        game_id = msg.get('game_id')
+        if not isinstance(game_id, (str, int)) or isinstance(game_id, bool):
+            return "no game_id"
+        if game_id in self.running:
+            return "game {} is already running".format(game_id)
+
+        msg_type = msg.get('type')
+        if msg_type == 'create_game':
+            if game_id in self.announced:
+                return "game {} has already been announced".format(game_id)
+            nb_players = msg.get('nb_players')
+            if not isinstance(nb_players, int) or isinstance(nb_players, bool) \
+                    or not 1 <= nb_players <= max_players(self.game_config):
+                return "invalid number of players {!r}".format(nb_players)
+        elif msg_type == 'client_desc':
+            if not isinstance(msg.get('nickname'), str):
+                return "no nickname"
+            if game_id in self.announced and len(self.joined.get(game_id, [])) >= self.announced[game_id][1]['nb_players']:
+                return "game {} is full".format(game_id)
+        else:
+            return "unexpected message type {!r}".format(msg_type)
+
+        return None
+
+    async def handle_connection(self, reader, writer):
+        """Dispatch a new connection according to its first message
+        """
+        connection = StreamConnection(reader, writer)
+        try:
+            msg = await asyncio.wait_for(self.read_hello(reader), self.hello_timeout)
+        except (JSONDecodeError, UnicodeDecodeError, ValueError, ConnectionError, asyncio.TimeoutError) as e:
+            self.logger.warning("Invalid first message from {}: {!r}".format(connection.address, e))
+            connection.close()
+            return
+
+        reason = self.check_hello(msg)
+        if reason is not None:
+            self.logger.warning("Rejecting {}: {}".format(connection.address, reason))
+            connection.close()
+            return
+
+        game_id = msg['game_id']
+        if game_id not in self.timeouts:
+            self.timeouts[game_id] = asyncio.get_running_loop().call_later(self.join_timeout, self.drop_game, game_id)
+
+        if msg['type'] == 'create_game':
+            self.announced[game_id] = (connection, msg)
+            clients = self.joined.get(game_id, [])
+            for extra, _ in clients[msg['nb_players']:]:
+                self.logger.warning("Rejecting {}: game {} is full".format(extra.address, game_id))
+                extra.close()
+            del clients[msg['nb_players']:]
+        else:
+            self.joined.setdefault(game_id, []).append((connection, msg))
+
+        if game_id in self.announced and len(self.joined.get(game_id, [])) == self.announced[game_id][1]['nb_players']:
+            self.timeouts.pop(game_id).cancel()
+            self.running.add(game_id)
+            try:
+                await self.play(game_id)
+            finally:
+                self.running.discard(game_id)
+
+    def drop_game(self, game_id):
+        """Drop a game which has not started in time
+        """
+        self.timeouts.pop(game_id, None)
+        announced = self.announced.pop(game_id, None)
+        clients = self.joined.pop(game_id, [])
+        self.logger.warning("Dropping game {}, {} with {} clients joined".format(
+            game_id, 'announced' if announced else 'not announced', len(clients)))
+        if announced is not None:
+            announced[0].close()
+        for connection, _ in clients:
+            connection.close()
+
+    async def create_game(self, spec, clients):
+        """Prepare the board of a game and connect its clients
+
+        Returns
+        -------
+        AsyncGame
+        """
+        seeds = (spec.get('board'), spec.get('ownership'), spec.get('strength'))
+        prepared = None
+        if self.library is not None:
+            prepared = self.library.get(self.board_config, spec['nb_players'], *seeds)
+        if prepared is None:
+            prepared = await asyncio.get_running_loop().run_in_executor(
+                self.executor, prepare_board_task, dict(self.board_config), spec['nb_players'], *seeds,
+            )
+        board, area_ownership = prepared
+
+        return AsyncGame(
+            board, area_ownership, spec['nb_players'], self.game_config, clients, spec.get('order'),
+            seed=spec.get('fixed'), instrumentation=GameInstrumentation() if self.instrument else None,
+        )
+
+    async def play(self, game_id):
+        controller, spec = self.announced.pop(game_id)
+        clients = self.joined.pop(game_id)
+        self.logger.info("Starting game {}".format(game_id))
+
+        try:
+            try:
+                game = await self.create_game(spec, clients)
+            except Exception:
+                self.logger.error("Could not create game {}".format(game_id), exc_info=True)
+                return
+
+            try:
+                summary = await game.run_async()
+            except Exception:
+                self.logger.error("Game {} failed".format(game_id), exc_info=True)
+                return
+            self.logger.info("Game {} finished".format(game_id))
+
+            msg = {'type': 'game_summary', 'game_id': game_id, 'summary': repr(summary)}
+            if game.instrumentation is not None:
+                msg['instrumentation'] = game.instrumentation.to_dict()
+            controller.send((json.dumps(msg) + '\0').encode())
+            try:
+                await controller.writer.drain()
+            except ConnectionError:
+                self.logger.warning("Controller of game {} went away".format(game_id))
+        finally:
+            for connection, _ in clients:
+                connection.close()
+            controller.close()
@@ -14,7 +14,7 @@ class Board:
         Attributes
         ----------
         areas : dict of int: Area
-            Dictionary of Area instances
+            Dictionary of Area instances, indexed by their names
         """
         self.board = board
         self.areas = {}
@@ -34,11 +34,9 @@ class Board:
         Returns
         -------
         Area
-            Instance of an area
+            Instance of an area, None if there is no such area
         """
-        for a in self.areas:
-            if name == self.areas[a].get_name():
-                return self.areas[a]
+        return self.areas.get(name)
 
     def get_board(self):
         """Get dictionary listing adjacent areas for each area
@@ -0,0 +1,221 @@
+"""Corpus of generated boards
+
+A corpus is a single .npy file of records, one per board:
+
+    seed        seed of the random.Random the board was generated with, as by create_board()
+    wl_hash     Weisfeiler-Lehman hash of the adjacency graph of the board
+    nb_areas    number of areas
+    labels      name of the area of every valid hex of the HexGrid, 0 for none
+
+Boards with equal hashes are considered duplicates, so that a corpus holds
+every board structure only once, no matter how its areas are named.
+"""
+import configparser
+import hashlib
+import random
+
+import numpy as np
+
+from ..config import board_bounds
+from .board_setup import create_board
+from .generator import area_adjacency, get_hex_grid
+
+
+def board_grid(board_config):
+    """Get the grid boards are generated on
+
+    Parameters
+    ----------
+    board_config : configparser.SectionProxy
+    """
+    return get_hex_grid(*board_bounds(board_config))
+
+
+def corpus_dtype(grid):
+    return np.dtype([
+        ('seed', '<i8'), ('wl_hash', '<u8'), ('nb_areas', '<u2'), ('labels', '<u2', (len(grid.valid),)),
+    ])
+
+
+def digest(values):
+    """Get a 64-bit digest of a sequence of labels, stable across processes
+    """
+    data = np.asarray(values, dtype='<u8').tobytes()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def wl_hash(neighbours):
+    """Weisfeiler-Lehman hash of a graph
+
+    Every node starts labelled by its degree and is relabelled by the digest
+    of its label and the sorted labels of its neighbours until the partition
+    of nodes by labels stops getting finer. The hash is the digest of sorted
+    labels of all the rounds. Isomorphic graphs have equal hashes, the other
+    way round holds for all but rare, highly regular graphs.
+
+    Parameters
+    ----------
+    neighbours : dict of int: list of int
+        Adjacent nodes of every node
+
+    Returns
+    -------
+    int
+    """
+    labels = {node: len(adjacent) for node, adjacent in neighbours.items()}
+    history = sorted(labels.values())
+    nb_classes = len(set(labels.values()))
+    for _ in range(len(neighbours)):
+        labels = {
+            node: digest([labels[node]] + sorted(labels[n] for n in adjacent))
+            for node, adjacent in neighbours.items()
+        }
+        history.extend(sorted(labels.values()))
+        if len(set(labels.values())) == nb_classes:
+            break
+        nb_classes = len(set(labels.values()))
+    return digest(history)
+
+
+def board_labels(board, grid):
+    """Get names of areas of the valid hexes of a grid
+
+    Parameters
+    ----------
+    board : dict
+        Board as produced by a generator
+    grid : HexGrid
+
+    Returns
+    -------
+    np.ndarray of uint16
+    """
+    labels = np.zeros(grid.size, dtype=np.uint16)
+    for name, area in board.items():
+        for h in area['hexes']:
+            labels[grid.number(h)] = name
+    return labels[grid.valid]
+
+
+def board_from_record(record, grid):
+    """Rebuild a board from a corpus record
+
+    Hexes of every area come in the order of the grid and the adjacent
+    areas are sorted, otherwise the board is the generated one.
+
+    Returns
+    -------
+    dict
+        Board in the format of generators
+    """
+    nb_areas = int(record['nb_areas'])
+    labels = np.zeros(grid.size, dtype=np.int64)
+    labels[grid.valid] = record['labels']
+    neighbours = area_adjacency(grid, labels, nb_areas)
+    hexes = {name: [] for name in range(1, nb_areas + 1)}
+    for h in np.flatnonzero(labels).tolist():
+        hexes[labels[h]].append(grid.hexes[h])
+    return {name: {'hexes': hexes[name], 'neighbours': neighbours[name]} for name in hexes}
+
+
+def generate_boards(board_config, seeds):
+    """Generate boards and describe them for a corpus
+
+    Suitable as a task of a process pool.
+
+    Parameters
+    ----------
+    board_config : dict
+        Options of the BOARD section of the configuration
+    seeds : iterable of int
+
+    Returns
+    -------
+    list of (int, int, int, np.ndarray, list of int)
+        Seed, Weisfeiler-Lehman hash, number of areas, labels
+        of hexes and degrees of areas of every board
+    """
+    config = configparser.ConfigParser()
+    config.read_dict({'BOARD': board_config})
+    grid = board_grid(config['BOARD'])
+
+    results = []
+    for seed in seeds:
+        board = create_board(config['BOARD'], rng=random.Random(seed)).board
+        neighbours = {name: area['neighbours'] for name, area in board.items()}
+        degrees = [len(adjacent) for adjacent in neighbours.values()]
+        results.append((seed, wl_hash(neighbours), len(board), board_labels(board, grid), degrees))
+    return results
+
+
+class CorpusWriter:
+    """Writer streaming boards into a memory-mapped corpus
+
+    The file is created for a given number of boards and truncated
+    to the number of boards actually added by close().
+    """
+    def __init__(self, path, capacity, grid):
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the .npy file
+        capacity : int
+            Maximum number of boards
+        grid : HexGrid
+            Grid of the boards
+        """
+        self.path = path
+        self.capacity = capacity
+        self.records = np.lib.format.open_memmap(path, mode='w+', dtype=corpus_dtype(grid), shape=(capacity,))
+        self.hashes = set()
+        self.nb_boards = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, seed, board_hash, nb_areas, labels):
+        """Add a board unless the corpus holds one of the same structure
+
+        Returns
+        -------
+        bool
+            Whether the board was added
+        """
+        if board_hash in self.hashes:
+            return False
+        record = self.records[self.nb_boards]
+        record['seed'] = seed
+        record['wl_hash'] = board_hash
+        record['nb_areas'] = nb_areas
+        record['labels'] = labels
+        self.hashes.add(board_hash)
+        self.nb_boards += 1
+        return True
+
+    def close(self):
+        if self.records is None:
+            return
+        if self.nb_boards < self.capacity:
+            records = np.array(self.records[:self.nb_boards])
+            del self.records
+            with open(self.path, 'wb') as f:
+                np.save(f, records)
+        else:
+            self.records.flush()
+            del self.records
+        self.records = None
+
+
+def load_corpus(path):
+    """Memory-map a corpus
+
+    Returns
+    -------
+    np.ndarray
+        Records of the boards
+    """
+    return np.load(path, mmap_mode='r')
@@ -0,0 +1,253 @@
+"""Library of boards prepared in advance
+
+A library is a directory holding two files:
+
+    boards.bin      little-endian int16 words of all the boards, one after another
+    index.npy       INDEX_DTYPE record of every board, sorted by digest
+
+A board is stored as the number of areas followed by, for each area
+in the order of names, its owner, dice, number of hexes, number
+of neighbours, x and y of every hex and names of the neighbours.
+Names of all areas in the order of the ownership follow, as the order
+in which players get their areas affects the game.
+
+Boards are looked up by the seeds and the number of players they were
+prepared with and by a hash of the board configuration, so that a library
+never serves a board the current configuration would not produce.
+"""
+import hashlib
+import os
+import struct
+
+import hexutil
+import numpy as np
+
+from .board import Board
+
+
+INDEX_DTYPE = np.dtype([
+    ('digest', '<u8'), ('config', '<u8'), ('nb_players', '<u2'),
+    ('board', '<i8'), ('ownership', '<i8'), ('strength', '<i8'),
+    ('offset', '<i8'), ('length', '<i8'),
+])
+WORD_DTYPE = np.dtype('<i2')
+KEY = struct.Struct('<QHqqq')
+
+BOARDS_FILE = 'boards.bin'
+INDEX_FILE = 'index.npy'
+
+
+def config_hash(board_config):
+    """Get a hash of the board configuration
+
+    Parameters
+    ----------
+    board_config : configparser.SectionProxy
+
+    Returns
+    -------
+    int
+    """
+    items = '\n'.join('{}={}'.format(key, value) for key, value in sorted(board_config.items()))
+    return int.from_bytes(hashlib.md5(items.encode()).digest()[:8], 'little')
+
+
+def board_digest(config, nb_players, board_seed, ownership_seed, strength_seed):
+    """Get the digest boards are sorted and looked up by
+
+    Returns
+    -------
+    int
+    """
+    key = KEY.pack(config, nb_players, board_seed, ownership_seed, strength_seed)
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+def encode_board(board, ownership):
+    """Encode a prepared board into words
+
+    Parameters
+    ----------
+    board : Board
+        Board with dice assigned
+    ownership : dict of int: int
+        Owner of every area
+
+    Returns
+    -------
+    np.ndarray of int16
+    """
+    words = [board.get_number_of_areas()]
+    for name in range(1, board.get_number_of_areas() + 1):
+        description = board.board[name]
+        words.extend([
+            ownership[name], board.get_area_by_name(name).get_dice(),
+            len(description['hexes']), len(description['neighbours']),
+        ])
+        for h in description['hexes']:
+            words.extend(h)
+        words.extend(description['neighbours'])
+    words.extend(ownership)
+    return np.array(words, dtype=WORD_DTYPE)
+
+
+def decode_board(words):
+    """Decode a board stored by encode_board()
+
+    Returns
+    -------
+    (Board, dict of int: int)
+        The board with dice assigned and the ownership of its areas
+    """
+    words = words.tolist()
+    description = {}
+    owners = {}
+    dice = {}
+    position = 1
+    for name in range(1, words[0] + 1):
+        owners[name], dice[name], nb_hexes, nb_neighbours = words[position:position + 4]
+        position += 4
+        coordinates = words[position:position + 2 * nb_hexes]
+        position += 2 * nb_hexes
+        description[name] = {
+            'hexes': [hexutil.Hex(x, y) for x, y in zip(coordinates[::2], coordinates[1::2])],
+            'neighbours': words[position:position + nb_neighbours],
+        }
+        position += nb_neighbours
+    ownership = {name: owners[name] for name in words[position:position + words[0]]}
+
+    board = Board(description)
+    for name, area in board.areas.items():
+        area.set_dice(dice[name])
+    return board, ownership
+
+
+class BoardLibrary:
+    """Read-only view of a library
+
+    Both files are memory-mapped, so opening a library costs nothing
+    and a lookup only touches the pages of the index it bisects
+    and of the board it decodes.
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            Directory of the library
+        """
+        self.path = path
+        self.index = np.load(os.path.join(path, INDEX_FILE), mmap_mode='r')
+        if os.path.getsize(os.path.join(path, BOARDS_FILE)):
+            self.data = np.memmap(os.path.join(path, BOARDS_FILE), dtype=WORD_DTYPE, mode='r')
+        else:
+            self.data = np.zeros(0, dtype=WORD_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    def find(self, config, nb_players, board_seed, ownership_seed, strength_seed):
+        """Get position of a board in the index
+
+        Returns
+        -------
+        int
+            Position in the index, None if the library does not hold the board
+        """
+        if board_seed is None or ownership_seed is None or strength_seed is None:
+            return None
+
+        digest = board_digest(config, nb_players, board_seed, ownership_seed, strength_seed)
+        position = int(np.searchsorted(self.index['digest'], digest))
+        while position < len(self.index) and self.index['digest'][position] == digest:
+            record = self.index[position]
+            if (record['config'], record['nb_players'], record['board'], record['ownership'], record['strength']) \
+                    == (config, nb_players, board_seed, ownership_seed, strength_seed):
+                return position
+            position += 1
+        return None
+
+    def get(self, board_config, nb_players, board_seed, ownership_seed, strength_seed):
+        """Get a prepared board
+
+        Returns
+        -------
+        (Board, dict of int: int)
+            The board and the ownership of its areas, None if the library
+            does not hold the board or any of the seeds is None
+        """
+        position = self.find(config_hash(board_config), nb_players, board_seed, ownership_seed, strength_seed)
+        if position is None:
+            return None
+        record = self.index[position]
+        return decode_board(self.data[record['offset']:record['offset'] + record['length']])
+
+
+class BoardLibraryWriter:
+    """Writer adding boards to a new or an existing library
+
+    Boards are appended to the data file as they come, the index
+    is sorted and written by close().
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            Directory of the library, created if it does not exist
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, INDEX_FILE)
+        self.records = np.load(index_path).tolist() if os.path.exists(index_path) else []
+        self.keys = {tuple(record[1:6]) for record in self.records}
+
+        self.file = open(os.path.join(path, BOARDS_FILE), 'ab')
+        self.offset = self.file.tell() // WORD_DTYPE.itemsize
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, key):
+        """
+        Parameters
+        ----------
+        key : (int, int, int, int, int)
+            Configuration hash, number of players and the three seeds
+        """
+        return key in self.keys
+
+    def add(self, board_config, nb_players, board_seed, ownership_seed, strength_seed, board, ownership):
+        """Add a prepared board, unless the library already holds it
+
+        Returns
+        -------
+        bool
+            Whether the board was added
+        """
+        if board_seed is None or ownership_seed is None or strength_seed is None:
+            raise ValueError("Only boards prepared from fixed seeds can be stored")
+
+        key = (config_hash(board_config), nb_players, board_seed, ownership_seed, strength_seed)
+        if key in self.keys:
+            return False
+
+        words = encode_board(board, ownership)
+        self.file.write(words.tobytes())
+        self.records.append((board_digest(*key),) + key + (self.offset, len(words)))
+        self.keys.add(key)
+        self.offset += len(words)
+        return True
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+
+        index = np.array(self.records, dtype=INDEX_DTYPE)
+        index.sort(order='digest')
+        np.save(os.path.join(self.path, INDEX_FILE), index)
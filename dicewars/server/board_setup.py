@@ -0,0 +1,161 @@
+import logging
+import random
+
+from itertools import cycle
+
+from ..config import board_bounds
+from .board import Board
+from .generator import BoardGenerator, FlatBoardGenerator
+
+
+def area_player_mapping(nb_players, nb_areas, rng=random):
+    assignment = {}
+    unassigned_areas = list(range(1, nb_areas+1))
+    player_cycle = cycle(range(1, nb_players+1))
+
+    while unassigned_areas:
+        player_no = next(player_cycle)
+        # draws the same as rng.choice(), without looking the area up again to remove it
+        area_no = unassigned_areas.pop(rng.randrange(len(unassigned_areas)))
+        assignment[area_no] = player_no
+
+    return assignment
+
+
+def continuous_area_player_mapping(nb_players, board, rng=random):
+    assignment = {}
+    nb_areas = board.get_number_of_areas()
+    unassigned_areas = set(range(1, nb_areas+1))
+    player_cycle = cycle(range(1, nb_players+1))
+
+    def unassigned_neighbours(area):
+        return {area for area in board.get_area_by_name(area_no).get_adjacent_areas_names() if area in unassigned_areas}
+
+    def assign_area(area_no, player):
+        assignment[area_no] = player_no
+        unassigned_areas.remove(area_no)
+
+    available_to_player = dict()
+    for player_no in range(1, nb_players+1):
+        area_no = rng.choice(list(unassigned_areas))
+        assign_area(area_no, player_no)
+        available_to_player[player_no] = unassigned_neighbours(area_no)
+
+    while unassigned_areas:
+        player_no = next(player_cycle)
+        available_to_player[player_no] &= unassigned_areas
+
+        if not available_to_player[player_no]:
+            logging.info(f"Player {player_no} has no options more")
+            continue
+
+        area_no = rng.choice(list(available_to_player[player_no]))
+        assign_area(area_no, player_no)
+        available_to_player[player_no].remove(area_no)
+
+        available_to_player[player_no] |= unassigned_neighbours(area_no)
+
+    return assignment
+
+
+def assign_dice_flat(board, nb_players, ownership, dice_density):
+    for area in board.areas.values():
+        area.set_dice(dice_density)
+
+
+def assign_dice_random(board, nb_players, ownership, dice_density, max_dice_per_area=8, rng=random):
+    dice_total = dice_density * board.get_number_of_areas()
+
+    areas_of = {player: [] for player in range(1, nb_players+1)}
+    for area_name, player in ownership.items():
+        areas_of[player].append(board.get_area_by_name(area_name))
+
+    for player in range(1, nb_players+1):
+        player_dice = dice_total // nb_players
+
+        available_areas = areas_of[player]
+
+        # each area has to have at least one die
+        for area in available_areas:
+            area.set_dice(1)
+            player_dice -= 1
+
+        while player_dice >= 0 and available_areas:
+            i = rng.randrange(len(available_areas))
+            area = available_areas[i]
+            if area.get_dice() >= max_dice_per_area:
+                available_areas.pop(i)
+            else:
+                area.dice += 1
+                player_dice -= 1
+
+
+def create_board(board_config, rng=random):
+    generator_version = board_config.getint('GeneratorVersion', fallback=1)
+    bounds = board_bounds(board_config)
+    if generator_version == 1:
+        generator = BoardGenerator(*bounds, rng=rng)
+    elif generator_version == 2:
+        generator = FlatBoardGenerator(rng.getrandbits(64), *bounds)
+    else:
+        raise ValueError(f'Unsupported board generator version {generator_version}')
+    return Board(generator.generate_board(board_config.getint('BoardSize')))
+
+
+def produce_area_assignment(board_config, board, nb_players, rng=random):
+    area_assignment_method = board_config.get('AreaAssignment')
+    if area_assignment_method == 'orig':
+        area_ownership = area_player_mapping(nb_players, board.get_number_of_areas(), rng=rng)
+    elif area_assignment_method == 'continuous':
+        area_ownership = continuous_area_player_mapping(nb_players, board, rng=rng)
+    else:
+        raise ValueError(f'Unsupported area assignment method "{area_assignment_method}"')
+
+    return area_ownership
+
+
+def assign_dice(board_config, board, nb_players, area_ownership, rng=random):
+    dice_assignment_method = board_config.get('DiceAssignment')
+    dice_density = board_config.getint('DiceDensity')
+    if dice_assignment_method == 'orig':
+        assign_dice_random(
+            board=board,
+            nb_players=nb_players,
+            ownership=area_ownership,
+            dice_density=dice_density,
+            rng=rng,
+        )
+    elif dice_assignment_method == 'flat':
+        assign_dice_flat(board, nb_players, area_ownership, dice_density)
+    else:
+        raise ValueError(f'Unsupport dice assignment method "{dice_assignment_method}"')
+
+
+def prepare_board(board_config, nb_players, board_seed=None, ownership_seed=None, strength_seed=None, library=None):
+    """Create a board, assign its areas to players and dice to its areas
+
+    Every step draws from its own random.Random seeded with its seed,
+    None meaning seeding from the current time, so the global random
+    generator is left alone.
+
+    Parameters
+    ----------
+    library : BoardLibrary
+        Library to take the board from if it holds one prepared from the same
+        seeds and configuration, otherwise the board is prepared from scratch
+
+    Returns
+    -------
+    (Board, dict of int: int)
+        The board and the ownership of its areas
+    """
+    if library is not None:
+        prepared = library.get(board_config, nb_players, board_seed, ownership_seed, strength_seed)
+        if prepared is not None:
+            return prepared
+
+    board = create_board(board_config, rng=random.Random(board_seed))
+    area_ownership = produce_area_assignment(board_config, board, nb_players, rng=random.Random(ownership_seed))
+    assign_dice(board_config, board, nb_players, area_ownership, rng=random.Random(strength_seed))
+
+    return board, area_ownership
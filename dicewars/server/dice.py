@@ -0,0 +1,123 @@
+import numpy as np
+
+
+class DiceRoller:
+    """Source of randomness of a single game
+
+    Battles, distribution of dice and the order of players each draw from
+    their own stream derived from the seed of the game, so that e.g. a change
+    in the number of battles does not affect the player order of another game
+    played with the same seed.
+    Dice for battles are rolled in blocks, so that a battle only sums
+    a slice of a pre-drawn list.
+    """
+    def __init__(self, seed=None, block_size=4096):
+        """
+        Parameters
+        ----------
+        seed : int
+            Seed of the game, None for a fresh entropy
+        block_size : int
+            Number of dice rolled at once for battles
+        """
+        battle_seed, distribution_seed, order_seed = np.random.SeedSequence(seed).spawn(3)
+        self.battle_rng = np.random.default_rng(battle_seed)
+        self.distribution_rng = np.random.default_rng(distribution_seed)
+        self.order_rng = np.random.default_rng(order_seed)
+
+        self.block_size = block_size
+        self.block = []
+        self.position = 0
+
+    def roll(self, nb_dice):
+        """Roll dice and sum them
+
+        Parameters
+        ----------
+        nb_dice : int
+
+        Returns
+        -------
+        int
+        """
+        if self.position + nb_dice > len(self.block):
+            self.block = self.battle_rng.integers(1, 7, size=max(self.block_size, nb_dice), dtype=np.uint8).tolist()
+            self.position = 0
+
+        start = self.position
+        self.position += nb_dice
+        return sum(self.block[start:self.position])
+
+    def allocate(self, capacities, nb_dice):
+        """Distribute dice among areas
+
+        Each die goes to an area chosen uniformly among those not full yet.
+        Rather than drawing for every die, uniform picks among areas with
+        room left are drawn in a block, and a pick is accepted while its area
+        has room. This is rejection sampling of the one-by-one process, so
+        the first nb_dice accepted picks have exactly its distribution.
+
+        Parameters
+        ----------
+        capacities : list of int
+            Number of dice each area can take
+        nb_dice : int
+
+        Returns
+        -------
+        list of int
+            Number of dice given to each area
+        """
+        counts = [0] * len(capacities)
+        remaining = min(nb_dice, sum(capacities))
+
+        while remaining > 0:
+            open_areas = [i for i, capacity in enumerate(capacities) if counts[i] < capacity]
+            for pick in self.distribution_rng.integers(len(open_areas), size=2 * remaining + 8).tolist():
+                area = open_areas[pick]
+                if counts[area] < capacities[area]:
+                    counts[area] += 1
+                    remaining -= 1
+                    if not remaining:
+                        break
+
+        return counts
+
+    def shuffled(self, items):
+        """Get items in random order of players
+
+        Parameters
+        ----------
+        items : list
+
+        Returns
+        -------
+        list
+        """
+        return [items[i] for i in self.order_rng.permutation(len(items))]
+
+    def get_state(self):
+        """Get the state of all the streams
+
+        The block of pre-drawn dice is shared, not copied, as it is only
+        ever replaced, never modified.
+
+        Returns
+        -------
+        tuple
+        """
+        return (
+            self.battle_rng.bit_generator.state,
+            self.distribution_rng.bit_generator.state,
+            self.order_rng.bit_generator.state,
+            self.block,
+            self.position,
+        )
+
+    def set_state(self, state):
+        """Restore streams to a state obtained from get_state()
+        """
+        battle_state, distribution_state, order_state, self.block, self.position = state
+        self.battle_rng.bit_generator.state = battle_state
+        self.distribution_rng.bit_generator.state = distribution_state
+        self.order_rng.bit_generator.state = order_state
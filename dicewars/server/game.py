@@ -1,12 +1,18 @@
 import json
 from json.decoder import JSONDecodeError
 import logging
-import random
 from typing import List
 import numpy as np
+import select
 import socket
 import sys
+import time
 
+from dicewars import protocol
+from dicewars.board_state import BoardState
+from dicewars.config import max_players
+
+from .dice import DiceRoller
 from .player import Player
 
 from .summary import GameSummary
@@ -15,7 +21,8 @@ from .summary import GameSummary
 class Game:
     """Instance of the game
     """
-    def __init__(self, board, area_ownership, players, game_config, addr, port, nicknames_order):
+    def __init__(self, board, area_ownership, players, game_config, addr, port, nicknames_order, seed=None,
+                 recorder=None, replay=None, instrumentation=None):
         """Initialize game and connect clients
 
         Parameters
@@ -26,6 +33,15 @@ class Game:
             IP address of the server
         port : int
             Port number
+        seed : int
+            Seed for player order, dice rolls and distribution of dice
+        recorder
+            Optional recorder of game states, having record(board, players)
+            called after every move and finish(winner) at the end of the game
+        replay : ReplayWriter
+            Optional writer of a replay log of the game
+        instrumentation : GameInstrumentation
+            Optional collector of timings and traffic of the game
 
         Attributes
         ----------
@@ -39,11 +55,15 @@ class Game:
 
         self.address = addr
         self.port = port
+        if players > max_players(game_config):
+            raise ValueError("Game can have at most {} players, not {}".format(max_players(game_config), players))
         self.number_of_players = players
 
         self.nb_players_alive = players
         self.nb_consecutive_end_of_turns = 0
         self.nb_battles = 0
+        self.state_version = 0
+        self.score_changes = {}
 
         self.reserve_production_cap = game_config.getint('ReserveProductionCap')
         self.reserve_type = game_config.get('ReserveType')
@@ -61,6 +81,11 @@ class Game:
         else:
             raise ValueError(f'Unknown deployement method "{deployment_method}"')
 
+        self.dice = DiceRoller(seed)
+        self.recorder = recorder
+        self.replay = replay
+        self.instrumentation = instrumentation
+
         self.create_socket()
 
         self.board = board
@@ -72,8 +97,13 @@ class Game:
         self.report_player_order()
 
         self.assign_areas_to_players(area_ownership)
+        self.board_state = BoardState.from_board(self.board)
+        self.published_scores = self.get_scores()
         self.logger.debug("Board initialized")
 
+        if self.replay is not None:
+            self.replay.start(self)
+
         for player in self.players.values():
             self.send_message(player, 'game_start')
 
@@ -82,9 +112,7 @@ class Game:
     def run(self):
         """Main loop of the game
         """
-        from NN_scripts.game import game_configuration, save_game_configurations
-        configurations = list()
-
+        winner = None
         try:
             for i in range(1, self.number_of_players + 1):
                 player = self.players[i]
@@ -94,20 +122,13 @@ class Game:
                 self.handle_player_turn()
                 if self.check_win_condition():
                     sys.stdout.write(str(self.summary))
-                    for i, p in self.players.items():
-                        if p.get_number_of_areas() == self.board.get_number_of_areas():
-                            save_game_configurations(
-                                winner_index=i,
-                                configurations=configurations,
-                            )
-                            break
+                    if self.instrumentation is not None:
+                        sys.stdout.write('\n' + str(self.instrumentation))
+                    winner = self.get_winner()
                     break
 
-                serialised_game = game_configuration(
-                    board=self.board,
-                    players=self.players,
-                )
-                configurations.append(serialised_game)
+                if self.recorder is not None:
+                    self.recorder.record(self.board, self.players)
 
         except KeyboardInterrupt:
             self.logger.info("Game interrupted.")
@@ -121,6 +142,11 @@ class Game:
         except ConnectionResetError:
             self.logger.error("ConnectionResetError", exc_info=True)
 
+        if self.recorder is not None:
+            self.recorder.finish(winner)
+        if self.replay is not None:
+            self.replay.finish(winner)
+
         try:
             self.close_connections()
         except BrokenPipeError:
@@ -147,27 +173,55 @@ class Game:
         """
         self.logger.debug("Handling player {} ({}) turn".format(self.current_player.get_name(), self.current_player.nickname))
         player = self.current_player.get_name()
-        msg = self.get_message(player)
+        if self.instrumentation is None:
+            self.process_message(player, self.get_message(player))
+        else:
+            start = time.perf_counter()
+            msg = self.get_message(player)
+            received = time.perf_counter()
+            self.process_message(player, msg)
+            self.instrumentation.add_turn(
+                self.players[player].get_nickname(), msg['type'], received - start, time.perf_counter() - received)
+
+    def process_message(self, player, msg):
+        """Carry out the action requested by the current player
 
+        Parameters
+        ----------
+        player : int
+            Name of the player who sent the message
+        msg : dict
+            Decoded message
+        """
         if msg['type'] == 'battle':
             self.nb_consecutive_end_of_turns = 0
             battle = self.battle(self.board.get_area_by_name(msg['atk']), self.board.get_area_by_name(msg['def']))
             self.summary.add_battle()
             self.logger.debug("Battle result: {}".format(battle))
-            for p in self.players:
-                self.send_message(self.players[p], 'battle', battle=battle)
+            if self.replay is not None:
+                self.replay.battle(self, battle)
+            self.new_state_version()
+            self.broadcast_message('battle', battle=battle)
 
         elif msg['type'] == 'end_turn':
             self.nb_consecutive_end_of_turns += 1
             affected_areas = self.end_turn()
-            for p in self.players:
-                self.send_message(self.players[p], 'end_turn', areas=affected_areas)
+            if self.replay is not None:
+                self.replay.end_turn(self, player, affected_areas)
+            self.new_state_version()
+            self.broadcast_message('end_turn', areas=affected_areas)
 
         elif msg['type'] == 'transfer':
             self.nb_consecutive_end_of_turns = 0
             transfer = self.transfer(self.board.get_area_by_name(msg['src']), self.board.get_area_by_name(msg['dst']))
-            for p in self.players:
-                self.send_message(self.players[p], 'transfer', transfer=transfer)
+            if self.replay is not None:
+                self.replay.transfer(self, transfer)
+            self.new_state_version()
+            self.broadcast_message('transfer', transfer=transfer)
+
+        elif msg['type'] == 'state_request':
+            self.logger.debug("Player {} requested full game state".format(player))
+            self.send_message(self.current_player, 'game_state')
 
         else:
             self.logger.warning(f'Unexpected message type: {msg["type"]}')
@@ -179,28 +233,65 @@ class Game:
         -------
         dict
             Dictionary containing owner, dice and adjacent areas of
-            each area, as well as score of each player
+            each area, score of each player and version of the state
         """
         game_state = {
             'areas': {}
         }
 
-        for a in self.board.areas:
-            area = self.board.areas[a]
+        for area in self.board.areas.values():
             game_state['areas'][area.name] = {
                 'adjacent_areas': area.get_adjacent_areas_names(),
                 'owner': area.get_owner_name(),
                 'dice': area.get_dice()
             }
 
-        game_state['score'] = {}
-
-        for p in self.players:
-            player = self.players[p]
-            game_state['score'][player.get_name()] = player.get_largest_region(self.board)
+        game_state['score'] = self.get_scores()
+        game_state['version'] = self.state_version
 
         return game_state
 
+    def get_scores(self):
+        """Get score of each player
+
+        Returns
+        -------
+        dict of int: int
+        """
+        return {player.get_name(): player.get_largest_region(self.board) for player in self.players.values()}
+
+    def get_update(self, delta):
+        """Get the part of a message informing about the state of the game
+
+        Parameters
+        ----------
+        delta : bool
+            When True, only scores changed since the previous version are
+            included, the changed areas being described by the message itself.
+            Otherwise, the full game state is given.
+
+        Returns
+        -------
+        dict
+        """
+        if delta:
+            return {
+                'score': dict(self.score_changes),
+                'version': self.state_version,
+            }
+        else:
+            return self.get_state()
+
+    def new_state_version(self):
+        """Mark the game state as changed, noting which scores have changed
+        """
+        self.state_version += 1
+        scores = self.get_scores()
+        self.score_changes = {
+            name: score for name, score in scores.items() if self.published_scores.get(name) != score
+        }
+        self.published_scores = scores
+
     def battle(self, attacker, defender):
         """Carry out a battle
 
@@ -214,15 +305,12 @@ class Game:
         self.nb_battles += 1
         atk_dice = attacker.get_dice()
         def_dice = defender.get_dice()
-        atk_pwr = def_pwr = 0
 
         atk_name = attacker.get_owner_name()
         def_name = defender.get_owner_name()
 
-        for i in range(0, atk_dice):
-            atk_pwr += random.randint(1, 6)
-        for i in range(0, def_dice):
-            def_pwr += random.randint(1, 6)
+        atk_pwr = self.dice.roll(atk_dice)
+        def_pwr = self.dice.roll(def_dice)
 
         battle = {
             'atk': {
@@ -262,6 +350,7 @@ class Game:
                 'pwr': def_pwr
             }
 
+        self.update_board_state([attacker, defender])
         return battle
 
     def transfer(self, source, destination):
@@ -279,6 +368,7 @@ class Game:
 
         source.set_dice(src_dice - dice_moved)
         destination.set_dice(dst_dice + dice_moved)
+        self.update_board_state([source, destination])
 
         transfer = {
             'src': {
@@ -345,23 +435,27 @@ class Game:
         return available_for_deployment, free_dice
 
     def distribute_player_dice(self, player, available_for_deployment):
-        areas = []
-        for area in self.current_player.get_areas():
-            areas.append(area)
+        areas = self.current_player.get_areas()
+        capacities = [max(self.max_dice_per_area - area.get_dice(), 0) for area in areas]
+        dice_given = self.dice.allocate(capacities, available_for_deployment)
 
         affected_areas = []
-        while available_for_deployment and areas:
-            area = random.choice(areas)
-            if area.get_dice() >= self.max_dice_per_area:
-                areas.remove(area)
-            else:
-                if area not in affected_areas:
-                    affected_areas.append(area)
-                area.dice += 1
-                available_for_deployment -= 1
+        for area, nb_dice in zip(areas, dice_given):
+            if nb_dice:
+                area.dice += nb_dice
+                affected_areas.append(area)
+        self.update_board_state(affected_areas)
 
         return affected_areas
 
+    def update_board_state(self, areas):
+        """Copy owners and dice of changed areas into board_state
+        """
+        owner, dice = self.board_state.owner, self.board_state.dice
+        for area in areas:
+            owner[area.name] = area.owner_name
+            dice[area.name] = area.dice
+
     def set_first_player(self):
         """Set first player
         """
@@ -429,12 +523,81 @@ class Game:
 
         return False
 
+    def get_winner(self):
+        """Get name of the player holding all the areas
+
+        Returns
+        -------
+        int
+            None if there is no such player
+        """
+        for name, player in self.players.items():
+            if player.get_number_of_areas() == self.board.get_number_of_areas():
+                return name
+        return None
+
     def process_win(self, player_nick, player_name):
         self.summary.set_winner(player_nick)
         self.logger.info("Player {} ({}) wins!".format(player_nick, player_name))
         for i in self.players:
             self.send_message(self.players[i], 'game_end', winner=player_name)
 
+    #############
+    # SNAPSHOTS #
+    #############
+    def snapshot(self):
+        """Capture the state of the game
+
+        Owners and dice of areas are taken from board_state, which is kept
+        up to date by every move, so they cost two array copies.
+
+        Returns
+        -------
+        GameSnapshot
+        """
+        return GameSnapshot(
+            board_state=self.board_state.copy(),
+            player_areas={name: [area.get_name() for area in player.get_areas()] for name, player in self.players.items()},
+            reserves={name: player.get_reserve() for name, player in self.players.items()},
+            current_player=self.current_player.get_name(),
+            players_order=list(self.players_order),
+            counters=(self.nb_players_alive, self.nb_consecutive_end_of_turns, self.nb_battles),
+            scores=(self.state_version, dict(self.published_scores), dict(self.score_changes)),
+            summary=(self.summary.winner, self.summary.nb_battles, list(self.summary.eliminations)),
+            dice_state=self.dice.get_state(),
+        )
+
+    def restore(self, snapshot):
+        """Return the game to a captured state
+
+        Clients are not informed, if the game goes on with them, they
+        should be sent 'game_state'.
+
+        Parameters
+        ----------
+        snapshot : GameSnapshot
+            State obtained from snapshot() of this game
+        """
+        self.board_state = snapshot.board_state.copy()
+        owner, dice = self.board_state.owner.tolist(), self.board_state.dice.tolist()
+        for name, area in self.board.areas.items():
+            area.set_owner_name(owner[name])
+            area.set_dice(dice[name])
+
+        for name, player in self.players.items():
+            player.set_areas([self.board.get_area_by_name(area) for area in snapshot.player_areas[name]])
+            player.set_reserve(snapshot.reserves[name])
+
+        self.current_player = self.players[snapshot.current_player]
+        self.players_order = list(snapshot.players_order)
+        self.nb_players_alive, self.nb_consecutive_end_of_turns, self.nb_battles = snapshot.counters
+        self.state_version, published_scores, score_changes = snapshot.scores
+        self.published_scores = dict(published_scores)
+        self.score_changes = dict(score_changes)
+        self.summary.winner, self.summary.nb_battles, eliminations = snapshot.summary
+        self.summary.eliminations = list(eliminations)
+        self.dice.set_state(snapshot.dice_state)
+
     ##############
     # NETWORKING #
     ##############
@@ -451,8 +614,22 @@ class Game:
         str
             Decoded message from the client
         """
-        raw_message = self.client_sockets[player].recv(self.buffer)
-        msg = json.loads(raw_message.decode())
+        client_socket = self.client_sockets[player]
+        decoder = self.players[player].frame_decoder
+        if decoder is None:
+            self.wait_for_client(client_socket)
+            raw_message = client_socket.recv(self.buffer)
+            msg = json.loads(raw_message.decode())
+        else:
+            msg = decoder.next_message()
+            while msg is None:
+                self.wait_for_client(client_socket)
+                data = client_socket.recv(self.buffer)
+                if not data:
+                    raise ConnectionResetError("Client {} closed the connection".format(player))
+                decoder.feed(data)
+                msg = decoder.next_message()
+
         self.logger.debug("Got message from client {}: {}".format(player, msg))
         return msg
 
@@ -473,6 +650,90 @@ class Game:
             Areas changed during the turn
         """
         self.logger.debug("Sending msg type '{}' to client {}".format(type, client.get_name()))
+        if self.instrumentation is not None:
+            start = time.perf_counter()
+        msg = self.build_message(
+            client, type, battle=battle, winner=winner, areas=areas, transfer=transfer,
+            delta=client.get_state_updates() == 'delta',
+        )
+        data = self.encode_message(msg, client.get_protocol())
+        if self.instrumentation is not None:
+            self.instrumentation.add_serialization(type, time.perf_counter() - start, len(data))
+        client.send_bytes(data)
+
+    def broadcast_message(self, type, **kwargs):
+        """Send message of the same content to all clients
+
+        The message is built and encoded only once for each kind of state
+        updates the clients use, all the clients then get the same bytes.
+
+        Parameters
+        ----------
+        type : str
+            Type of message
+        kwargs
+            Content of the message, see send_message()
+        """
+        self.logger.debug("Broadcasting msg type '{}'".format(type))
+        if self.instrumentation is not None:
+            start = time.perf_counter()
+        encoded = {}
+        data_for = {}
+        for player in self.players.values():
+            wire_format = (player.get_protocol(), player.get_state_updates())
+            if wire_format not in encoded:
+                msg = self.build_message(None, type, delta=wire_format[1] == 'delta', **kwargs)
+                encoded[wire_format] = self.encode_message(msg, wire_format[0])
+            data_for[player] = encoded[wire_format]
+        if self.instrumentation is not None:
+            nb_bytes = sum(len(data) for data in data_for.values())
+            self.instrumentation.add_serialization(type, time.perf_counter() - start, nb_bytes)
+
+        for player, data in data_for.items():
+            player.send_bytes(data)
+
+    def encode_message(self, msg, protocol_name):
+        """Encode message using given protocol
+
+        Parameters
+        ----------
+        msg : dict
+        protocol_name : str
+            'json' for a null-terminated JSON string, 'binary' for a frame
+
+        Returns
+        -------
+        bytes
+        """
+        if protocol_name == 'binary':
+            return protocol.encode_message(msg)
+        else:
+            return (json.dumps(msg) + '\0').encode()
+
+    def wait_for_client(self, client_socket):
+        """Wait until a client socket is readable
+
+        Meanwhile, pending output is sent to clients which are able to receive it.
+        """
+        while True:
+            sending = {p.socket: p for p in self.players.values() if p.has_client() and p.has_pending_output()}
+            readable, writable, _ = select.select([client_socket], list(sending), [])
+            for sock in writable:
+                sending[sock].flush()
+            if readable:
+                return
+
+    def build_message(self, client, type, battle=None, winner=None, areas=None, transfer=None, delta=False):
+        """Build content of a message for a client
+
+        Parameters are the same as for send_message(), with delta telling
+        whether the client wants state updates as changes only.
+
+        Returns
+        -------
+        dict
+            The message, ready to be serialized
+        """
         if type == 'game_start':
             msg = self.get_state()
             msg['type'] = 'game_start'
@@ -488,19 +749,22 @@ class Game:
             msg['player'] = client.get_name()
             msg['no_players'] = self.number_of_players
             msg['current_player'] = self.current_player.get_name()
+            msg['reserves'] = {
+                i: self.players[i].get_reserve() for i in self.players
+            }
 
         elif type == 'battle':
-            msg = self.get_state()
+            msg = self.get_update(delta)
             msg['type'] = 'battle'
             msg['result'] = battle
 
         elif type == 'transfer':
-            msg = self.get_state()
+            msg = self.get_update(delta)
             msg['type'] = 'transfer'
             msg['result'] = transfer
 
         elif type == 'end_turn':
-            msg = self.get_state()
+            msg = self.get_update(delta)
             msg['type'] = 'end_turn'
             msg['areas'] = areas
             msg['current_player'] = self.current_player.get_name()
@@ -517,8 +781,7 @@ class Game:
         elif type == 'close_socket':
             msg = {'type': 'close_socket'}
 
-        msg = json.dumps(msg)
-        client.send_message(msg + '\0')
+        return msg
 
     def create_socket(self):
         """Initiate server socket
@@ -546,6 +809,8 @@ class Game:
             if hello_msg['type'] != 'client_desc':
                 raise ValueError("Client send a wrong-type hello message '{}'".format(hello_msg))
             self.players[i].set_nickname(hello_msg['nickname'])
+            self.players[i].set_state_updates(hello_msg.get('state_updates', 'full'))
+            self.players[i].set_protocol(hello_msg.get('protocol', 'json'))
 
         self.logger.debug("Successfully assigned clients to all players")
 
@@ -598,8 +863,16 @@ class Game:
         return False
 
     def close_connections(self):
-        """Close server's socket
+        """Send out pending messages and close server's socket
         """
+        for player in self.players.values():
+            if not player.has_client():
+                continue
+            try:
+                player.flush_all()
+            except ConnectionError:
+                self.logger.warning("Could not deliver last messages to client {}".format(player.get_name()))
+
         self.logger.debug("Closing server socket")
         self.socket.close()
 
@@ -611,8 +884,7 @@ class Game:
         for i in range(1, self.number_of_players + 1):
             self.players[i] = Player(i)
 
-        self.players_order = list(range(1, self.number_of_players + 1))
-        random.shuffle(self.players_order)
+        self.players_order = self.dice.shuffled(list(range(1, self.number_of_players + 1)))
 
         self.set_first_player()
         self.logger.debug("Player order {0}".format(self.players_order))
@@ -650,6 +922,33 @@ class Game:
         self.logger.info('Player order: {}'.format([(name, self.players[name].nickname) for name in self.players_order]))
 
 
+class GameSnapshot:
+    """State of a game captured by Game.snapshot()
+
+    Owners and dice of areas are kept in a BoardState sharing the topology
+    with the game, players' areas by names in the order the players hold them.
+    """
+    def __init__(self, board_state, player_areas, reserves, current_player, players_order,
+                 counters, scores, summary, dice_state):
+        self.board_state = board_state
+        self.player_areas = player_areas
+        self.reserves = reserves
+        self.current_player = current_player
+        self.players_order = players_order
+        self.counters = counters
+        self.scores = scores
+        self.summary = summary
+        self.dice_state = dice_state
+
+    @property
+    def owner(self):
+        return self.board_state.owner
+
+    @property
+    def dice(self):
+        return self.board_state.dice
+
+
 class UnlimitedDeployment:
     def __init__(self, max_val):
         self.max_dice_per_area = max_val
@@ -1,21 +1,32 @@
+from functools import lru_cache
+
 import hexutil
-from random import randint, choice as rand_choice, shuffle
+import numpy as np
+import random
 
 
 class BoardGenerator:
     """Generator of game board
     """
-    def __init__(self):
+    def __init__(self, min_x=-32, max_x=30, min_y=-14, max_y=13, rng=None):
         """
+        Parameters
+        ----------
+        min_x, max_x, min_y, max_y : int
+            Boundary values for Hex coordinates, see dicewars.config.board_bounds()
+        rng : random.Random
+            Generator of random numbers, the global one of module random if None
+
         Attributes
         ----------
         min_x, max_x, min_y, max_y : int
             Boundary values for Hex coordinates
         """
-        self.min_x = -32
-        self.max_x = 30
-        self.min_y = -14
-        self.max_y = 13
+        self.min_x = min_x
+        self.max_x = max_x
+        self.min_y = min_y
+        self.max_y = max_y
+        self.rng = random if rng is None else rng
         self.coordinates = [(x, y) for x in range(self.min_x + 2, self.max_x, 2)
                             for y in range(self.min_y + 1, self.max_y)]
         for i in range(len(self.coordinates)):
@@ -30,12 +41,12 @@ class BoardGenerator:
         hexutil.Hex
             Random hex from within the game board
         """
-        y = randint(self.min_y, self.max_y)
+        y = self.rng.randint(self.min_y, self.max_y)
         while True:
             if y % 2 == 0:
-                x = randint(self.min_x, self.max_x)
+                x = self.rng.randint(self.min_x, self.max_x)
             else:
-                x = randint(self.min_x + 1, self.max_x + 1)
+                x = self.rng.randint(self.min_x + 1, self.max_x + 1)
             if (x + y) % 2 == 0:
                 break
         return hexutil.Hex(x, y)
@@ -60,7 +71,7 @@ class BoardGenerator:
                 for j in range(self.min_x + 1, self.max_x + 2, 2):
                     self.a[i][j] = 0
 
-        for i in range(1, nb_base_areas + randint(0, nb_max_extra_areas)):
+        for i in range(1, nb_base_areas + self.rng.randint(0, nb_max_extra_areas)):
             self.__create_area(i)
         self.__add_neighbours()
 
@@ -71,7 +82,7 @@ class BoardGenerator:
         """
         self.possible_hexes = []
         i = 0
-        size = randint(12, 18)
+        size = self.rng.randint(12, 18)
         while i < size:
             ret = self.__add_hex_to_area(area)
             i += 1
@@ -126,7 +137,7 @@ class BoardGenerator:
     def __start_area(self, area):
         """Add first Hex to an area
         """
-        shuffle(self.coordinates)
+        self.rng.shuffle(self.coordinates)
         for coord in self.coordinates:
             x = coord[0]
             y = coord[1]
@@ -149,7 +160,7 @@ class BoardGenerator:
         """
         while True:
             if self.h != self.areas[area]['hexes'][0] or self.h not in self.possible_hexes:
-                self.h = rand_choice(self.possible_hexes)
+                self.h = self.rng.choice(self.possible_hexes)
 
             n = self.__neighbour()
             if n:
@@ -177,7 +188,7 @@ class BoardGenerator:
         """Get random adjacent Hex
         """
         ns = self.h.neighbours()
-        shuffle(ns)
+        self.rng.shuffle(ns)
         for n in ns:
             if n.y in self.a and n.x in self.a[n.y]:
                 if self.a[n.y][n.x] != 2:
@@ -198,3 +209,267 @@ class BoardGenerator:
                             if n in self.areas[k]['hexes']:
                                 if k not in self.areas[a]['neighbours']:
                                     self.areas[a]['neighbours'].append(k)
+
+
+class HexGrid:
+    """Flat numbering of hexes within boundaries
+
+    Hexes are numbered row by row, every row and column padded by an invalid
+    hex at both ends, so that all six neighbours of a valid hex have numbers
+    and no bounds need to be checked.
+
+    Attributes
+    ----------
+    size : int
+        Number of hexes including the padding
+    neighbours : np.ndarray of int, shape (size, 6)
+        Numbers of neighbouring hexes in the order of hexutil.Hex.neighbours(),
+        padding hexes have the first hex (itself padding) for all neighbours
+    neighbour_lists : list of tuple of int
+        The same as lists, for use in loops
+    valid : list of int
+        Numbers of all hexes within the boundaries
+    inner : list of bool
+        Whether a hex is valid and not on the edge of the board
+    hexes : list of hexutil.Hex
+        Coordinates of every hex, None for padding
+    """
+    def __init__(self, min_x, max_x, min_y, max_y):
+        self.min_x = min_x
+        self.min_y = min_y
+        self.width = (max_x - min_x) // 2 + 3
+        self.height = max_y - min_y + 3
+        self.size = self.width * self.height
+
+        rows, columns = np.divmod(np.arange(self.size), self.width)
+        ys = rows + min_y - 1
+        parities = ys % 2
+        xs = min_x + 2 * (columns - 1) + parities
+        is_valid = (rows > 0) & (rows < self.height - 1) & (columns > 0) & (columns < self.width - 1)
+
+        # (row, column) offsets of neighbours, the column offset depending on parity of the row
+        offsets = [(0, 1, 0), (1, 0, 1), (1, -1, 1), (0, -1, 0), (-1, -1, 1), (-1, 0, 1)]
+        self.neighbours = np.zeros((self.size, 6), dtype=int)
+        for i, (dr, dc, parity_shift) in enumerate(offsets):
+            self.neighbours[is_valid, i] = ((rows + dr) * self.width + columns + dc + parity_shift * parities)[is_valid]
+        self.neighbour_lists = [tuple(n) for n in self.neighbours.tolist()]
+
+        is_inner = (rows > 1) & (rows < self.height - 2) & (columns > 1) & (columns < self.width - 2)
+        self.valid = np.flatnonzero(is_valid).tolist()
+        self.inner = is_inner.tolist()
+        self.hexes = [hexutil.Hex(x, y) if v else None for x, y, v in zip(xs.tolist(), ys.tolist(), is_valid)]
+
+    def number(self, h):
+        """Get number of a hex within the boundaries
+
+        Parameters
+        ----------
+        h : hexutil.Hex or (int, int)
+
+        Returns
+        -------
+        int
+        """
+        x, y = h
+        return (y - self.min_y + 1) * self.width + (x - self.min_x - y % 2) // 2 + 1
+
+
+@lru_cache(maxsize=None)
+def get_hex_grid(min_x, max_x, min_y, max_y):
+    return HexGrid(min_x, max_x, min_y, max_y)
+
+
+class FlatBoardGenerator:
+    """Generator of game board on a flat grid of hexes
+
+    Areas grow like in BoardGenerator, first around their first hex, then
+    from random hexes, but on a HexGrid with hexes kept in flat lists
+    of states and area labels. Areas are started uniformly
+    among free hexes next to the used ones, which is the distribution
+    of the shuffled scan of BoardGenerator, without shuffling all the
+    coordinates. Adjacency of areas is derived from labels of all
+    neighbouring hexes at once.
+
+    This is version 2 of board generation. Boards differ from those
+    of BoardGenerator (version 1) for the same seed.
+    """
+    FREE = 0
+    TAGGED = 1
+    USED = 2
+    INVALID = -1
+
+    def __init__(self, seed=None, min_x=-32, max_x=30, min_y=-14, max_y=13, block_size=1024):
+        """
+        Parameters
+        ----------
+        seed : int
+            Seed of the board, None for a fresh entropy
+        min_x, max_x, min_y, max_y : int
+            Boundary values for Hex coordinates, see dicewars.config.board_bounds()
+        block_size : int
+            Number of uniform numbers drawn at once
+        """
+        self.min_x = min_x
+        self.max_x = max_x
+        self.min_y = min_y
+        self.max_y = max_y
+        self.grid = get_hex_grid(self.min_x, self.max_x, self.min_y, self.max_y)
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.block = []
+        self.position = 0
+
+    def generate_board(self, nb_base_areas, nb_max_extra_areas=0):
+        """Method generating the board
+
+        Returns
+        -------
+        dict
+            Dictionary of areas in the game board. Contains names of adjacent
+            areas and coordinates of the hexes of each area
+        """
+        self.state = [self.INVALID] * self.grid.size
+        for h in self.grid.valid:
+            self.state[h] = self.FREE
+        self.labels = [0] * self.grid.size
+        self.candidates = set()
+        self.area_hexes = {}
+
+        nb_areas = nb_base_areas + self.__randint(0, nb_max_extra_areas) - 1
+        for area in range(1, nb_areas + 1):
+            size = self.__randint(12, 18)
+            while not self.__create_area(area, size):
+                pass
+            self.__fill_area(area)
+
+        return self.__board(nb_areas)
+
+    def __uniform(self):
+        if self.position == len(self.block):
+            self.block = self.rng.random(self.block_size).tolist()
+            self.position = 0
+        self.position += 1
+        return self.block[self.position - 1]
+
+    def __randint(self, low, high):
+        return low + int(self.__uniform() * (high - low + 1))
+
+    def __choice(self, items):
+        return items[int(self.__uniform() * len(items))]
+
+    def __use(self, h, area):
+        """Add a hex to an area and tag its free neighbours
+        """
+        state = self.state
+        state[h] = self.USED
+        self.labels[h] = area
+        self.area_hexes[area].append(h)
+        for n in self.grid.neighbour_lists[h]:
+            if state[n] == self.FREE:
+                state[n] = self.TAGGED
+                for nn in self.grid.neighbour_lists[n]:
+                    if state[nn] == self.FREE and self.grid.inner[nn]:
+                        self.candidates.add(nn)
+
+    def __start_area(self, area):
+        """Pick the first hex of an area
+
+        The first area starts anywhere free, the others next to the used hexes.
+        Hexes of a first area which got stuck stay used, so they are skipped.
+        """
+        if self.area_hexes:
+            options = sorted(h for h in self.candidates if self.state[h] == self.FREE)
+            self.candidates = set(options)
+        else:
+            options = [h for h in self.grid.valid if self.state[h] == self.FREE]
+        if not options:
+            raise ValueError("No room left on the board for area {}".format(area))
+        self.area_hexes[area] = []
+        start = self.__choice(options)
+        self.__use(start, area)
+        return start
+
+    def __create_area(self, area, size):
+        """Grow an area of the given size
+
+        Returns
+        -------
+        bool
+            False if the area got stuck before reaching its size. Its hexes
+            stay used, but belong to no area.
+        """
+        start = self.__start_area(area)
+        possible_hexes = [start]
+        state = self.state
+        while len(self.area_hexes[area]) < size:
+            if not possible_hexes:
+                for h in self.area_hexes.pop(area):
+                    self.labels[h] = 0
+                return False
+
+            # surrounding the first hex reaches the tagged hex it was started next to,
+            # making the area adjacent to an existing one
+            h = start if possible_hexes[0] == start else self.__choice(possible_hexes)
+            free = [n for n in self.grid.neighbour_lists[h] if state[n] == self.FREE or state[n] == self.TAGGED]
+            if free:
+                n = self.__choice(free)
+                self.__use(n, area)
+                possible_hexes.append(n)
+            else:
+                possible_hexes.remove(h)
+        return True
+
+    def __fill_area(self, area):
+        """Fills empty Hexes inside the area
+
+        Follows BoardGenerator, including its scan of neighbours stopping
+        at the first one which is not tagged.
+        """
+        state, labels = self.state, self.labels
+        hexes = self.area_hexes[area]
+        for h in hexes:
+            for n in self.grid.neighbour_lists[h]:
+                if state[n] != self.TAGGED:
+                    break
+                outside = sum(1 for nn in self.grid.neighbour_lists[n] if labels[nn] != area)
+                if outside <= 2:
+                    self.__use(n, area)
+                    break
+
+    def __board(self, nb_areas):
+        """Assemble the board, deriving adjacency from labels of hexes
+        """
+        neighbours = area_adjacency(self.grid, np.array(self.labels), nb_areas)
+        return {
+            area: {
+                'hexes': [self.grid.hexes[h] for h in self.area_hexes[area]],
+                'neighbours': neighbours[area],
+            }
+            for area in range(1, nb_areas + 1)
+        }
+
+
+def area_adjacency(grid, labels, nb_areas):
+    """Derive adjacency of areas from labels of all hexes at once
+
+    Parameters
+    ----------
+    grid : HexGrid
+    labels : np.ndarray of int
+        Name of the area of every hex of the grid, 0 for none
+    nb_areas : int
+
+    Returns
+    -------
+    dict of int: list of int
+        Sorted names of adjacent areas of every area
+    """
+    hexes = np.flatnonzero(labels)
+    sources = np.repeat(labels[hexes], 6)
+    targets = labels[grid.neighbours[hexes]].ravel()
+    foreign = (targets != 0) & (targets != sources)
+    pairs = np.unique(sources[foreign].astype(np.int64) * (nb_areas + 1) + targets[foreign])
+    pair_sources, pair_targets = np.divmod(pairs, nb_areas + 1)
+    bounds = np.searchsorted(pair_sources, np.arange(1, nb_areas + 2)).tolist()
+    pair_targets = pair_targets.tolist()
+    return {area: pair_targets[bounds[area - 1]:bounds[area]] for area in range(1, nb_areas + 1)}
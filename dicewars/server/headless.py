@@ -0,0 +1,177 @@
+import json
+import time
+
+from dicewars.client.ai_driver import AIDriver
+from dicewars.client.game.local_game import LocalGame
+
+from .game import Game
+
+
+class LocalAIDriver(AIDriver):
+    """AI driver exchanging messages with an in-process server
+    """
+    def __init__(self, game, ai_constructor, config):
+        self.outbox = []
+        super().__init__(game, ai_constructor, config)
+
+    def deliver(self, msg):
+        self.outbox.append(msg)
+
+    def get_command_message(self):
+        """Get the next message for the server, letting the AI move if needed
+
+        Returns
+        -------
+        dict
+        """
+        if not self.outbox:
+            self.play_turn()
+        if not self.outbox:
+            raise RuntimeError("AI of player {} has nothing to say".format(self.player_name))
+
+        return self.outbox.pop(0)
+
+
+class HeadlessGame(Game):
+    """Instance of the game played by AIs within a single process
+
+    The rules are exactly those of Game, only the sockets and client
+    processes are replaced by an AIDriver per player, which receives
+    the very same messages as its networked counterpart would.
+    """
+    def __init__(self, board, area_ownership, ai_constructors, game_config, ai_driver_config,
+                 nicknames=None, nicknames_order=None, seed=None, replay=None, instrumentation=None):
+        """
+        Parameters
+        ----------
+        board : Board
+            Board with dice already assigned
+        area_ownership : dict of int: int
+            Initial owner of every area
+        ai_constructors : list of callable
+            Constructors taking (player_name, board, players_order, max_transfers)
+        game_config : configparser.SectionProxy
+            The GAME section of the configuration
+        ai_driver_config : configparser.SectionProxy
+            The AI_DRIVER section of the configuration
+        nicknames : list of str
+            Nicknames of the AIs, derived from their modules by default
+        nicknames_order : list of str
+            Order of players given by their nicknames, random by default
+        seed : int
+            Seed for player order, dice rolls and distribution of dice
+        replay : ReplayWriter
+            Optional writer of a replay log of the game
+        instrumentation : GameInstrumentation
+            Optional collector of timings, response times being those of the AIs
+        """
+        if nicknames is None:
+            nicknames = [default_nickname(ai) for ai in ai_constructors]
+        assert len(nicknames) == len(ai_constructors)
+
+        self.ai_constructors = ai_constructors
+        self.nicknames = nicknames
+        self.ai_driver_config = ai_driver_config
+        self.drivers = {}
+
+        super().__init__(board, area_ownership, len(ai_constructors), game_config, None, None, nicknames_order, seed,
+                         replay=replay, instrumentation=instrumentation)
+
+    def run(self):
+        """Play the game until it is decided
+
+        Returns
+        -------
+        GameSummary
+        """
+        while True:
+            self.logger.debug("Current player {}".format(self.current_player.get_name()))
+            self.handle_player_turn()
+            if self.check_win_condition():
+                break
+
+        if self.replay is not None:
+            self.replay.finish(self.get_winner())
+        return self.summary
+
+    ##############
+    # NETWORKING #
+    ##############
+    def create_socket(self):
+        pass
+
+    def connect_clients(self):
+        self.client_sockets = {}
+        self.ai_constructor_of = {}
+
+        for i in range(1, self.number_of_players + 1):
+            player = self.players[i]
+            player.set_nickname(self.nicknames[i-1])
+            player.set_state_updates('delta')
+            self.ai_constructor_of[player] = self.ai_constructors[i-1]
+
+    def get_message(self, player):
+        msg = self.drivers[player].get_command_message()
+        self.logger.debug("Got message from client {}: {}".format(player, msg))
+        return msg
+
+    def send_message(self, client, type, battle=None, winner=None, areas=None, transfer=None):
+        if type in ['game_end', 'close_socket']:
+            return
+
+        start = time.perf_counter()
+        msg = self.through_wire(type, self.build_message(client, type), 1, start)
+        if type == 'game_start':
+            self.drivers[client.get_name()] = LocalAIDriver(
+                LocalGame(msg),
+                self.ai_constructor_of[client],
+                self.ai_driver_config,
+            )
+        else:
+            self.drivers[client.get_name()].handle_server_message(msg)
+
+    def broadcast_message(self, type, **kwargs):
+        start = time.perf_counter()
+        msg = self.through_wire(type, self.build_message(None, type, delta=True, **kwargs), len(self.drivers), start)
+        for driver in self.drivers.values():
+            driver.handle_server_message(msg)
+
+    def through_wire(self, type, msg, nb_recipients, start):
+        """Pass a message through wire_format(), noting its serialization in the instrumentation
+
+        The bytes noted are those Game would send over the 'json' protocol.
+
+        Parameters
+        ----------
+        type : str
+        msg : dict
+        nb_recipients : int
+        start : float
+            perf_counter() before the message started being built
+        """
+        if self.instrumentation is None:
+            return wire_format(msg)
+
+        data = json.dumps(msg)
+        msg = json.loads(data)
+        # the null terminator included, and ASCII-only JSON takes a byte per character
+        self.instrumentation.add_serialization(type, time.perf_counter() - start, nb_recipients * (len(data) + 1))
+        return msg
+
+
+def wire_format(msg):
+    """Give message the exact shape it would have after passing through a socket
+
+    Most notably, JSON turns all the integer keys into strings.
+    """
+    return json.loads(json.dumps(msg))
+
+
+def default_nickname(ai_constructor):
+    """Derive nickname of an AI the same way the client script does
+    """
+    module = ai_constructor.__module__
+    if module.startswith('dicewars.ai.'):
+        module = module[len('dicewars.ai.'):]
+    return '{} (AI)'.format(module)
+
@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+
+class Timing:
+    """Running count, total and maximum of measured durations
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {'count': self.count, 'total': self.total, 'mean': self.mean(), 'max': self.max}
+
+    def __str__(self):
+        return '{} x mean {:.3f} ms, max {:.3f} ms, total {:.3f} s'.format(
+            self.count, 1e3 * self.mean(), 1e3 * self.max, self.total)
+
+
+class GameInstrumentation:
+    """Timings and traffic of a single game
+
+    Attributes
+    ----------
+    response_times : dict of str: Timing
+        Time between the server starting to wait for a player's
+        message and receiving it, by nickname of the player
+    processing_times : dict of str: Timing
+        Time the server spent carrying out a message, including
+        serialization and sending of the messages in reaction, by message type
+    serialization_times : dict of str: Timing
+        Time spent building and encoding messages, by message type
+    bytes_sent : dict of str: int
+        Bytes sent to all clients, by message type
+    """
+    def __init__(self):
+        self.response_times = defaultdict(Timing)
+        self.processing_times = defaultdict(Timing)
+        self.serialization_times = defaultdict(Timing)
+        self.bytes_sent = defaultdict(int)
+
+    def add_turn(self, nickname, msg_type, response_time, processing_time):
+        self.response_times[nickname].add(response_time)
+        self.processing_times[msg_type].add(processing_time)
+
+    def add_serialization(self, msg_type, duration, nb_bytes):
+        """
+        Parameters
+        ----------
+        msg_type : str
+        duration : float
+            Time spent building and encoding the message
+        nb_bytes : int
+            Bytes sent, summed over all recipients
+        """
+        self.serialization_times[msg_type].add(duration)
+        self.bytes_sent[msg_type] += nb_bytes
+
+    def to_dict(self):
+        return {
+            'response_times': {nick: t.to_dict() for nick, t in self.response_times.items()},
+            'processing_times': {msg_type: t.to_dict() for msg_type, t in self.processing_times.items()},
+            'serialization_times': {msg_type: t.to_dict() for msg_type, t in self.serialization_times.items()},
+            'bytes_sent': dict(self.bytes_sent),
+        }
+
+    def __repr__(self):
+        lines = ['Response times:']
+        lines.extend('  {}: {}'.format(nick, t) for nick, t in sorted(self.response_times.items()))
+        lines.append('Server processing:')
+        lines.extend('  {}: {}'.format(msg_type, t) for msg_type, t in sorted(self.processing_times.items()))
+        lines.append('Serialization:')
+        lines.extend(
+            '  {}: {}, {} B sent'.format(msg_type, t, self.bytes_sent[msg_type])
+            for msg_type, t in sorted(self.serialization_times.items())
+        )
+        return '\n'.join(lines) + '\n'
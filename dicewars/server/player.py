@@ -1,6 +1,9 @@
+from collections import deque
 import logging
 import socket
 
+from dicewars.protocol import FrameDecoder
+
 
 class Player:
     """Object representing a player
@@ -16,6 +19,10 @@ class Player:
         ----------
         areas : list of Area
             Areas belonging to the player
+        region_of : dict of Area: set of Area
+            Region (set of connected areas) each of player's areas belongs to
+        largest_region_size : int
+            Number of areas in player's largest region
         dice_reserve : int
             Number of dice in player's reserve
         client_addr : str
@@ -23,7 +30,16 @@ class Player:
         client_port : int
             Client's port number
         socket : socket
-            Client's socket
+            Client's socket, non-blocking
+        pending_output : deque of memoryview
+            Data waiting to be sent to the client
+        state_updates : str
+            How the client wants to be informed about changes of the game state,
+            'full' for complete state with every message, 'delta' for changes only
+        protocol : str
+            Encoding of messages the client uses, 'json' or 'binary'
+        frame_decoder : FrameDecoder
+            Decoder of the incoming stream, when using the binary protocol
         """
 
         self.name = name
@@ -31,10 +47,16 @@ class Player:
         self.logger = logging.getLogger('SERVER')
 
         self.areas = []
+        self.region_of = {}
+        self.largest_region_size = 0
         self.client_addr = None
         self.client_port = None
         self.socket = None
+        self.pending_output = deque()
         self.dice_reserve = 0
+        self.state_updates = 'full'
+        self.protocol = 'json'
+        self.frame_decoder = None
 
     def set_nickname(self, nick):
         self.nickname = nick
@@ -42,13 +64,67 @@ class Player:
     def get_nickname(self):
         return self.nickname
 
+    def set_state_updates(self, state_updates):
+        if state_updates not in ['full', 'delta']:
+            raise ValueError("Unsupported kind of state updates '{}'".format(state_updates))
+        self.state_updates = state_updates
+
+    def get_state_updates(self):
+        return self.state_updates
+
+    def set_protocol(self, protocol):
+        """Set encoding of messages
+
+        The binary protocol only supports delta state updates.
+        """
+        if protocol == 'binary':
+            self.frame_decoder = FrameDecoder()
+            self.set_state_updates('delta')
+        elif protocol != 'json':
+            raise ValueError("Unsupported protocol '{}'".format(protocol))
+        self.protocol = protocol
+
+    def get_protocol(self):
+        return self.protocol
+
     def add_area(self, area):
         """Add area to player's areas
+
+        Regions the area connects are merged, the smaller into the larger one.
         """
-        if area in self.areas:
+        if area in self.region_of:
             self.logger.warning("Area {0} already belonging to player {1}.".format(area.get_name(), self.name))
-        else:
-            self.areas.append(area)
+            return
+
+        self.areas.append(area)
+
+        region = {area}
+        self.region_of[area] = region
+        for adjacent_area in area.get_adjacent_areas():
+            adjacent_region = self.region_of.get(adjacent_area)
+            if adjacent_region is None or adjacent_region is region:
+                continue
+
+            if len(adjacent_region) > len(region):
+                region, adjacent_region = adjacent_region, region
+            region |= adjacent_region
+            for merged_area in adjacent_region:
+                self.region_of[merged_area] = region
+
+        if len(region) > self.largest_region_size:
+            self.largest_region_size = len(region)
+
+    def set_areas(self, areas):
+        """Replace player's areas, recomputing the regions
+
+        Parameters
+        ----------
+        areas : list of Area
+        """
+        self.areas = list(areas)
+        self.region_of = {}
+        self.split_region(set(self.areas))
+        self.largest_region_size = max((len(r) for r in self.get_regions()), default=0)
 
     def assign_client(self, socket, client_addr):
         """Assign client's socket, IP address, and port number
@@ -60,6 +136,7 @@ class Player:
             IP address and port number
         """
         self.socket = socket
+        self.socket.setblocking(False)
         self.client_addr = client_addr[0]
         self.client_port = client_addr[1]
         self.logger.info("Assigning socket {0} with IP {1}:{2} to player {3}"\
@@ -75,53 +152,32 @@ class Player:
         """
         return self.areas
 
-    def get_largest_region(self, board):
+    def get_largest_region(self, board=None):
         """Get player's score
 
+        The size of the largest region is maintained as areas are added
+        and removed, so this is a constant-time lookup.
+
         Parameters
         ----------
         board : Board
+            Unused, kept for compatibility
 
         Returns
         -------
         int
             Player's score
         """
-        largest_region_size = 0
-        areas_to_test = self.areas
-        player_areas = []
-
-        if not areas_to_test:
-            return 0
-
-        areas_in_current_region = [areas_to_test[0]]
-
-        while areas_to_test:
-            areas_already_tested = []
-            while areas_in_current_region:
-                current_area = areas_in_current_region[0]
-                areas_in_current_region.remove(current_area)
-                areas_already_tested.append(current_area)
-
-                for area in current_area.get_adjacent_areas():
-                    if (area not in areas_already_tested and
-                        area not in areas_in_current_region):
-                        if area.get_owner_name() == self.name:
-                            areas_in_current_region.append(area)
+        return self.largest_region_size
 
-            if len(areas_already_tested) > largest_region_size:
-                largest_region_size = len(areas_already_tested)
+    def get_regions(self):
+        """Get all regions of the player
 
-            for area in areas_already_tested:
-                if area in areas_to_test:
-                    areas_to_test.remove(area)
-                    player_areas.append(area)
-
-            if areas_to_test:
-                areas_in_current_region = [areas_to_test[0]]
-
-        self.areas = player_areas
-        return largest_region_size
+        Returns
+        -------
+        list of set of Area
+        """
+        return list({id(region): region for region in self.region_of.values()}.values())
 
     def get_name(self):
         """Return player's name
@@ -146,24 +202,91 @@ class Player:
 
     def remove_area(self, area):
         """Remove area from list of areas controlled by the player
+
+        Only the region the area belonged to is split into its components.
         """
-        if area not in self.areas:
+        if area not in self.region_of:
             self.logger.warning("Trying to remove area {0} that doesn't\
                                 belong to player {1}".format(area.get_name(),
                                 self.name))
-        else:
-            self.areas.remove(area)
+            return
+
+        self.areas.remove(area)
+
+        region = self.region_of.pop(area)
+        region.discard(area)
+        self.split_region(region)
+
+        if len(region) + 1 == self.largest_region_size:
+            self.largest_region_size = max((len(r) for r in self.get_regions()), default=0)
+
+    def split_region(self, areas):
+        """Re-assign areas of a (possibly broken) region to connected regions
+
+        Parameters
+        ----------
+        areas : set of Area
+        """
+        unassigned = set(areas)
+        while unassigned:
+            seed = unassigned.pop()
+            region = {seed}
+            to_visit = [seed]
+            while to_visit:
+                current_area = to_visit.pop()
+                for adjacent_area in current_area.get_adjacent_areas():
+                    if adjacent_area in unassigned:
+                        unassigned.remove(adjacent_area)
+                        region.add(adjacent_area)
+                        to_visit.append(adjacent_area)
+
+            for region_area in region:
+                self.region_of[region_area] = region
 
     def send_message(self, msg):
         """Send message msg to the Player's client
         """
+        self.send_bytes(msg.encode())
+
+    def send_bytes(self, data):
+        """Send already encoded data to the Player's client without blocking
+
+        Whatever the socket does not accept right away is kept
+        and sent by subsequent calls to flush().
+        """
+        self.pending_output.append(memoryview(data))
+        self.flush()
+
+    def flush(self):
+        """Send as much of the pending data as the socket accepts
+        """
         try:
-            self.socket.sendall(msg.encode())
+            while self.pending_output:
+                chunk = self.pending_output[0]
+                sent = self.socket.send(chunk)
+                if sent < len(chunk):
+                    self.pending_output[0] = chunk[sent:]
+                else:
+                    self.pending_output.popleft()
+        except BlockingIOError:
+            pass
         except socket.error as e:
             self.logger.error("Connection to client {0} broken".format(
                               self.name))
             raise e
 
+    def flush_all(self):
+        """Send all the pending data, waiting for the client if necessary
+        """
+        self.socket.setblocking(True)
+        try:
+            self.flush()
+        finally:
+            self.socket.setblocking(False)
+
+    def has_pending_output(self):
+        return bool(self.pending_output)
+
     def set_reserve(self, dice):
         """Set dice reserve
         """
@@ -0,0 +1,117 @@
+"""Batches of initial positions
+
+A batch holds N boards prepared for a game, each with its areas assigned
+to players and dice assigned to areas, in flat arrays:
+
+    seeds       board, ownership and strength seed of every position
+    owners      owner of every area, by position and area name - 1, 0 past the last area
+    dice        dice of every area, laid out as owners
+    data        words of all positions as stored by board_library.encode_board()
+    offsets     start of every position in data, followed by the end of the last one
+
+Seeds of positions are drawn independently from a single seed of the batch,
+and every position is prepared from its own generators exactly as
+prepare_board() does, so any position can be reproduced on its own.
+"""
+import numpy as np
+
+from .board_library import WORD_DTYPE, decode_board, encode_board
+from .board_setup import prepare_board
+
+
+def position_seeds(seed, nb_positions):
+    """Derive seeds of positions from a seed of a batch
+
+    Parameters
+    ----------
+    seed : int
+        Seed of the batch, None for a fresh entropy
+    nb_positions : int
+
+    Returns
+    -------
+    np.ndarray of int64
+        Board, ownership and strength seed of every position, non-negative
+    """
+    state = np.random.SeedSequence(seed).generate_state(3 * nb_positions, dtype=np.uint64)
+    return (state >> np.uint64(1)).astype(np.int64).reshape(nb_positions, 3)
+
+
+class PositionBatch:
+    """Array-backed initial positions
+    """
+    def __init__(self, seeds, owners, dice, data, offsets):
+        self.seeds = seeds
+        self.owners = owners
+        self.dice = dice
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.seeds)
+
+    def get(self, i):
+        """Get a position ready to play
+
+        Every call decodes a new Board, so that games do not share it.
+
+        Returns
+        -------
+        (Board, dict of int: int)
+            The board and the ownership of its areas
+        """
+        return decode_board(self.data[self.offsets[i]:self.offsets[i + 1]])
+
+    def nb_areas(self):
+        """
+        Returns
+        -------
+        np.ndarray
+            Number of areas of every position
+        """
+        return np.count_nonzero(self.owners, axis=1)
+
+    def save(self, path):
+        np.savez(path, seeds=self.seeds, owners=self.owners, dice=self.dice, data=self.data, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path):
+        """Load a batch stored by save()
+        """
+        with np.load(path) as arrays:
+            return cls(*(arrays[name] for name in ['seeds', 'owners', 'dice', 'data', 'offsets']))
+
+
+def prepare_positions(board_config, nb_players, nb_positions, seed=None):
+    """Prepare a batch of initial positions
+
+    Parameters
+    ----------
+    board_config : configparser.SectionProxy
+    nb_players : int
+    nb_positions : int
+    seed : int
+        Seed of the batch, None for a fresh entropy
+
+    Returns
+    -------
+    PositionBatch
+    """
+    seeds = position_seeds(seed, nb_positions)
+    encoded = []
+    for board_seed, ownership_seed, strength_seed in seeds.tolist():
+        board, ownership = prepare_board(board_config, nb_players, board_seed, ownership_seed, strength_seed)
+        encoded.append((encode_board(board, ownership), ownership, board))
+
+    max_areas = max((board.get_number_of_areas() for _, _, board in encoded), default=0)
+    owners = np.zeros((nb_positions, max_areas), dtype=np.uint8)
+    dice = np.zeros((nb_positions, max_areas), dtype=np.uint8)
+    offsets = np.zeros(nb_positions + 1, dtype=np.int64)
+    for i, (words, ownership, board) in enumerate(encoded):
+        for name, owner in ownership.items():
+            owners[i, name - 1] = owner
+            dice[i, name - 1] = board.get_area_by_name(name).get_dice()
+        offsets[i + 1] = offsets[i] + len(words)
+
+    data = np.concatenate([words for words, _, _ in encoded]) if encoded else np.zeros(0, dtype=WORD_DTYPE)
+    return PositionBatch(seeds, owners, dice, data, offsets)
@@ -0,0 +1,330 @@
+"""Compact binary log of a game and its replay
+
+A log starts with MAGIC, a 4-byte little-endian length and a JSON header
+holding seeds, the board, the initial ownership and dice, players and the
+keyframe interval. The rest are 12-byte records (RECORD, RECORD_DTYPE)
+with fields (kind, c, a, b, d, e, f) meaning:
+
+    BATTLE          a attacker, b defender, c defender's owner after the battle,
+                    d defender's dice after the battle, e attack power, f defence power
+    TRANSFER        a source, b destination, d source's dice after, e destination's dice after
+    END_TURN        a player ending the turn, b next player, c reserve of the ending player,
+                    d number of DEPLOY records following
+    DEPLOY          a area, d dice after the deployment
+    GAME_END        a winner (0 for none)
+    KEYFRAME        a turn, d number of KEYFRAME_DATA records following
+    KEYFRAME_DATA   11 bytes of the keyframe payload after the kind
+
+A turn is counted by every END_TURN, turn N starts right after the N-th one.
+Keyframe payload holds owners and dice of all areas, reserves of all players,
+the current player and the number of battles so far.
+"""
+import json
+import struct
+
+import numpy as np
+
+
+MAGIC = b'DWRL\x01'
+HEADER_LENGTH = struct.Struct('<I')
+
+RECORD = struct.Struct('<BBHHHHH')
+RECORD_DTYPE = np.dtype([
+    ('kind', 'u1'), ('c', 'u1'), ('a', '<u2'), ('b', '<u2'), ('d', '<u2'), ('e', '<u2'), ('f', '<u2'),
+])
+DATA_PER_RECORD = RECORD.size - 1
+NB_BATTLES = struct.Struct('<I')
+
+BATTLE = 1
+TRANSFER = 2
+END_TURN = 3
+DEPLOY = 4
+GAME_END = 5
+KEYFRAME = 6
+KEYFRAME_DATA = 7
+
+
+class ReplayWriter:
+    """Writer of the log of a single game
+
+    Game calls start() once the players are set, then battle(), transfer()
+    and end_turn() after every such move and finish() at the end.
+    """
+    def __init__(self, path, seeds=None, keyframe_interval=16):
+        """
+        Parameters
+        ----------
+        path : str
+            File to write the log to
+        seeds : dict
+            Seeds the game was created with, stored in the header as they are
+        keyframe_interval : int
+            Number of turns between keyframes
+        """
+        self.path = path
+        self.seeds = seeds or {}
+        self.keyframe_interval = keyframe_interval
+        self.file = None
+        self.turn = 0
+        self.nb_battles = 0
+
+    def start(self, game):
+        header = {
+            'seeds': self.seeds,
+            'board': game.board.get_board(),
+            'ownership': {name: area.get_owner_name() for name, area in game.board.areas.items()},
+            'dice': {name: area.get_dice() for name, area in game.board.areas.items()},
+            'players_order': game.players_order,
+            'nicknames': {name: player.get_nickname() for name, player in game.players.items()},
+            'keyframe_interval': self.keyframe_interval,
+        }
+        encoded_header = json.dumps(header).encode()
+
+        self.file = open(self.path, 'wb')
+        self.file.write(MAGIC + HEADER_LENGTH.pack(len(encoded_header)) + encoded_header)
+
+    def battle(self, game, battle):
+        self.nb_battles += 1
+        self.file.write(RECORD.pack(
+            BATTLE, battle['def']['owner'], battle['atk']['name'], battle['def']['name'],
+            battle['def']['dice'], battle['atk']['pwr'], battle['def']['pwr'],
+        ))
+
+    def transfer(self, game, transfer):
+        self.file.write(RECORD.pack(
+            TRANSFER, 0, transfer['src']['name'], transfer['dst']['name'],
+            transfer['src']['dice'], transfer['dst']['dice'], 0,
+        ))
+
+    def end_turn(self, game, player, areas):
+        """
+        Parameters
+        ----------
+        game : Game
+            Game with the next player already set
+        player : int
+            Player who ended the turn
+        areas : dict of int: dict
+            Areas affected by the distribution of dice
+        """
+        records = [RECORD.pack(
+            END_TURN, game.players[player].get_reserve(), player, game.current_player.get_name(), len(areas), 0, 0,
+        )]
+        records.extend(RECORD.pack(DEPLOY, 0, name, 0, area['dice'], 0, 0) for name, area in areas.items())
+        self.file.write(b''.join(records))
+
+        self.turn += 1
+        if self.turn % self.keyframe_interval == 0:
+            self.write_keyframe(game)
+
+    def write_keyframe(self, game):
+        names = sorted(game.board.areas)
+        payload = b''.join([
+            bytes(game.board.areas[name].get_owner_name() for name in names),
+            bytes(game.board.areas[name].get_dice() for name in names),
+            bytes(game.players[name].get_reserve() for name in sorted(game.players)),
+            bytes([game.current_player.get_name()]),
+            NB_BATTLES.pack(self.nb_battles),
+        ])
+        nb_records = -(-len(payload) // DATA_PER_RECORD)
+        payload = payload.ljust(nb_records * DATA_PER_RECORD, b'\0')
+
+        records = [RECORD.pack(KEYFRAME, 0, self.turn, 0, nb_records, 0, 0)]
+        records.extend(
+            bytes([KEYFRAME_DATA]) + payload[i:i + DATA_PER_RECORD] for i in range(0, len(payload), DATA_PER_RECORD)
+        )
+        self.file.write(b''.join(records))
+
+    def finish(self, winner):
+        """Write the end of the game and close the log
+
+        Parameters
+        ----------
+        winner : int
+            Name of the winner, None if there is none
+        """
+        if self.file is None:
+            return
+        self.file.write(RECORD.pack(GAME_END, 0, winner or 0, 0, 0, 0, 0))
+        self.file.close()
+        self.file = None
+
+
+class Replay:
+    """Replay of a logged game
+
+    The state (owner, dice, reserves, current_player, nb_battles) is kept
+    in arrays indexed by area and player names and can be moved to the start
+    of any turn by seek(), which starts from the closest keyframe and applies
+    the following records at once.
+    """
+    def __init__(self, data):
+        """
+        Parameters
+        ----------
+        data : bytes
+            Content of a log
+        """
+        if not data.startswith(MAGIC):
+            raise ValueError("Not a replay log")
+        header_length, = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        self.header = json.loads(data[header_start:header_start + header_length].decode())
+
+        records_start = header_start + header_length
+        nb_records = (len(data) - records_start) // RECORD.size
+        self.raw = np.frombuffer(data, dtype=np.uint8, count=nb_records * RECORD.size, offset=records_start)
+        self.raw = self.raw.reshape(nb_records, RECORD.size)
+        self.records = self.raw.view(RECORD_DTYPE).reshape(nb_records)
+
+        self.nb_areas = len(self.header['board'])
+        self.nb_players = len(self.header['players_order'])
+        self.nicknames = {int(name): nick for name, nick in self.header['nicknames'].items()}
+
+        kinds = self.records['kind']
+        end_turns = np.flatnonzero(kinds == END_TURN)
+        # index of the first record of every turn, turn 0 starting at the beginning
+        self.turn_starts = np.concatenate([[0], end_turns + 1 + self.records['d'][end_turns]])
+        self.keyframes = np.flatnonzero(kinds == KEYFRAME)
+        self.keyframe_turns = self.records['a'][self.keyframes]
+
+        self.seek(0)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def get_number_of_turns(self):
+        """Number of turns the game has, including the one it ended in
+        """
+        return len(self.turn_starts)
+
+    def get_winner(self):
+        """Name of the winner, None if the game has no winner or is not complete
+        """
+        ends = np.flatnonzero(self.records['kind'] == GAME_END)
+        if len(ends) == 0 or self.records['a'][ends[0]] == 0:
+            return None
+        return int(self.records['a'][ends[0]])
+
+    def initial_state(self):
+        self.owner = np.zeros(self.nb_areas + 1, dtype=np.uint8)
+        self.dice = np.zeros(self.nb_areas + 1, dtype=np.uint8)
+        for name, owner in self.header['ownership'].items():
+            self.owner[int(name)] = owner
+        for name, dice in self.header['dice'].items():
+            self.dice[int(name)] = dice
+        self.reserves = np.zeros(self.nb_players + 1, dtype=np.uint8)
+        self.current_player = self.header['players_order'][0]
+        self.nb_battles = 0
+
+    def load_keyframe(self, index):
+        nb_records = self.records['d'][index]
+        payload = self.raw[index + 1:index + 1 + nb_records, 1:].tobytes()
+
+        n, p = self.nb_areas, self.nb_players
+        self.owner = np.zeros(n + 1, dtype=np.uint8)
+        self.dice = np.zeros(n + 1, dtype=np.uint8)
+        self.reserves = np.zeros(p + 1, dtype=np.uint8)
+        self.owner[1:] = np.frombuffer(payload, dtype=np.uint8, count=n)
+        self.dice[1:] = np.frombuffer(payload, dtype=np.uint8, count=n, offset=n)
+        self.reserves[1:] = np.frombuffer(payload, dtype=np.uint8, count=p, offset=2 * n)
+        self.current_player = payload[2 * n + p]
+        self.nb_battles, = NB_BATTLES.unpack_from(payload, 2 * n + p + 1)
+
+    def seek(self, turn):
+        """Set the state to the start of a turn
+
+        Parameters
+        ----------
+        turn : int
+        """
+        if not 0 <= turn < len(self.turn_starts):
+            raise ValueError("Game has no turn {}".format(turn))
+
+        candidates = np.flatnonzero(self.keyframe_turns <= turn)
+        if len(candidates):
+            keyframe = self.keyframes[candidates[-1]]
+            self.load_keyframe(keyframe)
+            start = keyframe + 1 + self.records['d'][keyframe]
+        else:
+            self.initial_state()
+            start = 0
+
+        self.apply(self.records[start:self.turn_starts[turn]])
+        self.turn = turn
+
+    def apply(self, records):
+        """Apply a sequence of records to the state at once
+        """
+        kind = records['kind']
+        battles = records[kind == BATTLE]
+        transfers = records[kind == TRANSFER]
+        end_turns = records[kind == END_TURN]
+        deploys = records[kind == DEPLOY]
+        positions = np.arange(len(records))
+
+        # every write is (position, area, value), the latest write of an area wins
+        dice_writes = [
+            (positions[kind == BATTLE], battles['a'], np.ones(len(battles), dtype=np.uint16)),
+            (positions[kind == BATTLE], battles['b'], battles['d']),
+            (positions[kind == TRANSFER], transfers['a'], transfers['d']),
+            (positions[kind == TRANSFER], transfers['b'], transfers['e']),
+            (positions[kind == DEPLOY], deploys['a'], deploys['d']),
+        ]
+        assign_latest(self.dice, dice_writes)
+        assign_latest(self.owner, [(positions[kind == BATTLE], battles['b'], battles['c'])])
+        assign_latest(self.reserves, [(positions[kind == END_TURN], end_turns['a'], end_turns['c'])])
+
+        if len(end_turns):
+            self.current_player = int(end_turns['b'][-1])
+        self.nb_battles += len(battles)
+
+    def events(self, start_turn=0):
+        """Iterate over moves from the start of a turn
+
+        The state is updated as the moves are yielded.
+
+        Yields
+        ------
+        np.void
+            Record of a BATTLE, TRANSFER, END_TURN or GAME_END
+        """
+        self.seek(start_turn)
+        index = self.turn_starts[start_turn]
+        while index < len(self.records):
+            record = self.records[index]
+            kind = record['kind']
+            if kind == KEYFRAME:
+                index += 1 + record['d']
+                continue
+
+            nb_deploys = record['d'] if kind == END_TURN else 0
+            self.apply(self.records[index:index + 1 + nb_deploys])
+            if kind == END_TURN:
+                self.turn += 1
+            index += 1 + nb_deploys
+            yield record
+
+
+def assign_latest(target, writes):
+    """Assign values to target, the write with the highest position winning
+
+    Parameters
+    ----------
+    target : np.ndarray
+    writes : list of (np.ndarray, np.ndarray, np.ndarray)
+        Positions, indices and values of writes
+    """
+    positions = np.concatenate([w[0] for w in writes])
+    if len(positions) == 0:
+        return
+    indices = np.concatenate([w[1] for w in writes])
+    values = np.concatenate([w[2] for w in writes])
+
+    order = np.lexsort((positions, indices))
+    indices, values = indices[order], values[order]
+    last = np.ones(len(indices), dtype=bool)
+    last[:-1] = indices[1:] != indices[:-1]
+    target[indices[last]] = values[last]
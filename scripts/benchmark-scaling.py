@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+from argparse import ArgumentParser
+import configparser
+import importlib
+import math
+import random
+import time
+
+from dicewars.config import board_bounds
+from dicewars.server.board_setup import create_board, prepare_board
+from dicewars.server.generator import get_hex_grid
+from dicewars.server.headless import HeadlessGame
+from dicewars.server.instrumentation import GameInstrumentation
+
+
+parser = ArgumentParser(prog='Dice_Wars-benchmark-scaling')
+parser.add_argument('--areas', help="Numbers of areas to benchmark", type=int, nargs='+',
+                    default=[30, 60, 125, 250, 500])
+parser.add_argument('-g', '--game-size', help="Number of players", type=int, default=4)
+parser.add_argument('--ai', help="AI playing all the players", default='dt.sdc')
+parser.add_argument('--boards', help="Number of boards generated per size and generator version", type=int, default=3)
+parser.add_argument('--battles', help="Limit on battles of the benchmarked game", type=int, default=1000)
+parser.add_argument('--hexes-per-area', help="Hexes of the board per area", type=int, default=26)
+parser.add_argument('-s', '--seed', help="Seed of boards and games", type=int, default=0)
+
+
+def board_size(nb_areas, hexes_per_area):
+    """Get width and height of a board for a number of areas, keeping the proportions of the default board
+    """
+    height = round(math.sqrt(nb_areas * hexes_per_area * 28 / 32))
+    width = math.ceil(nb_areas * hexes_per_area / height)
+    return width, height
+
+
+def time_generator(board_config, nb_boards, seed):
+    get_hex_grid(*board_bounds(board_config))  # built once per size, not part of generating a board
+    start = time.perf_counter()
+    for i in range(nb_boards):
+        create_board(board_config, rng=random.Random(seed + i))
+    return (time.perf_counter() - start) / nb_boards
+
+
+def main():
+    """
+    Measure how the cost of board generation, the server and AI turns grows with the number of areas.
+
+    Games are played in-process by HeadlessGame, server times are those of handling a message,
+    AI times those of producing one.
+    """
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read('dicewars.config')
+    config['GAME']['MaximumBattlesPerGame'] = str(args.battles)
+    config['GAME']['MaxPlayers'] = str(max(args.game_size, config['GAME'].getint('MaxPlayers', fallback=8)))
+    config['AI_DRIVER']['FischerInit'] = str(1e9)
+    ai_constructor = importlib.import_module('dicewars.ai.{}'.format(args.ai)).AI
+
+    print('{:>6} {:>9} {:>10} {:>10} {:>8} {:>13} {:>11} {:>9}'.format(
+        'areas', 'hexes', 'gen v1 ms', 'gen v2 ms', 'battles', 'server ms/msg', 'AI ms/move', 'game s'))
+    for nb_areas in args.areas:
+        width, height = board_size(nb_areas, args.hexes_per_area)
+        config['BOARD']['BoardSize'] = str(nb_areas + 1)
+        config['BOARD']['BoardWidth'] = str(width)
+        config['BOARD']['BoardHeight'] = str(height)
+
+        generator_times = []
+        for version in (1, 2):
+            config['BOARD']['GeneratorVersion'] = str(version)
+            generator_times.append(time_generator(config['BOARD'], args.boards, args.seed))
+
+        board, area_ownership = prepare_board(config['BOARD'], args.game_size, args.seed, args.seed, args.seed)
+        instrumentation = GameInstrumentation()
+        game = HeadlessGame(
+            board, area_ownership, [ai_constructor] * args.game_size, config['GAME'], config['AI_DRIVER'],
+            nicknames=['{} {}'.format(args.ai, i) for i in range(1, args.game_size + 1)],
+            seed=args.seed, instrumentation=instrumentation,
+        )
+        start = time.perf_counter()
+        game.run()
+        game_time = time.perf_counter() - start
+
+        processing = list(instrumentation.processing_times.values())
+        responses = list(instrumentation.response_times.values())
+        server_time = sum(t.total for t in processing) / max(sum(t.count for t in processing), 1)
+        ai_time = sum(t.total for t in responses) / max(sum(t.count for t in responses), 1)
+        print('{:>6} {:>9} {:>10.1f} {:>10.1f} {:>8} {:>13.3f} {:>11.3f} {:>9.1f}'.format(
+            nb_areas, '{}x{}'.format(width, height), 1e3 * generator_times[0], 1e3 * generator_times[1],
+            game.nb_battles, 1e3 * server_time, 1e3 * ai_time, game_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+from argparse import ArgumentParser
+import configparser
+
+from dicewars.server.board_library import BoardLibraryWriter, config_hash
+from dicewars.server.board_setup import prepare_board
+
+
+parser = ArgumentParser(prog='Dice_Wars-board-library')
+parser.add_argument('library', help="Directory of the library, boards are added to it if it exists")
+parser.add_argument('-b', '--board', help="Seed of the first board", type=int, default=0)
+parser.add_argument('-n', '--nb-boards', help="Number of consecutive board seeds", type=int, required=True)
+parser.add_argument('-g', '--game-size', help="Numbers of players to prepare the boards for", type=int, nargs='+',
+                    required=True)
+parser.add_argument('-o', '--ownership', help="Seed for province assignment", type=int, default=42)
+parser.add_argument('-s', '--strength', help="Seed for dice assignment", type=int, default=42)
+parser.add_argument('-r', '--report', help="Report progress on the stdout", action='store_true')
+
+
+def main():
+    """
+    Prepare boards for consecutive board seeds and store them in a library.
+
+    The default ownership and strength seeds are those used by dicewars-tournament.py.
+    """
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read('dicewars.config')
+    board_config = config['BOARD']
+    config_key = config_hash(board_config)
+
+    with BoardLibraryWriter(args.library) as writer:
+        for board_seed in range(args.board, args.board + args.nb_boards):
+            for nb_players in args.game_size:
+                if (config_key, nb_players, board_seed, args.ownership, args.strength) in writer:
+                    continue
+                board, area_ownership = prepare_board(
+                    board_config, nb_players,
+                    board_seed=board_seed, ownership_seed=args.ownership, strength_seed=args.strength,
+                )
+                writer.add(board_config, nb_players, board_seed, args.ownership, args.strength, board, area_ownership)
+            if args.report:
+                print('\r{}/{}'.format(board_seed - args.board + 1, args.nb_boards), end='', flush=True)
+    if args.report:
+        print()
+
+
+if __name__ == '__main__':
+    main()
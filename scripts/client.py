@@ -30,6 +30,11 @@ def main():
     parser.add_argument('-d', '--debug', help="Enable debug output", default='WARN')
     parser.add_argument('-s', '--seed', help="Random seed for a client", type=int)
     parser.add_argument('--ai', help="Ai version")
+    parser.add_argument('--state-updates', help="How to be informed about changes of the game state",
+                        choices=['full', 'delta'], default='delta')
+    parser.add_argument('--protocol', help="Encoding of messages, binary implies delta state updates",
+                        choices=['json', 'binary'], default='json')
+    parser.add_argument('--game-id', help="Game to join on a server hosting multiple games")
     args = parser.parse_args()
 
     random.seed(args.seed)
@@ -47,7 +52,11 @@ def main():
     hello_msg = {
         'type': 'client_desc',
         'nickname': get_nickname(args.ai),
+        'state_updates': args.state_updates,
+        'protocol': args.protocol,
     }
+    if args.game_id is not None:
+        hello_msg['game_id'] = args.game_id
     game = Game(args.address, args.port, hello_msg)
 
     if args.ai:
@@ -4,7 +4,7 @@ from argparse import ArgumentParser
 
 import math
 import itertools
-from utils import run_ai_only_game, get_nickname, BoardDefinition, SingleLineReporter, PlayerPerformance
+from utils import run_ai_only_game, run_hosted_ai_only_game, get_nickname, BoardDefinition, SingleLineReporter, PlayerPerformance
 from utils import TournamentCombatantsProvider, EvaluationCombatantsProvider
 from utils import column_t
 import random
@@ -26,6 +26,9 @@ parser.add_argument('-d', '--debug', action='store_true')
 parser.add_argument('-r', '--report', help="State the game number on the stdout", action='store_true')
 parser.add_argument('--save', help="Where to put pickled GameSummaries")
 parser.add_argument('--load', help="Which GameSummaries to start from")
+parser.add_argument('--game-server', help="Play on a running game-server.py instead of starting a server per game",
+                    action='store_true')
+parser.add_argument('--board-library', help="Library to take prepared boards from, see build-board-library.py")
 
 procs = []
 
@@ -98,7 +101,16 @@ def main():
         combatants_provider = TournamentCombatantsProvider(PLAYING_AIs)
     random.seed(args.seed)
 
-    signal(SIGCHLD, signal_handler)
+    game_kwargs = {}
+    if args.game_server:
+        if args.board_library is not None:
+            parser.error("--board-library is to be given to game-server.py when playing on it")
+        run_game = run_hosted_ai_only_game
+    else:
+        run_game = run_ai_only_game
+        signal(SIGCHLD, signal_handler)
+        if args.board_library is not None:
+            game_kwargs['board_library'] = args.board_library
 
     if args.load:
         with open(args.load, 'rb') as f:
@@ -118,13 +130,14 @@ def main():
             nb_permutations, permutations_generator = rotational_permunations_generator(combatants)
             for i, permuted_combatants in enumerate(permutations_generator):
                 reporter.report('\r{} {}/{} {}'.format(boards_played, i+1, nb_permutations, ' vs. '.join(permuted_combatants)))
-                game_summary = run_ai_only_game(
+                game_summary = run_game(
                     args.port, args.address, procs, permuted_combatants,
                     board_definition,
                     fixed=UNIVERSAL_SEED,
                     client_seed=UNIVERSAL_SEED,
                     logdir=args.logdir,
                     debug=args.debug,
+                    **game_kwargs,
                 )
                 all_games.append(game_summary)
     except (Exception, KeyboardInterrupt) as e:
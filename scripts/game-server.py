@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+from argparse import ArgumentParser
+import asyncio
+import configparser
+import logging
+
+from dicewars.server.async_server import MultiGameServer
+from dicewars.server.board_library import BoardLibrary
+
+
+from utils import get_logging_level
+
+
+def main():
+    """
+    Server hosting many concurrent games of Dice Wars on a single port
+    """
+
+    parser = ArgumentParser(prog='Dice_Wars-game-server')
+    parser.add_argument('-p', '--port', help="Server port", type=int, default=5005)
+    parser.add_argument('-a', '--address', help="Server address", default='127.0.0.1')
+    parser.add_argument('-d', '--debug', help="Enable debug output", default='WARN')
+    parser.add_argument('--board-library', help="Library to take prepared boards from")
+    parser.add_argument('--workers', help="Number of processes preparing boards, the number of CPUs by default", type=int)
+    parser.add_argument('--join-timeout', help="Seconds a game may wait for all of its clients", type=float, default=60.0)
+    parser.add_argument('--instrument', help="Send timings and traffic of every game along with its summary",
+                        action='store_true')
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read('dicewars.config')
+
+    log_level = get_logging_level(args)
+
+    logging.basicConfig(level=log_level)
+
+    library = BoardLibrary(args.board_library) if args.board_library else None
+    server = MultiGameServer(
+        args.address, args.port, config['BOARD'], config['GAME'], library,
+        workers=args.workers, join_timeout=args.join_timeout, instrument=args.instrument,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+from argparse import ArgumentParser
+from collections import Counter
+import configparser
+from functools import partial
+from multiprocessing import Pool
+import os
+import time
+
+from dicewars.server.board_corpus import CorpusWriter, board_grid, generate_boards
+
+
+parser = ArgumentParser(prog='Dice_Wars-board-corpus')
+parser.add_argument('corpus', help="The .npy file to write the corpus to")
+parser.add_argument('-n', '--nb-boards', help="Number of consecutive seeds to generate boards from", type=int,
+                    required=True)
+parser.add_argument('-b', '--board', help="Seed of the first board", type=int, default=0)
+parser.add_argument('-j', '--processes', help="Number of worker processes", type=int, default=os.cpu_count())
+parser.add_argument('--chunk-size', help="Number of boards a worker generates at once", type=int, default=32)
+parser.add_argument('-r', '--report', help="Report progress on the stdout", action='store_true')
+
+
+def distribution(counter):
+    total = sum(counter.values())
+    return '\n'.join('  {:3d}: {:8d} {:6.2f} %'.format(k, v, 100 * v / total) for k, v in sorted(counter.items()))
+
+
+def main():
+    """
+    Generate boards in parallel into a corpus, dropping boards of an already seen structure.
+    """
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read('dicewars.config')
+
+    last_seed = args.board + args.nb_boards
+    chunks = [range(seed, min(seed + args.chunk_size, last_seed)) for seed in range(args.board, last_seed, args.chunk_size)]
+
+    area_counts = Counter()
+    degrees = Counter()
+    nb_generated = 0
+    start = time.time()
+    grid = board_grid(config['BOARD'])
+    with CorpusWriter(args.corpus, args.nb_boards, grid) as writer, Pool(args.processes) as pool:
+        for boards in pool.imap(partial(generate_boards, dict(config['BOARD'])), chunks):
+            for seed, board_hash, nb_areas, labels, board_degrees in boards:
+                if writer.add(seed, board_hash, nb_areas, labels):
+                    area_counts[nb_areas] += 1
+                    degrees.update(board_degrees)
+            nb_generated += len(boards)
+            if args.report:
+                print('\r{}/{} boards, {:.1f} boards/s'.format(
+                    nb_generated, args.nb_boards, nb_generated / (time.time() - start)), end='', flush=True)
+        nb_unique = writer.nb_boards
+    elapsed = time.time() - start
+
+    if args.report:
+        print()
+    print('Generated {} boards in {:.1f} s with {} processes, {:.1f} boards/s'.format(
+        nb_generated, elapsed, args.processes, nb_generated / elapsed))
+    print('Kept {} boards, dropped {} duplicates'.format(nb_unique, nb_generated - nb_unique))
+    print('Areas per board:')
+    print(distribution(area_counts))
+    print('Neighbours per area:')
+    print(distribution(degrees))
+
+
+if __name__ == '__main__':
+    main()
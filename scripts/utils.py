@@ -1,7 +1,10 @@
+import json
 import os
+import socket
 import sys
 from subprocess import Popen
 import tempfile
+import uuid
 import numpy as np
 import random
 
@@ -66,7 +69,7 @@ def log_file_producer(logdir, process):
 def run_ai_only_game(
         port, address, process_list, ais,
         board_definition=None, fixed=None, client_seed=None,
-        logdir=None, debug=False):
+        logdir=None, debug=False, record=False, board_library=None):
     logs = []
     process_list.clear()
 
@@ -86,18 +89,89 @@ def run_ai_only_game(
         server_cmd.extend(['-f', str(fixed)])
     if debug:
         server_cmd.extend(['--debug', 'DEBUG'])
+    if record:
+        server_cmd.append('--record')
+    if board_library is not None:
+        server_cmd.extend(['--board-library', board_library])
 
     server_output = tempfile.TemporaryFile('w+')
     logs.append(log_file_producer(logdir, 'server.txt'))
     process_list.append(Popen(server_cmd, stdout=server_output, stderr=logs[-1]))
 
+    start_ai_clients(port, address, process_list, ais, logs, client_seed, logdir, debug)
+
+    for p in process_list:
+        p.wait()
+
+    for log in logs:
+        log.close()
+
+    server_output.seek(0)
+    server_output = server_output.read()
+    game_summary = GameSummary.from_repr(server_output)
+    return game_summary
+
+
+def run_hosted_ai_only_game(
+        port, address, process_list, ais,
+        board_definition=None, fixed=None, client_seed=None,
+        logdir=None, debug=False):
+    """Play a game on an already running game-server.py
+
+    Takes the same parameters as run_ai_only_game(), except for record and board_library,
+    boards are taken from the library of the game-server.py.
+    """
+    logs = []
+    process_list.clear()
+
+    game_id = uuid.uuid4().hex
+    create_msg = {
+        'type': 'create_game',
+        'game_id': game_id,
+        'nb_players': len(ais),
+        'order': [get_nickname(ai) for ai in ais],
+        'fixed': fixed,
+    }
+    if board_definition is not None:
+        create_msg['board'] = board_definition.board
+        create_msg['ownership'] = board_definition.ownership
+        create_msg['strength'] = board_definition.strength
+
+    with socket.create_connection((address, port)) as controller:
+        controller.sendall(json.dumps(create_msg).encode())
+
+        start_ai_clients(port, address, process_list, ais, logs, client_seed, logdir, debug, game_id=game_id)
+
+        response = b''
+        while True:
+            data = controller.recv(65535)
+            if not data:
+                break
+            response += data
+
+    for p in process_list:
+        p.wait()
+
+    for log in logs:
+        log.close()
+
+    if not response:
+        raise RuntimeError("Game {} failed on the game server".format(game_id))
+    msg = json.loads(response.rstrip(b'\0').decode())
+    return GameSummary.from_repr(msg['summary'])
+
+
+def start_ai_clients(port, address, process_list, ais, logs, client_seed, logdir, debug, game_id=None):
     for ai_version in ais:
         client_cmd = [
             "./scripts/client.py",
             "-p", str(port),
             "-a", str(address),
             "--ai", str(ai_version),
+            "--protocol", "binary",
         ]
+        if game_id is not None:
+            client_cmd.extend(['--game-id', game_id])
         if client_seed is not None:
             client_cmd.extend(['-s', str(client_seed)])
         if debug:
@@ -106,17 +180,6 @@ def run_ai_only_game(
         logs.append(log_file_producer(logdir, 'client-{}.log'.format(ai_version)))
         process_list.append(Popen(client_cmd, stderr=logs[-1]))
 
-    for p in process_list:
-        p.wait()
-
-    for log in logs:
-        log.close()
-
-    server_output.seek(0)
-    server_output = server_output.read()
-    game_summary = GameSummary.from_repr(server_output)
-    return game_summary
-
 
 class ListStats:
     def __init__(self, the_list):
@@ -0,0 +1,28 @@
+"""Boards prepared for tests
+"""
+import configparser
+
+from dicewars.client.game.board import Board
+from dicewars.server.board_setup import prepare_board
+
+
+def board_config(area_assignment='orig'):
+    """Get the BOARD section of a configuration of boards of 35 areas by the flat generator
+    """
+    config = configparser.ConfigParser()
+    config.read_dict({'BOARD': {
+        'BoardSize': '35', 'DiceAssignment': 'orig', 'AreaAssignment': area_assignment, 'DiceDensity': '2',
+        'GeneratorVersion': '2',
+    }})
+    return config['BOARD']
+
+
+def client_board(nb_players=4, seed=0):
+    """Prepare a board from board_config() and give it as a client would see it
+    """
+    board, ownership = prepare_board(board_config(), nb_players, seed, seed, seed)
+    areas = {
+        str(name): {'owner': ownership[name], 'dice': area.get_dice()}
+        for name, area in board.areas.items()
+    }
+    return Board(areas, {str(name): description for name, description in board.get_board().items()})
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import unittest
+
+from dicewars.client.socket_listener import JsonDecoder
+from dicewars.config import load_config
+from dicewars.server.async_server import MultiGameServer
+from dicewars.server.summary import GameSummary
+
+
+async def passing_client(port, game_id, nickname, first_msg=None):
+    """Join a game and end every turn, or send first_msg on the first one
+
+    Returns
+    -------
+    list of str
+        Types of messages received until the server closed the connection
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(json.dumps({'type': 'client_desc', 'nickname': nickname, 'game_id': game_id}).encode())
+    decoder = JsonDecoder()
+    received = []
+    player = None
+    while True:
+        try:
+            data = await reader.read(65535)
+        except ConnectionResetError:
+            break
+        if not data:
+            break
+        decoder.feed(data)
+        messages = list(decoder.messages())
+        received.extend(msg['type'] for msg in messages)
+        if 'game_end' in received:
+            continue
+        for msg in messages:
+            if msg['type'] == 'game_start':
+                player = msg['player']
+            elif msg['type'] in ['game_state', 'end_turn'] and msg['current_player'] == player:
+                writer.write(json.dumps(first_msg or {'type': 'end_turn'}).encode())
+                first_msg = None
+    writer.close()
+    return received
+
+
+async def send_first_message(port, data):
+    """Send a first message and read everything until the server closes the connection
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(data)
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def create_game(game_id, nb_players):
+    return json.dumps({'type': 'create_game', 'game_id': game_id, 'nb_players': nb_players, 'board': 1,
+                       'ownership': 2, 'strength': 3, 'fixed': 4}).encode()
+
+
+class MultiGameServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        config = load_config()
+        self.server = MultiGameServer('127.0.0.1', 0, config['BOARD'], config['GAME'], workers=1,
+                                      join_timeout=5.0, hello_timeout=1.0)
+        await self.server.start()
+        self.port = self.server.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def assertNoGames(self):
+        self.assertEqual(self.server.announced, {})
+        self.assertEqual(self.server.joined, {})
+        self.assertEqual(self.server.running, set())
+        self.assertEqual(self.server.timeouts, {})
+
+    async def test_concurrent_games(self):
+        clients = [passing_client(self.port, game_id, 'AI {}'.format(i)) for i in range(3) for game_id in 'ab']
+        controllers = [send_first_message(self.port, create_game(game_id, 3)) for game_id in 'ba']
+        results = await asyncio.wait_for(asyncio.gather(*clients, *controllers), 30)
+
+        for received in results[:-2]:
+            self.assertEqual(received[:2], ['game_start', 'game_state'])
+            self.assertEqual(received[-1], 'game_end')
+        for game_id, response in zip('ba', results[-2:]):
+            msg = json.loads(response.rstrip(b'\0').decode())
+            self.assertEqual(msg['game_id'], game_id)
+            self.assertEqual(GameSummary.from_repr(msg['summary']).winner, '#None')
+        self.assertNoGames()
+
+    async def test_instrumented_game(self):
+        self.server.instrument = True
+        clients = [passing_client(self.port, 'a', 'AI {}'.format(i)) for i in range(2)]
+        results = await asyncio.wait_for(asyncio.gather(*clients, send_first_message(self.port, create_game('a', 2))), 30)
+
+        report = json.loads(results[-1].rstrip(b'\0').decode())['instrumentation']
+        self.assertEqual(set(report['response_times']), {'AI 0', 'AI 1'})
+        self.assertEqual(report['processing_times']['end_turn']['count'],
+                         sum(t['count'] for t in report['response_times'].values()))
+        self.assertEqual(report['serialization_times']['game_start']['count'], 2)
+        self.assertGreater(report['bytes_sent']['end_turn'], 0)
+
+    async def test_malformed_first_messages(self):
+        messages = [
+            b'{"game_id": 1}',
+            b'[1, 2]',
+            b'{"type": "create_game", "game_id": 1}',
+            b'{"type": "create_game", "game_id": 1, "nb_players": "2"}',
+            b'{"type": "client_desc", "game_id": 1}',
+            b'{"type": "client_desc", "game_id": [1], "nickname": "AI"}',
+            b'{"type": "client_desc", "game_id": 1, "nickname": "AI"}\0{}',
+            b'\xff\0',
+            b'{"type": ',
+        ]
+        with self.assertLogs('SERVER', 'WARNING') as logs:
+            responses = await asyncio.wait_for(
+                asyncio.gather(*(send_first_message(self.port, data) for data in messages)), 5)
+        self.assertEqual(responses, [b''] * len(messages))
+        self.assertEqual(len(logs.records), len(messages))
+        self.assertNoGames()
+
+    async def test_first_message_in_pieces(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        data = create_game('a', 2)
+        writer.write(data[:10])
+        await asyncio.sleep(0.05)
+        writer.write(data[10:])
+        await asyncio.sleep(0.05)
+        self.assertIn('a', self.server.announced)
+        writer.close()
+
+    async def test_oversubscribed_game(self):
+        clients = [asyncio.create_task(passing_client(self.port, 'a', 'AI {}'.format(i))) for i in range(3)]
+        await asyncio.sleep(0.1)
+        with self.assertLogs('SERVER', 'WARNING'):
+            response = await asyncio.wait_for(send_first_message(self.port, create_game('a', 2)), 30)
+        received = await asyncio.gather(*clients)
+
+        self.assertEqual(received[2], [])
+        self.assertEqual(received[0][-1], 'game_end')
+        self.assertEqual(json.loads(response.rstrip(b'\0').decode())['type'], 'game_summary')
+        self.assertNoGames()
+
+    async def test_game_not_started_in_time(self):
+        self.server.join_timeout = 0.1
+        with self.assertLogs('SERVER', 'WARNING'):
+            results = await asyncio.wait_for(asyncio.gather(
+                passing_client(self.port, 'a', 'AI'),
+                send_first_message(self.port, create_game('b', 2)),
+            ), 5)
+        self.assertEqual(results, [[], b''])
+        self.assertNoGames()
+
+    async def test_failing_game_closes_connections(self):
+        clients = [passing_client(self.port, 'a', 'AI {}'.format(i), {'type': 'battle', 'atk': 99, 'def': 98})
+                   for i in range(2)]
+        with self.assertLogs('SERVER', 'ERROR'):
+            results = await asyncio.wait_for(asyncio.gather(*clients, send_first_message(self.port, create_game('a', 2))), 30)
+        self.assertEqual(results[-1], b'')
+        self.assertNoGames()
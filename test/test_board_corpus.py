@@ -0,0 +1,47 @@
+import configparser
+import os
+import random
+import tempfile
+import unittest
+
+from dicewars.server.board_corpus import (
+    CorpusWriter, board_from_record, board_grid, generate_boards, load_corpus, wl_hash,
+)
+from dicewars.server.generator import BoardGenerator
+
+
+class WLHashTest(unittest.TestCase):
+    def test_isomorphic_graphs(self):
+        neighbours = {1: [2, 3], 2: [1, 3, 4], 3: [1, 2], 4: [2]}
+        names = list(range(1, 5))
+        random.Random(1).shuffle(names)
+        renamed = {names[node - 1]: [names[n - 1] for n in adjacent] for node, adjacent in neighbours.items()}
+        self.assertEqual(wl_hash(neighbours), wl_hash(renamed))
+
+    def test_distinguishes_graphs(self):
+        path = {1: [2], 2: [1, 3], 3: [2, 4], 4: [3]}
+        star = {1: [2, 3, 4], 2: [1], 3: [1], 4: [1]}
+        cycle = {1: [2, 4], 2: [1, 3], 3: [2, 4], 4: [3, 1]}
+        self.assertEqual(len({wl_hash(path), wl_hash(star), wl_hash(cycle)}), 3)
+
+
+class CorpusTest(unittest.TestCase):
+    def test_duplicates_dropped(self):
+        config = configparser.ConfigParser()
+        config.read_dict({'BOARD': {'BoardSize': '35'}})
+        grid = board_grid(config['BOARD'])
+        boards = generate_boards({'BoardSize': '35'}, [5, 6, 5])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'corpus.npy')
+            with CorpusWriter(path, len(boards), grid) as writer:
+                added = [writer.add(seed, board_hash, nb_areas, labels) for seed, board_hash, nb_areas, labels, _ in boards]
+            self.assertEqual(added, [True, True, False])
+
+            corpus = load_corpus(path)
+            self.assertEqual(corpus['seed'].tolist(), [5, 6])
+            random.seed(6)
+            generated = BoardGenerator().generate_board(35)
+            board = board_from_record(corpus[1], grid)
+            for name, area in generated.items():
+                self.assertEqual(sorted(area['hexes']), sorted(board[name]['hexes']))
+                self.assertEqual(sorted(area['neighbours']), board[name]['neighbours'])
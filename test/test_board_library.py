@@ -0,0 +1,39 @@
+import json
+import tempfile
+import unittest
+
+from dicewars.server.board_library import BoardLibrary, BoardLibraryWriter
+from dicewars.server.board_setup import prepare_board
+
+from boards import board_config
+
+
+class BoardLibraryTest(unittest.TestCase):
+    def test_boards_are_prepared_as_without_library(self):
+        config = board_config('continuous')
+        with tempfile.TemporaryDirectory() as path:
+            with BoardLibraryWriter(path) as writer:
+                for board_seed in range(3):
+                    board, ownership = prepare_board(config, 4, board_seed, 42, 42)
+                    self.assertTrue(writer.add(config, 4, board_seed, 42, 42, board, ownership))
+                self.assertFalse(writer.add(config, 4, 0, 42, 42, board, ownership))
+            with BoardLibraryWriter(path) as writer:
+                board, ownership = prepare_board(config, 2, 0, 42, 42)
+                writer.add(config, 2, 0, 42, 42, board, ownership)
+
+            library = BoardLibrary(path)
+            self.assertEqual(len(library), 4)
+            for nb_players, board_seed in [(4, 0), (4, 2), (2, 0)]:
+                board, ownership = prepare_board(config, nb_players, board_seed, 42, 42)
+                stored_board, stored_ownership = library.get(config, nb_players, board_seed, 42, 42)
+                self.assertEqual(json.dumps(stored_board.get_board()), json.dumps(board.get_board()))
+                self.assertEqual(list(stored_ownership.items()), list(ownership.items()))
+                self.assertEqual(
+                    {name: area.get_dice() for name, area in stored_board.areas.items()},
+                    {name: area.get_dice() for name, area in board.areas.items()},
+                )
+
+            self.assertIsNone(library.get(config, 3, 0, 42, 42))
+            self.assertIsNone(library.get(config, 4, 0, None, 42))
+            config['DiceDensity'] = '3'
+            self.assertIsNone(library.get(config, 4, 0, 42, 42))
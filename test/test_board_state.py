@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from dicewars.board_state import BoardState
+from dicewars.client.game.board import Board
+
+
+def random_client_board(rng, width, height, nb_players):
+    areas, board = {}, {}
+    for y in range(height):
+        for x in range(width):
+            neighbours = []
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1), (1, -1), (-1, 1)):
+                if 0 <= x + dx < width and 0 <= y + dy < height:
+                    neighbours.append((y + dy) * width + x + dx + 1)
+            name = str(y * width + x + 1)
+            areas[name] = {'owner': rng.randint(1, nb_players), 'dice': rng.randint(1, 8)}
+            board[name] = {'neighbours': neighbours, 'hexes': []}
+    return Board(areas, board)
+
+
+class BoardStateTests(unittest.TestCase):
+    def setUp(self):
+        self.board = random_client_board(random.Random(4), 7, 6, 3)
+        self.state = BoardState.from_board(self.board)
+
+    def test_matches_client_board(self):
+        for player in range(1, 4):
+            names = [area.get_name() for area in self.board.get_player_areas(player)]
+            border = [area.get_name() for area in self.board.get_player_border(player)]
+            regions = self.board.get_players_regions(player)
+
+            self.assertEqual(list(self.state.player_areas(player)), sorted(names))
+            self.assertEqual(list(self.state.player_border(player)), sorted(border))
+            self.assertEqual(self.state.dice_per_player(3)[player], self.board.get_player_dice(player))
+            self.assertEqual(
+                sorted(sorted(region.tolist()) for region in self.state.player_regions(player)),
+                sorted(sorted(region) for region in regions),
+            )
+            self.assertEqual(self.state.largest_regions(3)[player], max(len(region) for region in regions))
+
+        for area in self.board.areas.values():
+            self.assertEqual(list(self.state.neighbours(area.get_name())), sorted(area.get_adjacent_areas_names()))
+
+    def test_copy_is_independent(self):
+        copy = self.state.copy()
+        self.assertEqual(copy.key(), self.state.key())
+
+        copy.owner[1] = 3 if copy.owner[1] != 3 else 2
+        self.assertNotEqual(copy.key(), self.state.key())
+        self.assertIs(copy.indices, self.state.indices)
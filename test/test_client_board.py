@@ -0,0 +1,142 @@
+import copy
+import random
+import unittest
+
+from boards import client_board
+
+
+def scanned_player_areas(board, player_name):
+    return [area for area in board.areas.values() if area.get_owner_name() == player_name]
+
+
+def scanned_border(board, player_name):
+    return [
+        area for area in scanned_player_areas(board, player_name)
+        if any(board.get_area(n).get_owner_name() != player_name for n in area.get_adjacent_areas_names())
+    ]
+
+
+def scanned_regions(board, player_name, skip_area=None):
+    names = [area.get_name() for area in scanned_player_areas(board, player_name) if area.get_name() != skip_area]
+    regions = []
+    while names:
+        region = {names[0]}
+        to_test = [names[0]]
+        while to_test:
+            for n in board.get_area(to_test.pop()).get_adjacent_areas_names():
+                if n in names and n not in region:
+                    region.add(n)
+                    to_test.append(n)
+        regions.append([name for name in names if name in region])
+        names = [name for name in names if name not in region]
+    return regions or [[]]
+
+
+class ClientBoardTest(unittest.TestCase):
+    def assertIndexesMatchScans(self, board):
+        for player_name in range(1, 6):
+            self.assertEqual(board.get_player_areas(player_name), scanned_player_areas(board, player_name))
+            self.assertEqual(board.get_player_border(player_name), scanned_border(board, player_name))
+            self.assertEqual(
+                board.get_player_dice(player_name),
+                sum(area.get_dice() for area in scanned_player_areas(board, player_name)),
+            )
+        self.assertEqual(board.nb_players_alive(), len({area.get_owner_name() for area in board.areas.values()}))
+
+    def test_player_indexes_follow_changes(self):
+        rng = random.Random(42)
+        board = client_board()
+        self.assertIndexesMatchScans(board)
+        for _ in range(300):
+            area = board.get_area(rng.randint(1, len(board.areas)))
+            if rng.random() < 0.5:
+                area.set_owner(rng.randint(1, 5))
+            else:
+                area.dice = rng.randint(1, 8)
+            self.assertIndexesMatchScans(board)
+
+        clone = board.clone()
+        clone.get_area(1).set_owner(5)
+        self.assertEqual(board.get_players_regions(5), scanned_regions(board, 5))
+        self.assertEqual(clone.get_players_regions(5), scanned_regions(clone, 5))
+        for area in clone.areas.values():
+            area.set_owner(1)
+        self.assertIndexesMatchScans(clone)
+        self.assertEqual(clone.nb_players_alive(), 1)
+        self.assertEqual(clone.get_player_border(1), [])
+        self.assertIndexesMatchScans(board)
+
+        board.get_player_areas(1).clear()
+        board.get_player_border(1).clear()
+        self.assertIndexesMatchScans(board)
+
+    def test_clone_is_independent(self):
+        board = client_board()
+        for clone in [board.clone(), copy.deepcopy(board)]:
+            area = clone.get_area(1)
+            original = board.get_area(1)
+            self.assertIsNot(area, original)
+            self.assertEqual(area.get_hexes(), original.get_hexes())
+
+            area.set_owner(original.get_owner_name() % 4 + 1)
+            area.set_dice(original.get_dice() % 8 + 1)
+            area.get_adjacent_areas_names().append(1000)
+            self.assertNotEqual(area.get_owner_name(), original.get_owner_name())
+            self.assertNotEqual(area.get_dice(), original.get_dice())
+            self.assertNotIn(1000, original.get_adjacent_areas_names())
+
+    def test_regions_follow_changes(self):
+        rng = random.Random(7)
+        board = client_board()
+        for _ in range(100):
+            board.get_area(rng.randint(1, len(board.areas))).set_owner(rng.randint(1, 4))
+            for player_name in range(1, 6):
+                regions = scanned_regions(board, player_name)
+                self.assertEqual(board.get_players_regions(player_name), regions)
+                largest_region_size = max(len(region) for region in regions)
+                self.assertEqual(board.get_largest_region_size(player_name), largest_region_size)
+                self.assertEqual(
+                    board.get_largest_region(player_name),
+                    [region for region in regions if len(region) == largest_region_size][0],
+                )
+
+                area_name = rng.randint(1, len(board.areas))
+                regions_without = scanned_regions(board, player_name, skip_area=area_name)
+                self.assertEqual(board.get_players_regions(player_name, skip_area=area_name), regions_without)
+                self.assertEqual(
+                    board.get_largest_region_size(player_name, skip_area=area_name),
+                    max(len(region) for region in regions_without),
+                )
+
+                area = board.get_area(area_name)
+                owner = area.get_owner_name()
+                gained_size = board.get_largest_region_size_if_gained(player_name, area_name)
+                area.set_owner(player_name)
+                self.assertEqual(gained_size, max(len(region) for region in scanned_regions(board, player_name)))
+                area.set_owner(owner)
+
+    def test_clones_share_scratch_buffers(self):
+        rng = random.Random(3)
+        board = client_board()
+        clones = [board.clone(), board.clone()]
+        for _ in range(50):
+            for clone in clones:
+                clone.get_area(rng.randint(1, len(clone.areas))).set_owner(rng.randint(1, 4))
+                for player_name in range(1, 5):
+                    self.assertEqual(clone.get_players_regions(player_name), scanned_regions(clone, player_name))
+
+    def test_areas_by_integer_names(self):
+        board = client_board()
+        area = board.get_area(3)
+        self.assertIs(board.get_area('3'), area)
+        self.assertIs(board.areas[3], area)
+        for name in [0, len(board.areas) + 1, '', 'x', None]:
+            with self.assertRaises(KeyError):
+                board.get_area(name)
+
+        for board in [board, board.clone()]:
+            for area in board.areas.values():
+                adjacent_areas = board.get_adjacent_areas(area.get_name())
+                self.assertEqual([a.get_name() for a in adjacent_areas], area.get_adjacent_areas_names())
+                for adjacent_area in adjacent_areas:
+                    self.assertIs(adjacent_area, board.get_area(adjacent_area.get_name()))
@@ -0,0 +1,57 @@
+from collections import Counter
+import random
+import unittest
+
+from dicewars.server.dice import DiceRoller
+
+
+def allocate_one_by_one(rng, capacities, nb_dice):
+    """The original loop of Game.distribute_player_dice()"""
+    dice = [0] * len(capacities)
+    areas = list(range(len(capacities)))
+    while nb_dice and areas:
+        area = rng.choice(areas)
+        if dice[area] >= capacities[area]:
+            areas.remove(area)
+        else:
+            dice[area] += 1
+            nb_dice -= 1
+    return tuple(dice)
+
+
+class DiceRollerTests(unittest.TestCase):
+    def test_reproducible(self):
+        a, b = DiceRoller(11, block_size=7), DiceRoller(11, block_size=7)
+        self.assertEqual([a.roll(n % 8 + 1) for n in range(100)], [b.roll(n % 8 + 1) for n in range(100)])
+
+    def test_streams_are_independent(self):
+        a, b = DiceRoller(3), DiceRoller(3)
+        for _ in range(50):
+            a.roll(8)
+            a.allocate([3, 0, 5], 4)
+        self.assertEqual(a.shuffled(list(range(8))), b.shuffled(list(range(8))))
+
+    def test_rolls_are_fair(self):
+        roller = DiceRoller(5, block_size=100)
+        rolls = [roller.roll(1) for _ in range(60000)]
+        for face in range(1, 7):
+            self.assertAlmostEqual(rolls.count(face) / len(rolls), 1 / 6, delta=0.01)
+
+    def test_allocation_respects_capacities(self):
+        roller = DiceRoller(8)
+        for nb_dice in range(0, 20):
+            counts = roller.allocate([2, 0, 7, 1, 3], nb_dice)
+            self.assertEqual(sum(counts), min(nb_dice, 13))
+            self.assertTrue(all(count <= capacity for count, capacity in zip(counts, [2, 0, 7, 1, 3])))
+
+    def test_allocation_matches_one_by_one_distribution(self):
+        capacities, nb_dice, nb_samples = [2, 1, 0, 4, 3], 6, 30000
+        roller = DiceRoller(21)
+        rng = random.Random(21)
+
+        blocked = Counter(tuple(roller.allocate(capacities, nb_dice)) for _ in range(nb_samples))
+        one_by_one = Counter(allocate_one_by_one(rng, capacities, nb_dice) for _ in range(nb_samples))
+
+        self.assertEqual(set(blocked), set(one_by_one))
+        for outcome, count in one_by_one.items():
+            self.assertAlmostEqual(blocked[outcome] / nb_samples, count / nb_samples, delta=0.01)
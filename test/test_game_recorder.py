@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dicewars.ai.utils import possible_attacks
+from dicewars.client.ai_driver import BattleCommand, EndTurnCommand
+from dicewars.config import load_config
+from dicewars.server.board_setup import prepare_board
+from dicewars.server.headless import HeadlessGame
+from NN_scripts.game import GameRecorder, game_configuration
+
+from boards import board_config
+
+try:
+    from NN_scripts.dataset import get_datasets
+except ImportError:
+    get_datasets = None
+
+
+class StrongerAttacksAI:
+    def __init__(self, player_name, board, players_order, max_transfers):
+        self.player_name = player_name
+
+    def ai_turn(self, board, nb_moves_this_turn, nb_transfers_this_turn, nb_turns_this_game, time_left):
+        for source, target in possible_attacks(board, self.player_name):
+            if source.get_dice() > target.get_dice():
+                return BattleCommand(source.get_name(), target.get_name())
+        return EndTurnCommand()
+
+
+class GameRecorderTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.log_dir = os.path.join(tmp.name, 'data')
+
+    def play(self, chunk_size):
+        """Play a game, recording it and keeping the rows given by game_configuration()
+        """
+        config = load_config()
+        board, ownership = prepare_board(board_config(), 4, 3, 3, 3)
+        recorder = GameRecorder(board, log_dir=self.log_dir, chunk_size=chunk_size)
+        game = HeadlessGame(board, ownership, [StrongerAttacksAI] * 4, config['GAME'], config['AI_DRIVER'],
+                            nicknames=list('abcd'), seed=3)
+        rows = []
+        while True:
+            game.handle_player_turn()
+            if game.check_win_condition():
+                break
+            recorder.record(game.board, game.players)
+            rows.append(game_configuration(game.board, game.players))
+        recorder.finish(game.get_winner())
+        return game.get_winner(), rows, recorder
+
+    def test_chunks_end_up_under_winner(self):
+        winner, rows, recorder = self.play(chunk_size=64)
+        self.assertIsNotNone(winner)
+        self.assertGreater(len(rows), 64)
+        self.assertNotEqual(len(rows) % 64, 0)
+
+        self.assertEqual(os.listdir(self.log_dir), [str(winner)])
+        self.assertFalse(os.path.exists(recorder.pending_dir))
+        winner_dir = os.path.join(self.log_dir, str(winner))
+        paths = sorted(os.listdir(winner_dir), key=lambda name: int(name.split('-')[1].split('.')[0]))
+        self.assertEqual(len(paths), len(rows) // 64 + 1)
+
+        recorded = np.concatenate([np.load(os.path.join(winner_dir, path)) for path in paths])
+        self.assertEqual(recorded.tolist(), np.array(rows).tolist())
+
+    def test_game_without_winner_is_discarded(self):
+        board, _ = prepare_board(board_config(), 4, 3, 3, 3)
+        recorder = GameRecorder(board, log_dir=self.log_dir, chunk_size=4)
+        recorder.finish(None)
+        self.assertEqual(os.listdir(os.path.dirname(self.log_dir)), [])
+
+    @unittest.skipIf(get_datasets is None, "torch is not available")
+    def test_recorded_data_can_be_loaded(self):
+        _, rows, _ = self.play(chunk_size=64)
+        train, valid = get_datasets(self.log_dir)
+        self.assertEqual(len(train) + len(valid), len(rows))
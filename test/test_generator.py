@@ -0,0 +1,48 @@
+import unittest
+
+from dicewars.server.generator import FlatBoardGenerator, get_hex_grid
+
+
+class HexGridTest(unittest.TestCase):
+    def test_neighbours_match_hexutil(self):
+        grid = get_hex_grid(-32, 30, -14, 13)
+        valid_hexes = {grid.hexes[h] for h in grid.valid}
+        for h in grid.valid:
+            expected = [n if n in valid_hexes else None for n in grid.hexes[h].neighbours()]
+            self.assertEqual([grid.hexes[n] for n in grid.neighbour_lists[h]], expected)
+
+
+class FlatBoardGeneratorTest(unittest.TestCase):
+    def test_reproducible(self):
+        self.assertEqual(FlatBoardGenerator(7).generate_board(35), FlatBoardGenerator(7).generate_board(35))
+
+    def test_adjacency_matches_hexes(self):
+        for seed in range(20):
+            board = FlatBoardGenerator(seed).generate_board(35)
+            self.assertEqual(len(board), 34)
+
+            owner = {}
+            for name, area in board.items():
+                for h in area['hexes']:
+                    self.assertNotIn(h, owner)
+                    owner[h] = name
+
+            for name, area in board.items():
+                adjacent = {owner[n] for h in area['hexes'] for n in h.neighbours() if owner.get(n, name) != name}
+                self.assertEqual(sorted(adjacent), area['neighbours'])
+
+    def test_stuck_first_area_is_not_restarted_on_used_hexes(self):
+        # 8 hexes do not fit an area of 12 or more, every attempt gets stuck and uses up hexes
+        with self.assertRaises(ValueError):
+            FlatBoardGenerator(0, 0, 6, 0, 1).generate_board(2)
+
+    def test_connected(self):
+        for seed in range(50):
+            board = FlatBoardGenerator(seed).generate_board(35)
+            reached, stack = {1}, [1]
+            while stack:
+                for name in board[stack.pop()]['neighbours']:
+                    if name not in reached:
+                        reached.add(name)
+                        stack.append(name)
+            self.assertEqual(len(reached), len(board))
@@ -0,0 +1,169 @@
+import configparser
+import os
+import random
+import tempfile
+import unittest
+
+from dicewars.ai.utils import possible_attacks
+from dicewars.board_state import BoardState
+from dicewars.client.ai_driver import BattleCommand, EndTurnCommand
+from dicewars.server.board import Board
+from dicewars.server.headless import HeadlessGame
+from dicewars.server.instrumentation import GameInstrumentation
+from dicewars.server.replay import Replay, ReplayWriter
+from dicewars.server.summary import GameSummary
+
+
+CONFIG = """
+[GAME]
+MaxDicePerArea = 8
+DeploymentMethod = unlimited
+ReserveProductionCap = 64
+ReserveType = complement
+ReserveSizeCap = 24
+BattleWearMinimum = 4
+MaximumNoBattleRounds = 8
+MaximumBattlesPerGame = 10000
+
+[AI_DRIVER]
+MaxTransfersPerTurn = 6
+TimeLimitConstructor = 10.0
+FischerInit = 10.0
+FischerIncrement = 0.25
+"""
+
+
+class AggressiveAI:
+    def __init__(self, player_name, board, players_order, max_transfers):
+        self.player_name = player_name
+
+    def ai_turn(self, board, nb_moves_this_turn, nb_transfers_this_turn, nb_turns_this_game, time_left):
+        for source, target in possible_attacks(board, self.player_name):
+            if source.get_dice() >= target.get_dice():
+                return BattleCommand(source.get_name(), target.get_name())
+        return EndTurnCommand()
+
+
+def line_board(nb_areas):
+    areas = {}
+    for i in range(1, nb_areas + 1):
+        neighbours = [n for n in (i - 1, i + 1) if 1 <= n <= nb_areas]
+        areas[i] = {'neighbours': neighbours, 'hexes': [[2 * i, 0]]}
+    board = Board(areas)
+    for area in board.areas.values():
+        area.set_dice(3)
+    return board
+
+
+class HeadlessGameTests(unittest.TestCase):
+    def setUp(self):
+        config = configparser.ConfigParser()
+        config.read_string(CONFIG)
+        self.config = config
+
+    def new_game(self, seed, replay=None, instrumentation=None):
+        random.seed(seed)
+        board = line_board(6)
+        ownership = {1: 1, 2: 1, 3: 1, 4: 2, 5: 2, 6: 2}
+        return HeadlessGame(
+            board, ownership, [AggressiveAI, AggressiveAI], self.config['GAME'], self.config['AI_DRIVER'],
+            nicknames=['first', 'second'], nicknames_order=['first', 'second'], seed=seed, replay=replay,
+            instrumentation=instrumentation,
+        )
+
+    def play(self, seed):
+        game = self.new_game(seed)
+        return game, game.run()
+
+    def test_game_is_decided(self):
+        game, summary = self.play(42)
+
+        self.assertIn(summary.winner, ['first', 'second'])
+        self.assertEqual(summary.participants(), ['second', 'first'] if summary.winner == 'first' else ['first', 'second'])
+        owners = {area.get_owner_name() for area in game.board.areas.values()}
+        self.assertEqual(len(owners), 1)
+
+    def test_clients_follow_server(self):
+        game, _ = self.play(7)
+
+        for driver in game.drivers.values():
+            for name, area in game.board.areas.items():
+                client_area = driver.board.get_area(name)
+                self.assertEqual(client_area.get_owner_name(), area.get_owner_name())
+                self.assertEqual(client_area.get_dice(), area.get_dice())
+
+    def test_reproducibility(self):
+        _, summary_a = self.play(3)
+        _, summary_b = self.play(3)
+        self.assertEqual(repr(summary_a), repr(summary_b))
+
+    def test_snapshot_and_restore(self):
+        game = self.new_game(11)
+        for _ in range(5):
+            game.handle_player_turn()
+            self.assertFalse(game.check_win_condition())
+        snapshot = game.snapshot()
+        self.assertEqual(snapshot.board_state.key(), BoardState.from_board(game.board).key())
+
+        def finish():
+            while True:
+                game.handle_player_turn()
+                if game.check_win_condition():
+                    return repr(game.summary), [(a.get_owner_name(), a.get_dice()) for a in game.board.areas.values()]
+
+        first_ending = finish()
+        game.restore(snapshot)
+        self.assertEqual(game.snapshot().owner.tolist(), snapshot.owner.tolist())
+        self.assertEqual(game.get_scores(), snapshot.scores[1])
+        for player in game.players.values():
+            game.send_message(player, 'game_state')
+
+        self.assertEqual(finish(), first_ending)
+
+    def test_replay_log(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        writer = ReplayWriter(path, keyframe_interval=3)
+        game = self.new_game(13, replay=writer)
+
+        def state():
+            return (
+                [area.get_owner_name() for area in game.board.areas.values()],
+                [area.get_dice() for area in game.board.areas.values()],
+                game.current_player.get_name(),
+                game.nb_battles,
+            )
+
+        turn_states = [state()]
+        while True:
+            game.handle_player_turn()
+            if game.check_win_condition():
+                break
+            if writer.turn == len(turn_states):
+                turn_states.append(state())
+        writer.finish(game.get_winner())
+
+        replay = Replay.load(path)
+        self.assertEqual(replay.get_winner(), game.get_winner())
+        self.assertGreater(len(turn_states), 3)
+        for turn in reversed(range(len(turn_states))):
+            replay.seek(turn)
+            self.assertEqual(
+                (replay.owner[1:].tolist(), replay.dice[1:].tolist(), replay.current_player, replay.nb_battles),
+                turn_states[turn],
+            )
+
+    def test_instrumentation(self):
+        instrumentation = GameInstrumentation()
+        summary = self.new_game(17, instrumentation=instrumentation).run()
+
+        nb_responses = sum(t.count for t in instrumentation.response_times.values())
+        self.assertEqual(set(instrumentation.response_times), {'first', 'second'})
+        self.assertEqual(nb_responses, sum(t.count for t in instrumentation.processing_times.values()))
+        self.assertEqual(instrumentation.processing_times['battle'].count, summary.nb_battles)
+        self.assertEqual(instrumentation.serialization_times['battle'].count, summary.nb_battles)
+        self.assertEqual(instrumentation.serialization_times['game_start'].count, 2)
+        self.assertGreater(instrumentation.bytes_sent['battle'], 0)
+        self.assertEqual(GameSummary.from_repr(repr(summary) + '\n' + repr(instrumentation)).winner, summary.winner)
@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from dicewars.server.board import Board
+from dicewars.server.player import Player
+
+
+def grid_board(width, height):
+    areas = {}
+    for y in range(height):
+        for x in range(width):
+            neighbours = []
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1), (1, -1), (-1, 1)):
+                if 0 <= x + dx < width and 0 <= y + dy < height:
+                    neighbours.append((y + dy) * width + x + dx + 1)
+            areas[y * width + x + 1] = {'neighbours': neighbours, 'hexes': []}
+    return Board(areas)
+
+
+def largest_region_bruteforce(board, area_names):
+    largest = 0
+    unvisited = set(area_names)
+    while unvisited:
+        to_visit = [unvisited.pop()]
+        size = 0
+        while to_visit:
+            size += 1
+            for name in board.get_area_by_name(to_visit.pop()).get_adjacent_areas_names():
+                if name in unvisited:
+                    unvisited.remove(name)
+                    to_visit.append(name)
+        largest = max(largest, size)
+    return largest
+
+
+class PlayerRegionTests(unittest.TestCase):
+    def test_empty_player(self):
+        self.assertEqual(Player(1).get_largest_region(), 0)
+
+    def test_conquests_and_losses(self):
+        rng = random.Random(1)
+        board = grid_board(6, 6)
+        player = Player(1)
+        owned = set()
+
+        for _ in range(500):
+            name = rng.randint(1, board.get_number_of_areas())
+            area = board.get_area_by_name(name)
+            if name in owned:
+                player.remove_area(area)
+                owned.remove(name)
+            else:
+                player.add_area(area)
+                owned.add(name)
+
+            self.assertEqual(player.get_largest_region(), largest_region_bruteforce(board, owned))
+            self.assertEqual(player.get_number_of_areas(), len(owned))
+            self.assertEqual(sum(len(region) for region in player.get_regions()), len(owned))
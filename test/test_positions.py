@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+import unittest
+
+from dicewars.server.board_setup import prepare_board
+from dicewars.server.positions import PositionBatch, prepare_positions
+
+from boards import board_config
+
+
+class PositionBatchTest(unittest.TestCase):
+    def test_positions_are_prepared_as_single_boards(self):
+        config = board_config()
+        batch = prepare_positions(config, 4, 5, seed=42)
+        self.assertEqual(len(batch), 5)
+        self.assertEqual(len(set(map(tuple, batch.seeds.tolist()))), 5)
+        self.assertEqual(batch.seeds.tolist(), prepare_positions(config, 4, 5, seed=42).seeds.tolist())
+
+        for i, seeds in enumerate(batch.seeds.tolist()):
+            board, ownership = prepare_board(config, 4, *seeds)
+            stored_board, stored_ownership = batch.get(i)
+            self.assertEqual(json.dumps(stored_board.get_board()), json.dumps(board.get_board()))
+            self.assertEqual(list(stored_ownership.items()), list(ownership.items()))
+            for name, area in board.areas.items():
+                self.assertEqual(batch.owners[i, name - 1], ownership[name])
+                self.assertEqual(batch.dice[i, name - 1], area.get_dice())
+            self.assertEqual(batch.nb_areas()[i], board.get_number_of_areas())
+
+    def test_save_and_load(self):
+        batch = prepare_positions(board_config(), 2, 3, seed=7)
+        with tempfile.TemporaryDirectory() as path:
+            batch.save(os.path.join(path, 'positions.npz'))
+            loaded = PositionBatch.load(os.path.join(path, 'positions.npz'))
+        self.assertEqual(loaded.data.tolist(), batch.data.tolist())
+        self.assertEqual(loaded.owners.tolist(), batch.owners.tolist())
+        self.assertEqual(loaded.get(2)[1], batch.get(2)[1])
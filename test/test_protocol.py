@@ -0,0 +1,62 @@
+import json
+import unittest
+
+from dicewars.protocol import FrameDecoder, encode_message
+
+
+MESSAGES = [
+    {'type': 'battle', 'atk': 3, 'def': 12},
+    {'type': 'transfer', 'src': 7, 'dst': 8},
+    {'type': 'end_turn'},
+    {'type': 'state_request'},
+    {
+        'type': 'battle',
+        'version': 17,
+        'score': {1: 6, 3: 2},
+        'result': {
+            'atk': {'name': 3, 'dice': 1, 'owner': 1, 'pwr': 25},
+            'def': {'name': 12, 'dice': 7, 'owner': 1, 'pwr': 19},
+        },
+    },
+    {
+        'type': 'transfer',
+        'version': 18,
+        'score': {},
+        'result': {
+            'src': {'name': 7, 'dice': 1},
+            'dst': {'name': 8, 'dice': 8},
+        },
+    },
+    {
+        'type': 'end_turn',
+        'version': 19,
+        'current_player': 2,
+        'areas': {4: {'owner': 1, 'dice': 5}, 30: {'owner': 1, 'dice': 8}},
+        'reserves': {1: 3, 2: 0, 3: 12},
+        'score': {},
+    },
+    {'type': 'game_end', 'winner': 2},
+]
+
+
+def through_json(msg):
+    return json.loads(json.dumps(msg))
+
+
+class ProtocolTests(unittest.TestCase):
+    def test_messages_look_like_json_ones(self):
+        for msg in MESSAGES:
+            decoder = FrameDecoder()
+            decoder.feed(encode_message(msg))
+            self.assertEqual(decoder.next_message(), through_json(msg))
+            self.assertIsNone(decoder.next_message())
+
+    def test_pipelined_stream_in_pieces(self):
+        stream = b''.join(encode_message(msg) for msg in MESSAGES * 3)
+        decoder = FrameDecoder()
+        decoded = []
+        for i in range(0, len(stream), 5):
+            decoder.feed(stream[i:i+5])
+            decoded.extend(decoder.messages())
+
+        self.assertEqual(decoded, [through_json(msg) for msg in MESSAGES * 3])
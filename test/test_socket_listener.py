@@ -0,0 +1,63 @@
+import json
+from queue import Empty
+import socket
+import unittest
+
+from dicewars.client.socket_listener import JsonDecoder, SocketListener
+from dicewars.protocol import encode_message
+
+
+MESSAGES = [
+    {'type': 'end_turn'},
+    {'type': 'game_end', 'winner': 2},
+]
+
+
+class JsonDecoderTest(unittest.TestCase):
+    def test_messages_split_anywhere(self):
+        messages = MESSAGES + [{'type': 'game_start', 'nickname': 'Čeněk (AI)'}]
+        data = b''.join(json.dumps(msg, ensure_ascii=False).encode() + b'\0' for msg in messages)
+        decoder = JsonDecoder()
+        decoded = []
+        for i in range(len(data)):
+            decoder.feed(data[i:i + 1])
+            decoded.extend(decoder.messages())
+        self.assertEqual(decoded, messages)
+
+    def test_invalid_message_is_skipped(self):
+        decoder = JsonDecoder()
+        with self.assertLogs('SOCKET', 'WARNING'):
+            decoder.feed(b'{"type": \0\0' + json.dumps(MESSAGES[0]).encode() + b'\0')
+            self.assertEqual(list(decoder.messages()), MESSAGES[:1])
+
+
+class SocketListenerTest(unittest.TestCase):
+    def setUp(self):
+        self.server, self.client = socket.socketpair()
+
+    def tearDown(self):
+        self.server.close()
+        self.client.close()
+
+    def test_json_messages(self):
+        listener = SocketListener(self.client, 65535)
+        self.assertTrue(listener.empty())
+        with self.assertRaises(Empty):
+            listener.get(timeout=0.01)
+
+        data = b''.join(json.dumps(msg).encode() + b'\0' for msg in MESSAGES)
+        self.server.sendall(data[:5])
+        with self.assertRaises(Empty):
+            listener.get(block=False)
+        self.server.sendall(data[5:])
+        self.assertEqual([listener.get(), listener.get()], MESSAGES)
+        self.assertTrue(listener.empty())
+        self.assertEqual(listener.bytes_received, len(data))
+        self.assertEqual(listener.messages_received, 2)
+        self.assertEqual(listener.nb_reads, 2)
+
+    def test_binary_messages(self):
+        listener = SocketListener(self.client, 65535, 'binary')
+        self.server.sendall(b''.join(encode_message(msg) for msg in MESSAGES))
+        self.assertFalse(listener.empty())
+        self.assertEqual([listener.get(), listener.get()], MESSAGES)